@@ -1,10 +1,11 @@
 import json
+import logging
 import sys
+import traceback
 import uuid
 
 import dcoscli
 import docopt
-import rollbar
 import six
 from concurrent.futures import ThreadPoolExecutor
 from dcos import http, util
@@ -30,7 +31,38 @@ def wait_and_track(subproc, cluster_id):
     :rtype: int
     """
 
-    rollbar.init(ROLLBAR_SERVER_POST_KEY, 'prod')
+    return _track(lambda: wait_and_capture(subproc), cluster_id)
+
+
+def run_and_track(function, argv, cluster_id):
+    """
+    Run a command in this process and report it to analytics services.
+
+    :param function: main function of the command
+    :type function: () -> int
+    :param argv: arguments to run the command with
+    :type argv: [str]
+    :param cluster_id: dcos cluster id to send to segment
+    :type cluster_id: str
+    :returns: exit code of the command
+    :rtype: int
+    """
+
+    return _track(lambda: run_and_capture(function, argv), cluster_id)
+
+
+def _track(wait, cluster_id):
+    """
+    Wait for a command and report it to analytics services.
+
+    :param wait: function that waits for the command to finish and returns
+                 its exit code and stderr
+    :type wait: () -> (int, str)
+    :param cluster_id: dcos cluster id to send to segment
+    :type cluster_id: str
+    :returns: exit code of the command
+    :rtype: int
+    """
 
     conf = util.get_config()
     report = conf.get('core.reporting', True)
@@ -38,7 +70,7 @@ def wait_and_track(subproc, cluster_id):
         if report:
             _segment_track_cli(pool, conf, cluster_id)
 
-        exit_code, err = wait_and_capture(subproc)
+        exit_code, err = wait()
 
         # We only want to catch exceptions, not other stderr messages
         # (such as "task does not exist", so we look for the 'Traceback'
@@ -73,6 +105,130 @@ def wait_and_capture(subproc):
     return exit_code, err
 
 
+def run_and_capture(function, argv):
+    """
+    Run a command's main function in this process, as if it had been
+    executed with `argv`, and capture its stderr.  Logging handlers that
+    write to stderr are captured too, even if they were created before
+    stderr was replaced.
+
+    :param function: main function of the command
+    :type function: () -> int
+    :param argv: arguments to run the command with, starting with the path
+                 to the command's program
+    :type argv: [str]
+    :returns: exit code of the command and its stderr
+    :rtype: (int, str)
+    """
+
+    saved_argv = sys.argv
+    saved_stderr = sys.stderr
+    sys.argv = argv
+    sys.stderr = tee = _TeeStream(saved_stderr)
+    handlers = _redirect_handlers(saved_stderr, tee)
+    try:
+        exit_code = _run(function)
+        err = tee.getvalue()
+    finally:
+        _redirect_handlers(tee, saved_stderr, handlers)
+        sys.argv = saved_argv
+        sys.stderr = saved_stderr
+
+    return exit_code, err
+
+
+def _run(function):
+    """
+    Run a command's main function the way the python interpreter runs a
+    program's: uncaught exceptions are printed to stderr and `sys.exit`
+    ends the command.
+
+    :param function: main function of the command
+    :type function: () -> int
+    :returns: exit code of the command
+    :rtype: int
+    """
+
+    try:
+        code = function()
+    except SystemExit as e:
+        code = e.code
+    except Exception:
+        traceback.print_exc()
+        return 1
+
+    if code is None:
+        return 0
+    elif isinstance(code, int):
+        return code
+    else:
+        sys.stderr.write('{}\n'.format(code))
+        return 1
+
+
+def _redirect_handlers(old, new, handlers=None):
+    """
+    Make the logging handlers that write to `old` write to `new`.
+
+    :param old: stream the handlers write to
+    :type old: file
+    :param new: stream the handlers must write to
+    :type new: file
+    :param handlers: handlers to redirect; defaults to the stream
+                     handlers of every logger
+    :type handlers: [logging.StreamHandler] | None
+    :returns: the handlers that were redirected
+    :rtype: [logging.StreamHandler]
+    """
+
+    if handlers is None:
+        loggers = [logging.getLogger()] + [
+            log for log in list(logging.Logger.manager.loggerDict.values())
+            if isinstance(log, logging.Logger)]
+        handlers = [handler
+                    for log in loggers
+                    for handler in log.handlers
+                    if isinstance(handler, logging.StreamHandler)]
+
+    redirected = []
+    for handler in handlers:
+        handler.acquire()
+        try:
+            if handler.stream is old:
+                handler.stream = new
+                redirected.append(handler)
+        finally:
+            handler.release()
+    return redirected
+
+
+class _TeeStream(object):
+    """Stream that writes to `stream` and also records what was written.
+
+    :param stream: stream to write to
+    :type stream: file
+    """
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._written = []
+
+    def write(self, data):
+        self._stream.write(data)
+        self._written.append(data)
+
+    def getvalue(self):
+        """
+        :returns: everything written so far
+        :rtype: str
+        """
+
+        return ''.join(self._written)
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
 def _segment_track(event, conf, properties):
     """
     Send a segment.io 'track' event
@@ -224,6 +380,10 @@ def _rollbar_track_err(conf, cluster_id, err, exit_code):
     props['stderr'] = err
 
     try:
+        # rollbar is only needed to report errors, so not imported at startup
+        import rollbar
+
+        rollbar.init(ROLLBAR_SERVER_POST_KEY, 'prod')
         rollbar.report_message(title, 'error', extra_data=props)
     except Exception as e:
         logger.exception(e)
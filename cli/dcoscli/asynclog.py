@@ -0,0 +1,281 @@
+import collections
+import functools
+import sys
+
+import concurrent.futures
+from dcos import mesos, util
+from dcos.errors import DCOSException
+from dcoscli import log
+
+logger = util.get_logger(__name__)
+
+MAX_IN_FLIGHT = 64
+"""Maximum number of reads in progress across all slaves"""
+
+FOLLOW_READ_SIZE = mesos.FILE_CHUNK_SIZE
+"""Maximum number of bytes read from a file per poll"""
+
+
+def follow_files(curr_header, mesos_files, merger=None, match=None,
+                 checkpoints=None):
+    """Prints data appended to `mesos_files` until none of them are
+    reachable, scheduling every poll on a single asyncio event loop.
+    Reads are dispatched to a bounded executor, at most
+    `log.SLAVE_CONCURRENCY` at a time per slave, and each followed file
+    holds at most FOLLOW_READ_SIZE bytes of pending data.
+
+    :param curr_header: most recently printed header
+    :type curr_header: str
+    :param mesos_files: files to follow
+    :type mesos_files: [MesosFile]
+    :param merger: if set, lines are printed through it, merging the
+                   reads that complete together
+    :type merger: log._Merger | None
+    :param match: selects the lines to print, if any
+    :type match: (str -> bool) | None
+    :param checkpoints: if set, saves the offset printed up to, and
+                        transient errors are retried as in
+                        `log._follow_files`
+    :type checkpoints: log._Checkpoints | None
+    :rtype: None
+    """
+
+    try:
+        import asyncio
+    except ImportError:
+        raise DCOSException(
+            'The asyncio log engine requires Python 3.4 or later.  '
+            'Set core.log_engine to "threads" instead.')
+
+    loop = asyncio.new_event_loop()
+    with concurrent.futures.ThreadPoolExecutor(MAX_IN_FLIGHT) as pool:
+        try:
+            follower = _Follower(loop, pool, curr_header, mesos_files,
+                                 merger, match, checkpoints)
+            loop.run_until_complete(follower.done)
+        finally:
+            loop.close()
+
+
+class _FollowedFile(object):
+    """Polling state of a single followed file
+
+    :param mesos_file: file to follow
+    :type mesos_file: MesosFile
+    """
+
+    __slots__ = ['mesos_file', 'interval', 'partial', 'retries']
+
+    def __init__(self, mesos_file):
+        self.mesos_file = mesos_file
+        self.interval = log.FOLLOW_INTERVAL
+        self.partial = ''
+        self.retries = 0
+
+    def offset(self):
+        """
+        :returns: offset up to which the file has been printed
+        :rtype: int
+        """
+
+        return self.mesos_file.tell() - len(self.partial.encode('utf-8'))
+
+
+class _Follower(object):
+    """Polls a set of files from callbacks on `loop`.  `done` fails with
+    the same exception as `log.log_files` once no file is reachable.
+
+    :param loop: event loop to schedule polls on
+    :type loop: asyncio.AbstractEventLoop
+    :param pool: executor to read the files on
+    :type pool: concurrent.futures.Executor
+    :param curr_header: most recently printed header
+    :type curr_header: str
+    :param mesos_files: files to follow
+    :type mesos_files: [MesosFile]
+    :param merger: merges lines across files, if set
+    :type merger: log._Merger | None
+    :param match: selects the lines to print, if any
+    :type match: (str -> bool) | None
+    :param checkpoints: saves the offset printed up to, if set
+    :type checkpoints: log._Checkpoints | None
+    """
+
+    def __init__(self, loop, pool, curr_header, mesos_files, merger=None,
+                 match=None, checkpoints=None):
+        self.done = _create_future(loop)
+
+        self._loop = loop
+        self._pool = pool
+        self._curr_header = curr_header
+        self._output_header = len(mesos_files) > 1
+        self._merger = merger
+        self._match = match
+        self._checkpoints = checkpoints
+        self._unsaved = set()
+        self._flush_pending = False
+        self._files = set()
+        self._in_flight = collections.Counter()
+        self._waiting = collections.defaultdict(collections.deque)
+
+        for mesos_file in mesos_files:
+            followed = _FollowedFile(mesos_file)
+            self._files.add(followed)
+            self._schedule(followed)
+
+    def _schedule(self, followed, delay=None):
+        """Queues a poll of `followed` after `delay` seconds.
+
+        :param followed: file to poll
+        :type followed: _FollowedFile
+        :param delay: seconds to wait.  Defaults to the file's interval.
+        :type delay: float | None
+        :rtype: None
+        """
+
+        if delay is None:
+            delay = followed.interval
+        self._loop.call_later(delay, self._poll, followed)
+
+    def _poll(self, followed):
+        """Starts reading `followed`, or queues it behind the reads
+        already in progress on its slave.
+
+        :param followed: file to poll
+        :type followed: _FollowedFile
+        :rtype: None
+        """
+
+        slave_id = followed.mesos_file.slave_id()
+        if self._in_flight[slave_id] >= log.SLAVE_CONCURRENCY:
+            self._waiting[slave_id].append(followed)
+            return
+
+        self._in_flight[slave_id] += 1
+        job = self._loop.run_in_executor(
+            self._pool, log._read_chunk, followed.mesos_file,
+            FOLLOW_READ_SIZE)
+        job.add_done_callback(
+            functools.partial(self._on_read, followed, slave_id))
+
+    def _on_read(self, followed, slave_id, job):
+        """Prints the data read from `followed` and schedules its next
+        poll.
+
+        :param followed: file that was read
+        :type followed: _FollowedFile
+        :param slave_id: id of the slave the read was issued to
+        :type slave_id: str
+        :param job: completed read
+        :type job: asyncio.Future
+        :rtype: None
+        """
+
+        self._in_flight[slave_id] -= 1
+        if self._waiting[slave_id]:
+            self._poll(self._waiting[slave_id].popleft())
+        else:
+            del self._waiting[slave_id]
+            if not self._in_flight[slave_id]:
+                del self._in_flight[slave_id]
+
+        if self.done.done():
+            return
+
+        try:
+            data = job.result()
+        except DCOSException as e:
+            logger.exception("Error reading file: {}".format(e))
+            if (self._checkpoints is not None and
+                    followed.retries < log.RETRY_LIMIT and
+                    log._is_transient(e)):
+                followed.retries += 1
+                followed.interval = log._retry_delay(followed.retries)
+                self._schedule(followed)
+                return
+
+            self._files.discard(followed)
+            if not self._files:
+                self.done.set_exception(log._no_file_exception())
+            return
+        except Exception as e:
+            self.done.set_exception(e)
+            return
+
+        followed.retries = 0
+        # A full read means more data is probably waiting.  Hold back
+        # the trailing partial line until the rest of it arrives, so
+        # that a line is never broken across two reads.  With `match`,
+        # it is always held back, so that it is filtered whole.
+        more = len(data) >= FOLLOW_READ_SIZE
+        data = followed.partial + data
+        followed.partial = ''
+        if more or self._match is not None:
+            head, sep, tail = data.rpartition('\n')
+            if len(tail) < FOLLOW_READ_SIZE:
+                data, followed.partial = head + sep, tail
+
+        lines = log._filter_lines(
+            log._strip_trailing_newline(data).split('\n') if data else [],
+            self._match)
+        if lines:
+            if self._merger is not None:
+                self._merger.add(followed.mesos_file, lines)
+                if not self._flush_pending:
+                    self._flush_pending = True
+                    self._loop.call_soon(self._flush)
+            else:
+                self._curr_header = log._output(
+                    self._curr_header,
+                    self._output_header,
+                    str(followed.mesos_file),
+                    lines)
+                # See log._follow_files
+                sys.stdout.flush()
+
+        if self._checkpoints is not None:
+            if self._merger is not None and lines:
+                # saved once the lines are printed by _flush
+                self._unsaved.add(followed)
+            else:
+                self._checkpoints.save(followed.mesos_file,
+                                       followed.offset())
+
+        if data or more:
+            followed.interval = log.FOLLOW_INTERVAL
+        else:
+            followed.interval = min(followed.interval * 2,
+                                    log.FOLLOW_MAX_INTERVAL)
+
+        self._schedule(followed, 0 if more else None)
+
+    def _flush(self):
+        """Prints the lines merged from all reads that completed since
+        the last flush.
+
+        :rtype: None
+        """
+
+        self._flush_pending = False
+        self._merger.flush()
+        sys.stdout.flush()
+
+        for followed in self._unsaved:
+            self._checkpoints.save(followed.mesos_file, followed.offset())
+        self._unsaved.clear()
+
+
+def _create_future(loop):
+    """
+    :param loop: event loop
+    :type loop: asyncio.AbstractEventLoop
+    :returns: a future bound to `loop`
+    :rtype: asyncio.Future
+    """
+
+    if hasattr(loop, 'create_future'):
+        return loop.create_future()
+
+    # AbstractEventLoop.create_future was added in python 3.5.2
+    import asyncio
+    return asyncio.Future(loop=loop)
@@ -1,8 +1,8 @@
 import collections
+import pkgutil
 
 import dcoscli
 import docopt
-import pkg_resources
 from dcos import cmds, config, emitting, http, util
 from dcos.errors import DCOSException
 from dcoscli import analytics
@@ -37,7 +37,7 @@ def _doc():
     """
     :rtype: str
     """
-    return pkg_resources.resource_string(
+    return pkgutil.get_data(
         'dcoscli',
         'data/help/config.txt').decode('utf-8')
 
@@ -1,8 +1,8 @@
+import pkgutil
 import subprocess
 
 import dcoscli
 import docopt
-import pkg_resources
 from concurrent.futures import ThreadPoolExecutor
 from dcos import cmds, emitting, options, subcommand, util
 from dcos.errors import DCOSException
@@ -35,7 +35,7 @@ def _doc():
     """
     :rtype: str
     """
-    return pkg_resources.resource_string(
+    return pkgutil.get_data(
         'dcoscli',
         'data/help/help.txt').decode('utf-8')
 
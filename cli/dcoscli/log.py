@@ -1,19 +1,78 @@
+import collections
+import datetime
 import functools
+import heapq
+import itertools
+import re
 import sys
+import threading
 import time
 
-from dcos import emitting, util
-from dcos.errors import DCOSException
+import concurrent.futures
+from dcos import cache, emitting, util
+from dcos.errors import (DCOSConnectionException, DCOSException,
+                         DCOSHTTPException)
 
 logger = util.get_logger(__name__)
 emitter = emitting.FlatEmitter()
 
+FOLLOW_INTERVAL = 1
+"""Seconds between polls of a file that is receiving data"""
+
+FOLLOW_MAX_INTERVAL = 30
+"""Upper bound on the seconds between polls of an idle file"""
+
+SLAVE_CONCURRENCY = 4
+"""Maximum number of concurrent reads from a single slave"""
+
+RETRY_LIMIT = 8
+"""Consecutive transient failures after which a resumed file is dropped"""
+
+CHECKPOINT_NAMESPACE = 'log-offsets'
+"""Cache namespace of the offsets saved by `dcos task log --resume`"""
+
+MAX_TAG_LENGTH = 24
+"""Longest task tag printed in front of merged lines"""
+
+_ISO_TIMESTAMP_RE = re.compile(
+    r'^\[?(\d{4}-\d{2}-\d{2})[T ](\d{2}:\d{2}:\d{2})(?:[.,](\d+))?')
+_GLOG_TIMESTAMP_RE = re.compile(
+    r'^[IWEF](\d{2})(\d{2}) +(\d{2}:\d{2}:\d{2})(?:\.(\d+))?')
+
 
 def _no_file_exception():
     return DCOSException('No files exist. Exiting.')
 
 
-def log_files(mesos_files, follow, lines):
+def line_filter(pattern, invert_match=False):
+    """Builds a predicate that selects lines, like grep.
+
+    :param pattern: regular expression searched for in each line, or
+                    None to select every line
+    :type pattern: str | None
+    :param invert_match: select the lines that don't match instead
+    :type invert_match: bool
+    :returns: the predicate, or None if every line is selected
+    :rtype: (str -> bool) | None
+    """
+
+    if pattern is None:
+        return None
+
+    try:
+        regex = re.compile(pattern)
+    except re.error as e:
+        raise DCOSException(
+            'Invalid pattern [{}]: {}'.format(pattern, e))
+
+    if invert_match:
+        return lambda line: regex.search(line) is None
+    else:
+        return lambda line: regex.search(line) is not None
+
+
+def log_files(mesos_files, follow, lines, merge=False, match=None,
+              resume=False):
     """Print the contents of the given `mesos_files`.  Behaves like unix
     tail.
 
@@ -23,30 +82,167 @@ def log_files(mesos_files, follow, lines):
     :type follow: bool
     :param lines: number of lines to print
     :type lines: int
+    :param merge: interleave the lines of all files by timestamp, each
+                  prefixed with a tag naming its task, instead of
+                  grouping them under a header per file
+    :type merge: bool
+    :param match: only print the lines for which it returns True.  See
+                  `line_filter`.
+    :type match: (str -> bool) | None
+    :param resume: continue each file from the offset saved by the last
+                   run with `resume`, and save the offset printed up to
+                   after every read.  Transient errors are retried with
+                   backoff instead of dropping the file.
+    :type resume: bool
+    :rtype: None
+    """
+
+    merger = _Merger() if merge else None
+    checkpoints = _Checkpoints() if resume else None
+
+    with concurrent.futures.ThreadPoolExecutor(
+            util.STREAM_CONCURRENCY) as pool:
+        limiter = _SlaveLimiter(SLAVE_CONCURRENCY)
+
+        if checkpoints is None:
+            fn = limiter.wrap(functools.partial(
+                _read_last_lines, lines, match=match))
+        else:
+            # retry outside the limiter, so that a file waiting to be
+            # retried doesn't hold up the other files on its slave
+            fn = _with_retries(limiter.wrap(functools.partial(
+                _resume_or_tail, lines, checkpoints, match=match)))
+        curr_header, mesos_files, _ = _stream_files(
+            None, fn, mesos_files, pool, merger=merger,
+            checkpoints=checkpoints)
+        if not mesos_files:
+            raise _no_file_exception()
+
+        if follow:
+            engine = util.get_config().get('core.log_engine', 'threads')
+            if engine == 'asyncio':
+                from dcoscli import asynclog
+                asynclog.follow_files(curr_header, mesos_files, merger,
+                                      match, checkpoints)
+            else:
+                _follow_files(curr_header, mesos_files, pool, limiter,
+                              merger, match, checkpoints)
+
+
+def _follow_files(curr_header, mesos_files, pool, limiter, merger=None,
+                  match=None, checkpoints=None):
+    """Prints data appended to `mesos_files` until none of them are
+    reachable.  A file that returns no data is polled at exponentially
+    increasing intervals, up to FOLLOW_MAX_INTERVAL, and is polled every
+    FOLLOW_INTERVAL again as soon as it returns data.  With
+    `checkpoints`, a file that fails transiently is retried with the same
+    backoff, up to RETRY_LIMIT times in a row.
+
+    :param curr_header: most recently printed header
+    :type curr_header: str
+    :param mesos_files: files to follow
+    :type mesos_files: [MesosFile]
+    :param pool: executor to read the files on
+    :type pool: concurrent.futures.Executor
+    :param limiter: limits concurrent reads per slave
+    :type limiter: _SlaveLimiter
+    :param merger: merges the lines read in each round, if any
+    :type merger: _Merger | None
+    :param match: selects the lines to print, if any
+    :type match: (str -> bool) | None
+    :param checkpoints: saves the offset printed up to, if set
+    :type checkpoints: _Checkpoints | None
     :rtype: None
     """
 
-    fn = functools.partial(_read_last_lines, lines)
-    curr_header, mesos_files = _stream_files(None, fn, mesos_files)
-    if not mesos_files:
-        raise _no_file_exception()
+    # with a filter, a partial last line is read again once it is complete,
+    # so that it is filtered whole.  Without one, it is printed right away.
+    fn = limiter.wrap(functools.partial(_read_rest, match=match,
+                                        complete_lines=match is not None))
+    intervals = dict((mesos_file, FOLLOW_INTERVAL)
+                     for mesos_file in mesos_files)
+    next_poll = dict((mesos_file, time.time() + FOLLOW_INTERVAL)
+                     for mesos_file in mesos_files)
+    retries = collections.Counter()
 
-    while follow:
+    while True:
         # This flush is needed only for testing, since stdout is fully
         # buffered (as opposed to line-buffered) when redirected to a
         # pipe.  So if we don't flush, our --follow tests, which use a
         # pipe, never see the data
         sys.stdout.flush()
 
-        curr_header, mesos_files = _stream_files(curr_header,
-                                                 _read_rest,
-                                                 mesos_files)
+        time.sleep(max(min(next_poll.values()) - time.time(), 0))
+
+        now = time.time()
+        due = [mesos_file for mesos_file in mesos_files
+               if next_poll[mesos_file] <= now]
+        failures = {}
+        curr_header, reachable, updated = _stream_files(
+            curr_header, fn, due, pool, len(mesos_files) > 1, merger,
+            checkpoints, failures)
+
+        for mesos_file in due:
+            if mesos_file in failures:
+                if (checkpoints is not None and
+                        retries[mesos_file] < RETRY_LIMIT and
+                        _is_transient(failures[mesos_file])):
+                    retries[mesos_file] += 1
+                    intervals[mesos_file] = _retry_delay(retries[mesos_file])
+                    next_poll[mesos_file] = \
+                        time.time() + intervals[mesos_file]
+                    continue
+
+                mesos_files.remove(mesos_file)
+                del next_poll[mesos_file]
+                continue
+
+            retries.pop(mesos_file, None)
+            if mesos_file in updated:
+                intervals[mesos_file] = FOLLOW_INTERVAL
+            else:
+                intervals[mesos_file] = min(intervals[mesos_file] * 2,
+                                            FOLLOW_MAX_INTERVAL)
+            next_poll[mesos_file] = time.time() + intervals[mesos_file]
+
         if not mesos_files:
             raise _no_file_exception()
-        time.sleep(1)
 
 
-def _stream_files(curr_header, fn, mesos_files):
+class _SlaveLimiter(object):
+    """Limits the number of concurrent reads from each slave
+
+    :param limit: maximum number of concurrent reads per slave
+    :type limit: int
+    """
+
+    def __init__(self, limit):
+        self._limit = limit
+        self._lock = threading.Lock()
+        self._semaphores = collections.defaultdict(
+            lambda: threading.BoundedSemaphore(self._limit))
+
+    def wrap(self, fn):
+        """
+        :param fn: function that reads from a MesosFile
+        :type fn: MesosFile -> object
+        :returns: `fn`, blocking while `limit` reads from the same slave
+                  are in progress
+        :rtype: MesosFile -> object
+        """
+
+        def limited(mesos_file):
+            with self._lock:
+                semaphore = self._semaphores[mesos_file.slave_id()]
+            with semaphore:
+                return fn(mesos_file)
+
+        return limited
+
+
+def _stream_files(curr_header, fn, mesos_files, pool=None,
+                  output_header=None, merger=None, checkpoints=None,
+                  failures=None):
     """Apply `fn` in parallel to each file in `mesos_files`.  `fn` must
     return a list of strings, and these strings are then printed
     serially as separate lines.
@@ -64,16 +260,32 @@ def _stream_files(curr_header, fn, mesos_files):
     :type fn: MesosFile -> [str]
     :param mesos_files: files to read
     :type mesos_files: [MesosFile]
-    :returns: Returns the most recently printed header, and a list of
-        files that are still reachable.  Once we detect a file is
-        unreachable, we stop trying to read from it.
-    :rtype: (str, [MesosFile])
+    :param pool: executor to run `fn` on.  See `util.stream`.
+    :type pool: concurrent.futures.Executor | None
+    :param output_header: whether to print headers.  Defaults to whether
+        more than one file is reachable.
+    :type output_header: bool | None
+    :param merger: if set, the lines of all files are printed through
+        it, in timestamp order, once every file has been read
+    :type merger: _Merger | None
+    :param checkpoints: if set, the offset of each file is saved once its
+        lines are printed
+    :type checkpoints: _Checkpoints | None
+    :param failures: if set, the exception raised while reading each
+        unreachable file is stored in it
+    :type failures: dict | None
+    :returns: Returns the most recently printed header, a list of files
+        that are still reachable, and the set of files that returned
+        lines.  Once we detect a file is unreachable, we stop trying to
+        read from it.
+    :rtype: (str, [MesosFile], set(MesosFile))
     """
 
     reachable_files = list(mesos_files)
+    updated_files = set()
 
     # TODO switch to map
-    for job, mesos_file in util.stream(fn, mesos_files):
+    for job, mesos_file in util.stream(fn, mesos_files, pool):
         try:
             lines = job.result()
         except DCOSException as e:
@@ -84,15 +296,32 @@ def _stream_files(curr_header, fn, mesos_files):
             logger.exception("Error reading file: {}".format(e))
 
             reachable_files.remove(mesos_file)
+            if failures is not None:
+                failures[mesos_file] = e
             continue
 
         if lines:
+            updated_files.add(mesos_file)
+            if merger is not None:
+                merger.add(mesos_file, lines)
+                continue
             curr_header = _output(curr_header,
-                                  len(reachable_files) > 1,
+                                  (len(reachable_files) > 1
+                                   if output_header is None
+                                   else output_header),
                                   str(mesos_file),
                                   lines)
 
-    return curr_header, reachable_files
+        if checkpoints is not None:
+            checkpoints.save(mesos_file)
+
+    if merger is not None:
+        merger.flush()
+        if checkpoints is not None:
+            for mesos_file in updated_files:
+                checkpoints.save(mesos_file)
+
+    return curr_header, reachable_files, updated_files
 
 
 def _output(curr_header, output_header, header, lines):
@@ -113,74 +342,394 @@ def _output(curr_header, output_header, header, lines):
 
     if lines:
         if output_header and header != curr_header:
-            emitter.publish('===> {} <==='.format(header))
-        for line in lines:
-            emitter.publish(line)
+            lines = ['===> {} <==='.format(header)] + lines
+        emitter.publish_batch(lines, page=False)
     return header
 
 
+class _Merger(object):
+    """Prints the lines of several files in timestamp order.  Lines are
+    buffered per file with `add`, and `flush` k-way merges the buffers,
+    so memory is bounded by what was read since the last flush.
+
+    Only the lines buffered since the last flush are ordered: a line read
+    after a flush is printed after every line flushed before it, even if
+    its timestamp is older.  In follow mode, lines are therefore ordered
+    within each round of reads, but not across rounds.
+
+    Timestamps are detected at the start of each line, in ISO 8601 or
+    glog format.  A line without one inherits the timestamp of the
+    previous line of its file, so that multi-line messages stay
+    together.  Until its file has had a timestamped line, it takes the
+    latest timestamp added from any file, which keeps it in the order it
+    was read in.  Lines that tie keep the order they were read in.
+    """
+
+    def __init__(self):
+        self._buffers = collections.OrderedDict()
+        self._timestamps = {}
+        self._latest = ''
+        self._tags = {}
+        self._arrival = itertools.count()
+
+    def add(self, mesos_file, lines):
+        """Buffers lines read from `mesos_file`.
+
+        :param mesos_file: file the lines were read from
+        :type mesos_file: MesosFile
+        :param lines: lines, in file order
+        :type lines: [str]
+        :rtype: None
+        """
+
+        if mesos_file not in self._tags:
+            self._tags[mesos_file] = _task_tag(mesos_file)
+        tag = self._tags[mesos_file]
+
+        timestamp = self._timestamps.get(mesos_file)
+        buf = self._buffers.setdefault(mesos_file, [])
+        for line in lines:
+            timestamp = _parse_timestamp(line) or timestamp
+            key = self._latest if timestamp is None else timestamp
+            self._latest = max(self._latest, key)
+            buf.append((key, next(self._arrival), tag, line))
+        if timestamp is not None:
+            self._timestamps[mesos_file] = timestamp
+
+    def flush(self):
+        """Prints and discards all buffered lines.
+
+        :rtype: None
+        """
+
+        buffers = list(self._buffers.values())
+        self._buffers.clear()
+        emitter.publish_batch(
+            ('{} {}'.format(tag, line)
+             for _, _, tag, line in heapq.merge(*buffers)),
+            page=False)
+
+
+def _parse_timestamp(line):
+    """
+    :param line: log line
+    :type line: str
+    :returns: the timestamp at the start of `line`, normalized so that
+              timestamps compare as strings, or None if there isn't one
+    :rtype: str | None
+    """
+
+    match = _ISO_TIMESTAMP_RE.match(line)
+    if match:
+        date, time_, fraction = match.groups()
+    else:
+        match = _GLOG_TIMESTAMP_RE.match(line)
+        if not match:
+            return None
+        month, day, time_, fraction = match.groups()
+        # glog omits the year
+        date = '{}-{}-{}'.format(datetime.date.today().year, month, day)
+
+    return '{} {}.{}'.format(date, time_, (fraction or '')[:6].ljust(6, '0'))
+
+
+def _task_tag(mesos_file):
+    """
+    :param mesos_file: file being printed
+    :type mesos_file: MesosFile
+    :returns: a short tag identifying the task, slave or master that
+              owns `mesos_file`
+    :rtype: str
+    """
+
+    owner = mesos_file.task_id() or mesos_file.slave_id() or 'master'
+    if len(owner) > MAX_TAG_LENGTH:
+        # Keep both ends, since task IDs usually share a prefix and
+        # differ in a trailing UUID
+        half = (MAX_TAG_LENGTH - 2) // 2
+        owner = owner[:half] + '..' + owner[-half:]
+    return '[{}]'.format(owner)
+
+
 # A liberal estimate of a line size.  Used to estimate how much data
 # we need to fetch from a file when we want to read N lines.
 LINE_SIZE = 200
 
+# Smallest read issued when scanning backwards for lines
+MIN_FETCH_SIZE = 4096
+
 
-def _read_last_lines(num_lines, mesos_file):
+def _read_last_lines(num_lines, mesos_file, match=None):
     """Returns the last `num_lines` of a file, or less if the file is
     smaller.  Seeks to EOF.
 
+    The file is read backwards.  The first read is sized from LINE_SIZE.
+    Later reads are sized from the average length, in the file, of the
+    lines kept so far, and double while none has been kept.  Only the
+    newly read data is split into lines.
+
     :param num_lines: number of lines to read
     :type num_lines: int
     :param mesos_file: file to read
     :type mesos_file: MesosFile
+    :param match: if set, only lines for which it returns True are
+                  kept and counted towards `num_lines`
+    :type match: (str -> bool) | None
     :returns: lines read
     :rtype: [str]
     """
 
     file_size = mesos_file.size()
+    if num_lines <= 0:
+        mesos_file.seek(file_size)
+        return []
 
-    # estimate how much data we need to fetch to read `num_lines`.
-    fetch_size = LINE_SIZE * num_lines
+    fetch_size = max(LINE_SIZE * num_lines, MIN_FETCH_SIZE)
+
+    # complete lines found so far, last line first
+    lines = []
+
+    # text between the start of the window and the first line break in
+    # it.  The line it belongs to may begin before the window.
+    partial = None
 
     end = file_size
-    start = max(end - fetch_size, 0)
-    data = ''
     while True:
-        # fetch data
+        start = max(end - fetch_size, 0)
         mesos_file.seek(start)
-        data = mesos_file.read(end - start) + data
+        data = mesos_file.read(end - start)
 
-        # break if we have enough lines
-        data_tmp = _strip_trailing_newline(data)
-        lines = data_tmp.split('\n')
-        if len(lines) > num_lines:
-            ret = lines[-num_lines:]
+        if partial is None:
+            data = _strip_trailing_newline(data)
+        else:
+            data += partial
+
+        pieces = data.split('\n')
+        partial = pieces[0]
+        lines.extend(_filter_lines(reversed(pieces[1:]), match))
+
+        if start == 0:
+            lines.extend(_filter_lines([partial], match))
             break
-        elif start == 0:
-            ret = lines
+        if len(lines) >= num_lines:
             break
 
-        # otherwise shift our read window and repeat
         end = start
-        start = max(end - fetch_size, 0)
+        fetch_size = _next_fetch_size(fetch_size,
+                                      file_size - end - len(partial),
+                                      len(lines),
+                                      num_lines)
 
     mesos_file.seek(file_size)
-    return ret
+    return list(reversed(lines[:num_lines]))
+
+
+def _next_fetch_size(fetch_size, bytes_read, lines_read, num_lines):
+    """Estimates how much more data to read from the end of a file to find
+    `num_lines` lines.
+
+    :param fetch_size: size of the previous read
+    :type fetch_size: int
+    :param bytes_read: number of bytes read so far, excluding any partial
+                       line
+    :type bytes_read: int
+    :param lines_read: number of complete lines read so far
+    :type lines_read: int
+    :param num_lines: number of lines wanted
+    :type num_lines: int
+    :returns: size of the next read
+    :rtype: int
+    """
+
+    if lines_read == 0:
+        return fetch_size * 2
 
+    line_size = float(bytes_read) / lines_read
+    # read 25% more than the estimate, so that lines a bit longer than
+    # average don't cost an extra round trip
+    estimate = int(line_size * (num_lines - lines_read) * 1.25) + 1
+    return max(estimate, MIN_FETCH_SIZE)
 
-def _read_rest(mesos_file):
+
+def _read_rest(mesos_file, match=None, complete_lines=False):
     """ Reads the rest of the file, and returns the lines.
 
     :param mesos_file: file to read
     :type mesos_file: MesosFile
+    :param match: if set, only lines for which it returns True are
+                  returned
+    :type match: (str -> bool) | None
+    :param complete_lines: if True, a last line that doesn't end in a
+                           newline yet is left unread, so that it is read
+                           whole, and filtered once, when the rest of it
+                           arrives
+    :type complete_lines: bool
     :returns: lines read
     :rtype: [str]
     """
-    data = mesos_file.read()
+    data = _read_chunk(mesos_file)
+    if complete_lines and not data.endswith('\n'):
+        data, _, partial = data.rpartition('\n')
+        # offsets are in bytes
+        mesos_file.seek(mesos_file.tell() - len(partial.encode('utf-8')))
+
     if data == '':
         return []
     else:
         data_tmp = _strip_trailing_newline(data)
-        return data_tmp.split('\n')
+        return _filter_lines(data_tmp.split('\n'), match)
+
+
+def _read_chunk(mesos_file, length=None):
+    """Reads up to `length` bytes, or the rest of the file if `length` is
+    None.  If the read fails, the cursor is left where it was, so that
+    retrying the read neither skips nor repeats data.
+
+    :param mesos_file: file to read
+    :type mesos_file: MesosFile
+    :param length: number of bytes to read
+    :type length: int | None
+    :returns: data read
+    :rtype: str
+    """
+
+    offset = mesos_file.tell()
+    try:
+        return mesos_file.read(length)
+    except Exception:
+        mesos_file.seek(offset)
+        raise
+
+
+def _resume_or_tail(num_lines, checkpoints, mesos_file, match=None):
+    """Returns the lines after the offset saved for `mesos_file`, or its
+    last `num_lines` lines if there is no saved offset or the file has
+    since been truncated.  Seeks to EOF.
+
+    :param num_lines: number of lines to read without a saved offset
+    :type num_lines: int
+    :param checkpoints: saved offsets
+    :type checkpoints: _Checkpoints
+    :param mesos_file: file to read
+    :type mesos_file: MesosFile
+    :param match: selects the lines to return, if any
+    :type match: (str -> bool) | None
+    :returns: lines read
+    :rtype: [str]
+    """
+
+    offset = checkpoints.load(mesos_file)
+    if offset is not None and offset <= mesos_file.size():
+        mesos_file.seek(offset)
+        return _read_rest(mesos_file, match)
+    return _read_last_lines(num_lines, mesos_file, match)
+
+
+class _Checkpoints(object):
+    """Offsets up to which files have been printed, saved in the cache
+    directory under CHECKPOINT_NAMESPACE and keyed by the file's task
+    and path.
+    """
+
+    def __init__(self):
+        self._saved = {}
+
+    def load(self, mesos_file):
+        """
+        :param mesos_file: file to look up
+        :type mesos_file: MesosFile
+        :returns: the saved offset of `mesos_file`, if any
+        :rtype: int | None
+        """
+
+        value = cache.load(CHECKPOINT_NAMESPACE, str(mesos_file))
+        if isinstance(value, dict):
+            return value.get('offset')
+        return None
+
+    def save(self, mesos_file, offset=None):
+        """Saves the offset of `mesos_file`, unless it is unchanged.
+
+        :param mesos_file: file that was printed
+        :type mesos_file: MesosFile
+        :param offset: offset printed up to.  Defaults to the cursor.
+        :type offset: int | None
+        :rtype: None
+        """
+
+        if offset is None:
+            offset = mesos_file.tell()
+
+        key = str(mesos_file)
+        if self._saved.get(key) != offset:
+            cache.store(CHECKPOINT_NAMESPACE, key, {'offset': offset})
+            self._saved[key] = offset
+
+
+def _is_transient(error):
+    """
+    :param error: error raised while reading a file
+    :type error: Exception
+    :returns: whether retrying the read may succeed.  Connection errors,
+              timeouts and server errors are transient; everything else,
+              such as a missing file or an authentication error, is not.
+    :rtype: bool
+    """
+
+    if isinstance(error, DCOSHTTPException):
+        return error.response.status_code >= 500
+    return isinstance(error, DCOSConnectionException)
+
+
+def _retry_delay(attempt):
+    """
+    :param attempt: number of consecutive failures
+    :type attempt: int
+    :returns: seconds to wait before the next attempt
+    :rtype: float
+    """
+
+    return min(FOLLOW_INTERVAL * 2 ** attempt, FOLLOW_MAX_INTERVAL)
+
+
+def _with_retries(fn):
+    """
+    :param fn: function that reads from a MesosFile
+    :type fn: MesosFile -> object
+    :returns: `fn`, retrying transient errors up to RETRY_LIMIT times with
+              exponential backoff
+    :rtype: MesosFile -> object
+    """
+
+    def retrying(mesos_file):
+        attempt = 0
+        while True:
+            try:
+                return fn(mesos_file)
+            except DCOSException as e:
+                attempt += 1
+                if attempt > RETRY_LIMIT or not _is_transient(e):
+                    raise
+                logger.info('Retrying read of %s after error: %s',
+                            mesos_file, e)
+                time.sleep(_retry_delay(attempt))
+
+    return retrying
+
+
+def _filter_lines(lines, match):
+    """
+    :param lines: lines to filter
+    :type lines: iterable of str
+    :param match: selects lines, or None to select every line
+    :type match: (str -> bool) | None
+    :returns: the selected lines, in order
+    :rtype: [str]
+    """
+
+    if match is None:
+        return list(lines)
+    return [line for line in lines if match(line)]
 
 
 def _strip_trailing_newline(s):
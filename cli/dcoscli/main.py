@@ -1,20 +1,36 @@
+import importlib
 import os
+import pkgutil
 import signal
 import sys
+import threading
+import time
 from functools import wraps
 from subprocess import PIPE, Popen
 
 import dcoscli
 import docopt
-import pkg_resources
-from dcos import (auth, constants, emitting, errors, http, mesos, subcommand,
-                  util)
+from dcos import cache, constants, emitting, errors, util
 from dcos.errors import DCOSAuthenticationException, DCOSException
-from dcoscli import analytics
 
 logger = util.get_logger(__name__)
 emitter = emitting.FlatEmitter()
 
+CLUSTER_ID_REFRESH_INTERVAL = 24 * 60 * 60
+"""Number of seconds after which a cached cluster id is refreshed"""
+
+BUILTIN_COMMANDS = {
+    'config': 'dcoscli.config.main:main',
+    'help': 'dcoscli.help.main:main',
+    'marathon': 'dcoscli.marathon.main:main',
+    'node': 'dcoscli.node.main:main',
+    'package': 'dcoscli.package.main:main',
+    'service': 'dcoscli.service.main:main',
+    'task': 'dcoscli.task.main:main',
+}
+"""Main functions of the subcommands installed with the CLI.  Must match
+the console_scripts entry points in setup.py."""
+
 
 def main():
     try:
@@ -32,6 +48,11 @@ def _main():
         version='dcos version {}'.format(dcoscli.version),
         options_first=True)
 
+    # imported after parsing the arguments, so that `dcos --version` and
+    # usage errors don't load requests
+    from dcos import auth, http, subcommand
+    from dcoscli import analytics
+
     log_level = args['--log-level']
     if log_level and not _config_log_level_environ(log_level):
         return 1
@@ -39,6 +60,9 @@ def _main():
     if args['--debug']:
         os.environ[constants.DCOS_DEBUG_ENV] = 'true'
 
+    if args['--no-cache']:
+        os.environ[constants.DCOS_NO_CACHE_ENV] = 'true'
+
     util.configure_process_from_environ()
 
     if args['<command>'] != 'config' and \
@@ -59,32 +83,135 @@ def _main():
     cluster_id = None
     if dcoscli.version != 'SNAPSHOT' and command and \
             command not in ["config", "help"]:
+        cluster_id = _get_cluster_id(config)
+
+    # if the cluster_id isn't cached, the call to retrieve it must happen
+    # before we run the subcommand so that if you have auth enabled we don't
+    # ask for user/pass multiple times (with the text being out of order)
+    # before we can cache the auth token
+    argv = [executable, command] + args['<args>']
+
+    function = _builtin_command(executable, command)
+    if function is not None:
+        if dcoscli.version != 'SNAPSHOT':
+            return analytics.run_and_track(function, argv, cluster_id)
+        else:
+            return analytics.run_and_capture(function, argv)[0]
+
+    subproc = Popen(argv, stderr=PIPE)
+
+    if dcoscli.version != 'SNAPSHOT':
+        return analytics.wait_and_track(subproc, cluster_id)
+    else:
+        return analytics.wait_and_capture(subproc)[0]
+
+
+def _builtin_command(executable, command):
+    """Returns the main function of a subcommand that ships with the CLI,
+    so that it can run in this process rather than in a new interpreter.
+
+    :param executable: path to the subcommand's program
+    :type executable: str
+    :param command: the subcommand's noun
+    :type command: str
+    :returns: the subcommand's main function, or None if it isn't built in
+    :rtype: () -> int | None
+    """
+
+    if command not in BUILTIN_COMMANDS or \
+            os.path.dirname(executable) != util.dcos_bin_path():
+        return None
+
+    module_name, function_name = BUILTIN_COMMANDS[command].split(':')
+    try:
+        module = importlib.import_module(module_name)
+    except ImportError:
+        logger.exception('Unable to import [%s]', module_name)
+        return None
+
+    return getattr(module, function_name)
+
+
+def _get_cluster_id(config):
+    """Returns the id of the cluster at 'core.dcos_url'.  The id is cached
+    per URL, so it is only fetched before running the command when it
+    isn't cached yet, e.g. after the URL changes.  A cached id older than
+    CLUSTER_ID_REFRESH_INTERVAL is refreshed in the background.
+
+    :param config: configuration
+    :type config: Toml
+    :returns: the cluster id, or None if it couldn't be fetched
+    :rtype: str | None
+    """
+
+    dcos_url = config.get('core.dcos_url')
+    entry = None
+    if dcos_url is not None and cache.enabled():
+        entry = cache.load('cluster_id', dcos_url)
+
+    if entry is None:
         try:
-            cluster_id = mesos.DCOSClient().metadata().get('CLUSTER_ID')
+            return _fetch_cluster_id(dcos_url)
         except DCOSAuthenticationException:
-                raise
+            raise
         except:
             msg = 'Unable to get the cluster_id of the cluster.'
             logger.exception(msg)
+            return None
 
-    # the call to retrieve cluster_id must happen before we run the subcommand
-    # so that if you have auth enabled we don't ask for user/pass multiple
-    # times (with the text being out of order) before we can cache the auth
-    # token
-    subproc = Popen([executable,  command] + args['<args>'],
-                    stderr=PIPE)
+    if time.time() - entry['fetched'] > CLUSTER_ID_REFRESH_INTERVAL:
+        thread = threading.Thread(target=_refresh_cluster_id,
+                                  args=(dcos_url,))
+        thread.daemon = True
+        thread.start()
 
-    if dcoscli.version != 'SNAPSHOT':
-        return analytics.wait_and_track(subproc, cluster_id)
-    else:
-        return analytics.wait_and_capture(subproc)[0]
+    return entry['cluster_id']
+
+
+def _fetch_cluster_id(dcos_url, interactive=True):
+    """Fetches the cluster id from the metadata endpoint and caches it.
+
+    :param dcos_url: value of 'core.dcos_url'
+    :type dcos_url: str | None
+    :param interactive: whether to prompt for credentials if the
+                        request must be authenticated
+    :type interactive: bool
+    :returns: the cluster id
+    :rtype: str | None
+    """
+
+    from dcos import mesos
+
+    client = mesos.DCOSClient()
+    cluster_id = client.metadata(interactive).get('CLUSTER_ID')
+    if dcos_url is not None:
+        cache.store('cluster_id',
+                    dcos_url,
+                    {'fetched': time.time(), 'cluster_id': cluster_id})
+    return cluster_id
+
+
+def _refresh_cluster_id(dcos_url):
+    """Refreshes the cached cluster id.  Runs in the background while the
+    command executes, so it never prompts for credentials and only logs
+    errors.
+
+    :param dcos_url: value of 'core.dcos_url'
+    :type dcos_url: str
+    :rtype: None
+    """
+
+    try:
+        _fetch_cluster_id(dcos_url, interactive=False)
+    except:
+        logger.exception('Unable to refresh the cluster_id of the cluster.')
 
 
 def _doc():
     """
     :rtype: str
     """
-    return pkg_resources.resource_string(
+    return pkgutil.get_data(
         'dcoscli',
         'data/help/dcos.txt').decode('utf-8')
 
@@ -1,19 +1,46 @@
+import collections
+import fnmatch
+import gzip
 import json
 import os
+import pkgutil
 import sys
+import threading
 import time
+import zlib
 
+import concurrent.futures
 import dcoscli
 import docopt
-import pkg_resources
-from dcos import cmds, emitting, http, jsonitem, marathon, options, util
+from dcos import (cache, cmds, emitting, errors, http, jsonitem, marathon,
+                  options, util)
 from dcos.errors import DCOSException
 from dcoscli import tables
 from dcoscli.main import decorate_docopt_usage
+from six.moves import urllib
 
 logger = util.get_logger(__name__)
 emitter = emitting.FlatEmitter()
 
+BATCH_OPERATIONS = ['start', 'stop', 'restart', 'remove', 'kill']
+"""Operations supported by `dcos marathon app batch`"""
+
+DEPLOYMENT_POLL_INTERVAL = 1
+"""Seconds between checks of a deployment, when it can't be followed in
+Marathon's event stream"""
+
+APPLY_EXACT_FIELDS = ['acceptedResourceRoles', 'args', 'constraints',
+                      'dependencies', 'env', 'labels', 'secrets', 'uris']
+"""App fields made only of user data, which Marathon never adds defaults
+to.  `dcos marathon apply` compares them exactly, so that removing an
+entry from one is applied."""
+
+RESOURCE_CHUNK_SIZE = 64 * 1024
+"""Number of bytes read at a time when downloading a resource"""
+
+RESOURCE_CACHE_NAMESPACE = 'marathon-resource'
+"""Cache namespace of downloaded resources, keyed by URL"""
+
 
 def main():
     try:
@@ -38,7 +65,7 @@ def _doc():
     """
     :rtype: str
     """
-    return pkg_resources.resource_string(
+    return pkgutil.get_data(
         'dcoscli',
         'data/help/marathon.txt').decode('utf-8')
 
@@ -105,14 +132,21 @@ def _cmds():
             arg_keys=['<app-id>', '--app-version'],
             function=_show),
 
+        cmds.Command(
+            hierarchy=['marathon', 'app', 'batch'],
+            arg_keys=BATCH_OPERATIONS + ['<app-selector>', '--force',
+                                         '--instances', '--scale',
+                                         '--parallel', '--rate'],
+            function=_batch),
+
         cmds.Command(
             hierarchy=['marathon', 'app', 'start'],
-            arg_keys=['<app-id>', '<instances>', '--force'],
+            arg_keys=['<app-id>', '<instances>', '--force', '--wait'],
             function=_start),
 
         cmds.Command(
             hierarchy=['marathon', 'app', 'stop'],
-            arg_keys=['<app-id>', '--force'],
+            arg_keys=['<app-id>', '--force', '--wait'],
             function=_stop),
 
         cmds.Command(
@@ -122,7 +156,7 @@ def _cmds():
 
         cmds.Command(
             hierarchy=['marathon', 'app', 'restart'],
-            arg_keys=['<app-id>', '--force'],
+            arg_keys=['<app-id>', '--force', '--wait'],
             function=_restart),
 
         cmds.Command(
@@ -160,6 +194,16 @@ def _cmds():
             arg_keys=['<group-id>', '<scale-factor>', '--force'],
             function=_group_scale),
 
+        cmds.Command(
+            hierarchy=['marathon', 'apply'],
+            arg_keys=['<definition>', '--dry-run', '--force', '--parallel'],
+            function=_apply),
+
+        cmds.Command(
+            hierarchy=['marathon', 'events'],
+            arg_keys=['--event-type', '--json'],
+            function=_events),
+
         cmds.Command(
             hierarchy=['marathon', 'about'],
             arg_keys=[],
@@ -226,19 +270,15 @@ def _get_resource(resource):
     """
     if resource is not None:
         if os.path.isfile(resource):
+            if resource.endswith('.gz'):
+                with gzip.open(resource, 'rb') as resource_file:
+                    return util.load_jsons(
+                        resource_file.read().decode('utf-8'))
             with util.open_file(resource) as resource_file:
                 return util.load_json(resource_file)
         else:
             try:
-                http.silence_requests_warnings()
-                req = http.get(resource)
-                if req.status_code == 200:
-                    data = b''
-                    for chunk in req.iter_content(1024):
-                        data += chunk
-                    return util.load_jsons(data.decode('utf-8'))
-                else:
-                    raise Exception
+                return _fetch_resource(resource)
             except Exception:
                 logger.exception('Cannot read from resource %s', resource)
                 raise DCOSException(
@@ -257,6 +297,69 @@ def _get_resource(resource):
     return util.load_json(sys.stdin)
 
 
+def _fetch_resource(url):
+    """Downloads the resource at `url` over the pooled HTTP session.  The
+    resource is cached with its ETag, so that it is only downloaded again
+    once it changes.  URLs ending in .gz are decompressed as they stream
+    in; compressed transfer encodings are handled by requests.
+
+    :param url: http(s) url of the resource
+    :type url: str
+    :returns: resource
+    :rtype: dict | list
+    """
+
+    entry = None
+    if cache.enabled():
+        entry = cache.load(RESOURCE_CACHE_NAMESPACE, url)
+
+    headers = {'Accept': 'application/json'}
+    if entry is not None:
+        headers['If-None-Match'] = entry['etag']
+
+    def is_success(status_code):
+        return status_code == 200 or \
+            (entry is not None and status_code == 304)
+
+    http.silence_requests_warnings()
+    response = http.get(url,
+                        is_success=is_success,
+                        headers=headers,
+                        stream=True)
+    try:
+        if response.status_code == 304:
+            logger.info('Cached resource for [%s] is still valid', url)
+            return entry['resource']
+
+        chunks = response.iter_content(RESOURCE_CHUNK_SIZE)
+        if urllib.parse.urlparse(url).path.endswith('.gz'):
+            chunks = _gunzip(chunks)
+        resource = util.load_jsons(b''.join(chunks).decode('utf-8'))
+    finally:
+        response.close()
+
+    etag = response.headers.get('ETag')
+    if etag and cache.enabled():
+        cache.store(RESOURCE_CACHE_NAMESPACE, url,
+                    {'etag': etag, 'resource': resource})
+    return resource
+
+
+def _gunzip(chunks):
+    """
+    :param chunks: gzip compressed data
+    :type chunks: iterator over bytes
+    :returns: the decompressed data
+    :rtype: iterator over bytes
+    """
+
+    # 16 selects the gzip header and trailer
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        yield decompressor.decompress(chunk)
+    yield decompressor.flush()
+
+
 def _add(app_resource):
     """
     :param app_resource: optional filename for the application resource
@@ -444,7 +547,7 @@ def _group_update(group_id, properties, force):
     return 0
 
 
-def _start(app_id, instances, force):
+def _start(app_id, instances, force, wait):
     """Start a Marathon application.
 
     :param app_id: the id for the application
@@ -453,6 +556,8 @@ def _start(app_id, instances, force):
     :type instances: str
     :param force: whether to override running deployments
     :type force: bool
+    :param wait: whether to wait for the deployment to finish
+    :type wait: bool
     :returns: process return code
     :rtype: int
     """
@@ -485,20 +590,25 @@ def _start(app_id, instances, force):
 
     app_json['instances'] = instances
 
+    events = _deployment_events(client) if wait else None
     deployment = client.update_app(app_id, app_json, force)
 
     emitter.publish('Created deployment {}'.format(deployment))
 
+    if wait:
+        return _wait_for_deployment(client, events, deployment)
     return 0
 
 
-def _stop(app_id, force):
+def _stop(app_id, force, wait):
     """Stop a Marathon application
 
     :param app_id: the id of the application
     :type app_id: str
     :param force: whether to override running deployments
     :type force: bool
+    :param wait: whether to wait for the deployment to finish
+    :type wait: bool
     :returns: process return code
     :rtype: int
     """
@@ -517,10 +627,274 @@ def _stop(app_id, force):
 
     app_json = {'instances': 0}
 
+    events = _deployment_events(client) if wait else None
     deployment = client.update_app(app_id, app_json, force)
 
     emitter.publish('Created deployment {}'.format(deployment))
 
+    if wait:
+        return _wait_for_deployment(client, events, deployment)
+
+
+def _batch(start, stop, restart, remove, kill, selectors, force,
+           instances, scale, parallel, rate):
+    """Runs one operation on many apps concurrently.
+
+    :param start: whether to scale the apps to `instances`
+    :type start: bool
+    :param stop: whether to scale the apps to 0
+    :type stop: bool
+    :param restart: whether to restart the apps
+    :type restart: bool
+    :param remove: whether to remove the apps
+    :type remove: bool
+    :param kill: whether to kill the apps' tasks
+    :type kill: bool
+    :param selectors: app IDs, unix glob patterns, or group prefixes
+                      ending in '/'.  If empty, read from stdin, one per
+                      line.
+    :type selectors: [str]
+    :param force: whether to override running deployments
+    :type force: bool
+    :param instances: number of instances to start
+    :type instances: str
+    :param scale: whether to scale the apps down after killing tasks
+    :type scale: bool
+    :param parallel: maximum number of concurrent operations
+    :type parallel: str
+    :param rate: maximum number of operations started per second
+    :type rate: str | None
+    :returns: process return code; 0 only if every operation succeeded
+    :rtype: int
+    """
+
+    instances = util.parse_int(instances)
+    if instances <= 0:
+        raise DCOSException(
+            'The number of instances must be positive: {!r}.'.format(
+                instances))
+    parallel = _parse_parallel(parallel)
+    limiter = _RateLimiter(None if rate is None else util.parse_float(rate))
+
+    if not selectors:
+        if sys.stdin.isatty():
+            raise DCOSException(
+                'Specify the apps to operate on, or pipe their IDs to '
+                'stdin, one per line')
+        selectors = [line.strip() for line in sys.stdin
+                     if line.strip() and not line.startswith('#')]
+
+    client = marathon.create_client()
+    app_ids = _select_apps(client, selectors)
+    if not app_ids:
+        raise DCOSException('No matching apps. Exiting.')
+
+    if start:
+        def operation(app_id):
+            # Like `app start`, never scale down an app that is running
+            desc = client.get_app(app_id)
+            if desc['instances'] > 0:
+                raise DCOSException(
+                    'Application {!r} already started: {!r} '
+                    'instances.'.format(app_id, desc['instances']))
+            return _describe_deployment(
+                client.scale_app(app_id, instances, force))
+    elif stop:
+        def operation(app_id):
+            return _describe_deployment(client.scale_app(app_id, 0, force))
+    elif restart:
+        def operation(app_id):
+            return _describe_deployment(
+                client.restart_app(app_id, force)['deploymentId'])
+    elif remove:
+        def operation(app_id):
+            client.remove_app(app_id, force)
+            return 'Removed'
+    else:
+        def operation(app_id):
+            return _describe_kill(client.kill_tasks(app_id, scale=scale),
+                                  scale)
+
+    return _run_concurrently(operation, app_ids, parallel, limiter)
+
+
+def _run_concurrently(operation, app_ids, parallel, limiter=None):
+    """Applies `operation` to each app, printing each result or error as
+    it completes, followed by a summary.
+
+    :param operation: function of an app ID, returning a message
+                      describing the result
+    :type operation: str -> str
+    :param app_ids: IDs of the apps to operate on
+    :type app_ids: [str]
+    :param parallel: maximum number of concurrent operations
+    :type parallel: int
+    :param limiter: spaces out the operations, if set
+    :type limiter: _RateLimiter | None
+    :returns: process return code; 0 only if every operation succeeded
+    :rtype: int
+    """
+
+    def limited(app_id):
+        if limiter is not None:
+            limiter.wait()
+        return operation(app_id)
+
+    failures = 0
+    with concurrent.futures.ThreadPoolExecutor(parallel) as pool:
+        for job, app_id in util.stream(limited, app_ids, pool):
+            try:
+                result = job.result()
+            except DCOSException as e:
+                failures += 1
+                emitter.publish(errors.DefaultError(
+                    '{}: {}'.format(app_id, e)))
+            else:
+                emitter.publish('{}: {}'.format(app_id, result))
+
+    emitter.publish('{} succeeded, {} failed'.format(
+        len(app_ids) - failures, failures))
+    return 1 if failures else 0
+
+
+def _parse_parallel(parallel):
+    """
+    :param parallel: maximum number of concurrent operations
+    :type parallel: str
+    :returns: the parsed, positive number
+    :rtype: int
+    """
+
+    parallel = util.parse_int(parallel)
+    if parallel <= 0:
+        raise DCOSException(
+            'The number of parallel operations must be positive: '
+            '{!r}.'.format(parallel))
+    return parallel
+
+
+def _select_apps(client, selectors):
+    """
+    :param client: Marathon client
+    :type client: dcos.marathon.Client
+    :param selectors: app IDs, unix glob patterns, or group prefixes
+                      ending in '/'
+    :type selectors: [str]
+    :returns: IDs of the selected apps, without duplicates.  Exact IDs
+              are returned as given, without checking that they exist.
+    :rtype: [str]
+    """
+
+    selectors = ['/' + selector.lstrip('/') for selector in selectors]
+    patterns = [selector for selector in selectors
+                if selector.endswith('/') or
+                any(char in selector for char in '*?[')]
+
+    app_ids = []
+    if patterns:
+        # A common prefix lets Marathon filter the list
+        prefix = os.path.commonprefix(
+            [_glob_prefix(pattern) for pattern in patterns])
+        for app in client.iter_apps(app_id=prefix or None):
+            if any(_app_selected(app['id'], pattern)
+                   for pattern in patterns):
+                app_ids.append(app['id'])
+
+    app_ids.extend(selector for selector in selectors
+                   if selector not in patterns)
+
+    return list(collections.OrderedDict.fromkeys(app_ids))
+
+
+def _glob_prefix(pattern):
+    """
+    :param pattern: unix glob pattern or group prefix
+    :type pattern: str
+    :returns: the literal text before the first wildcard in `pattern`
+    :rtype: str
+    """
+
+    for index, char in enumerate(pattern):
+        if char in '*?[':
+            return pattern[:index]
+    return pattern
+
+
+def _app_selected(app_id, pattern):
+    """
+    :param app_id: ID of an app
+    :type app_id: str
+    :param pattern: unix glob pattern or group prefix ending in '/'
+    :type pattern: str
+    :returns: whether `pattern` selects `app_id`
+    :rtype: bool
+    """
+
+    if pattern.endswith('/'):
+        return app_id.startswith(pattern)
+    return fnmatch.fnmatchcase(app_id, pattern)
+
+
+def _describe_deployment(deployment_id):
+    """
+    :param deployment_id: ID of a deployment
+    :type deployment_id: str
+    :returns: message describing the deployment
+    :rtype: str
+    """
+
+    return 'Created deployment {}'.format(deployment_id)
+
+
+def _describe_kill(payload, scale):
+    """
+    :param payload: response to killing an app's tasks
+    :type payload: dict
+    :param scale: whether the app was scaled down
+    :type scale: bool
+    :returns: message describing the result
+    :rtype: str
+    """
+
+    if scale:
+        return 'Started deployment: {}'.format(payload)
+    return 'Killed tasks: {}'.format(payload.get('tasks', []))
+
+
+class _RateLimiter(object):
+    """Spaces out operations started from any thread
+
+    :param rate: maximum number of operations per second, or None for no
+                 limit
+    :type rate: float | None
+    """
+
+    def __init__(self, rate):
+        if rate is not None and rate <= 0:
+            raise DCOSException(
+                'The rate must be positive: {!r}.'.format(rate))
+
+        self._interval = 1.0 / rate if rate else 0
+        self._lock = threading.Lock()
+        self._next = 0
+
+    def wait(self):
+        """Blocks until the next operation may start.
+
+        :rtype: None
+        """
+
+        if not self._interval:
+            return
+
+        with self._lock:
+            now = time.time()
+            start = max(now, self._next)
+            self._next = start + self._interval
+
+        if start > now:
+            time.sleep(start - now)
+
 
 def _update(app_id, properties, force):
     """
@@ -597,12 +971,14 @@ def _parse_properties(properties):
     return resource_json
 
 
-def _restart(app_id, force):
+def _restart(app_id, force, wait):
     """
     :param app_id: the id of the application
     :type app_id: str
     :param force: whether to override running deployments
     :type force: bool
+    :param wait: whether to wait for the deployment to finish
+    :type wait: bool
     :returns: process return code
     :rtype: int
     """
@@ -620,9 +996,13 @@ def _restart(app_id, force):
                 desc['instances']))
         return 1
 
+    events = _deployment_events(client) if wait else None
     payload = client.restart_app(app_id, force)
 
     emitter.publish('Created deployment {}'.format(payload['deploymentId']))
+
+    if wait:
+        return _wait_for_deployment(client, events, payload['deploymentId'])
     return 0
 
 
@@ -733,10 +1113,14 @@ def _deployment_rollback(deployment_id):
 
 
 def _deployment_watch(deployment_id, max_count, interval):
-    """
+    """Prints a deployment each time it progresses, until it finishes.
+    Progress is read from Marathon's event stream.  If the event stream is
+    unavailable, or is lost for good, the deployment is polled every
+    `interval` seconds instead.
+
     :param deployment_id: the application id
     :type deployment_di: str
-    :param max_count: maximum number of polling calls
+    :param max_count: maximum number of updates to print
     :type max_count: str
     :param interval: wait interval in seconds between polling calls
     :type interval: str
@@ -750,6 +1134,7 @@ def _deployment_watch(deployment_id, max_count, interval):
     interval = 1 if interval is None else util.parse_int(interval)
 
     client = marathon.create_client()
+    events = _deployment_events(client)
 
     count = 0
     while max_count is None or count < max_count:
@@ -757,21 +1142,312 @@ def _deployment_watch(deployment_id, max_count, interval):
 
         if deployment is None:
             return 0
-        if util.is_windows_platform():
-            os.system('cls')
-        else:
-            if 'TERM' in os.environ:
-                os.system('clear')
+        _clear_screen()
         emitter.publish('Deployment update time: '
                         '{} \n'.format(time.strftime("%Y-%m-%d %H:%M:%S",
                                                      time.gmtime())))
         emitter.publish(deployment)
-        time.sleep(interval)
         count += 1
 
+        if events is not None:
+            try:
+                event = _next_deployment_event(events, deployment_id)
+            except DCOSException:
+                logger.exception('Lost the event stream; polling')
+                events = None
+            else:
+                if event.type == 'deployment_success':
+                    return 0
+                elif event.type == 'deployment_failed':
+                    raise DCOSException(
+                        'Deployment {} failed'.format(deployment_id))
+                continue
+
+        time.sleep(interval)
+
+    return 0
+
+
+def _deployment_events(client):
+    """Subscribes to deployment events.  Subscribe before starting a
+    deployment, so that its events can't be missed.
+
+    :param client: Marathon client
+    :type client: dcos.marathon.Client
+    :returns: deployment events, or None if the event stream is
+              unavailable, e.g. because it is disabled in Marathon
+    :rtype: generator of dcos.marathon.Event | None
+    """
+
+    try:
+        return client.events(marathon.DEPLOYMENT_EVENTS)
+    except DCOSException:
+        logger.exception('Unable to read the event stream; polling')
+        return None
+
+
+def _wait_for_deployment(client, events, deployment_id):
+    """Waits until a deployment finishes.  If the event stream is
+    unavailable, or is lost, the deployment is polled every
+    DEPLOYMENT_POLL_INTERVAL seconds instead.
+
+    :param client: Marathon client
+    :type client: dcos.marathon.Client
+    :param events: deployment events, subscribed to before the deployment
+                   started, or None to poll
+    :type events: generator of dcos.marathon.Event | None
+    :param deployment_id: the deployment id
+    :type deployment_id: str
+    :returns: process return code
+    :rtype: int
+    """
+
+    while events is not None:
+        try:
+            event = _next_deployment_event(events, deployment_id)
+        except DCOSException:
+            logger.exception('Lost the event stream; polling')
+            break
+
+        if event.type == 'deployment_success':
+            emitter.publish('Deployment {} succeeded'.format(deployment_id))
+            return 0
+        elif event.type == 'deployment_failed':
+            raise DCOSException(
+                'Deployment {} failed'.format(deployment_id))
+        elif (event.type == marathon.RECONNECTED_EVENT and
+              client.get_deployment(deployment_id) is None):
+            # it finished while the stream was disconnected
+            emitter.publish('Deployment {} finished'.format(deployment_id))
+            return 0
+
+    # Marathon forgets a deployment once it finishes, whatever the outcome
+    while client.get_deployment(deployment_id) is not None:
+        time.sleep(DEPLOYMENT_POLL_INTERVAL)
+    emitter.publish('Deployment {} finished'.format(deployment_id))
+    return 0
+
+
+def _next_deployment_event(events, deployment_id):
+    """
+    :param events: deployment events
+    :type events: generator of dcos.marathon.Event
+    :param deployment_id: the deployment id
+    :type deployment_id: str
+    :returns: the next event about `deployment_id`, or that marks a gap
+              in `events`
+    :rtype: dcos.marathon.Event
+    """
+
+    for event in events:
+        if event.type == marathon.RECONNECTED_EVENT:
+            return event
+
+        plan_id = event.get('plan', {}).get('id')
+        if deployment_id in (event.get('id'), plan_id):
+            return event
+
+    raise DCOSException('The Marathon event stream ended')
+
+
+def _clear_screen():
+    """Clears the terminal, if stdout is one.
+
+    :rtype: None
+    """
+
+    if util.is_windows_platform():
+        os.system('cls')
+    elif sys.stdout.isatty():
+        sys.stdout.write('\x1b[2J\x1b[H')
+
+
+def _apply(definitions, dry_run, force, parallel):
+    """Creates or updates apps so that they match their definitions.
+    Current state is fetched with a single request, and only the apps that
+    differ from their definition are sent to Marathon.
+
+    :param definitions: files or directories of files containing app
+                        definitions, or http(s) urls
+    :type definitions: [str]
+    :param dry_run: whether to only print the plan
+    :type dry_run: bool
+    :param force: whether to override running deployments
+    :type force: bool
+    :param parallel: maximum number of concurrent requests
+    :type parallel: str
+    :returns: process return code
+    :rtype: int
+    """
+
+    parallel = _parse_parallel(parallel)
+    desired = _load_definitions(definitions)
+
+    client = marathon.create_client()
+    current = {app['id']: app for app in client.get_apps()}
+
+    creates = []
+    updates = collections.OrderedDict()
+    unchanged = 0
+    for app_id, definition in desired.items():
+        if app_id not in current:
+            creates.append(app_id)
+            emitter.publish('+ {}'.format(app_id))
+            continue
+
+        changes = _diff_app(current[app_id], definition)
+        if changes:
+            updates[app_id] = changes
+            emitter.publish('~ {} ({})'.format(
+                app_id, ', '.join(sorted(changes))))
+        else:
+            unchanged += 1
+
+    emitter.publish('Plan: {} to create, {} to update, {} unchanged'.format(
+        len(creates), len(updates), unchanged))
+
+    if dry_run or not (creates or updates):
+        return 0
+
+    def operation(app_id):
+        if app_id in updates:
+            return _describe_deployment(
+                client.update_app(app_id, updates[app_id], force))
+
+        client.add_app(desired[app_id])
+        return 'Created'
+
+    return _run_concurrently(operation, creates + list(updates), parallel)
+
+
+def _load_definitions(definitions):
+    """
+    :param definitions: files or directories of files containing app
+                        definitions, or http(s) urls.  A file may contain
+                        a single app or a list of apps.  Only the *.json
+                        files of a directory are read.
+    :type definitions: [str]
+    :returns: the app definitions, by normalized app ID
+    :rtype: collections.OrderedDict
+    """
+
+    resources = []
+    for definition in definitions:
+        if os.path.isdir(definition):
+            resources.extend(
+                os.path.join(definition, name)
+                for name in sorted(os.listdir(definition))
+                if name.endswith('.json'))
+        else:
+            resources.append(definition)
+
+    apps = collections.OrderedDict()
+    for resource in resources:
+        loaded = _get_resource(resource)
+        for app in loaded if isinstance(loaded, list) else [loaded]:
+            if not isinstance(app, dict) or 'id' not in app:
+                raise DCOSException(
+                    'App definition in {} has no id'.format(resource))
+
+            app_id = '/' + app['id'].strip('/')
+            if app_id in apps:
+                raise DCOSException(
+                    'App {} is defined more than once'.format(app_id))
+            apps[app_id] = dict(app, id=app_id)
+
+    return apps
+
+
+def _diff_app(current, definition):
+    """Compares an app definition with the app's current state.  Fields
+    that are absent from the definition are left to Marathon and never
+    reported as changed.  Fields in APPLY_EXACT_FIELDS must equal the
+    current value.  Other fields only need to match where the definition
+    sets them, because Marathon fills in defaults inside them, e.g. in
+    `container`.
+
+    :param current: the app as returned by Marathon
+    :type current: dict
+    :param definition: the desired definition of the app
+    :type definition: dict
+    :returns: the changed top-level fields of `definition`, with their
+              desired values
+    :rtype: dict
+    """
+
+    def unchanged(key, value):
+        if key in APPLY_EXACT_FIELDS:
+            return value == current.get(key)
+        return _is_subset(value, current.get(key))
+
+    return {key: value for key, value in definition.items()
+            if key not in ('id', 'version') and not unchanged(key, value)}
+
+
+def _is_subset(desired, current):
+    """
+    :param desired: desired JSON value
+    :type desired: object
+    :param current: current JSON value
+    :type current: object
+    :returns: whether `current` has every field of `desired`, recursively,
+              with the same value
+    :rtype: bool
+    """
+
+    if isinstance(desired, dict):
+        return (isinstance(current, dict) and
+                all(key in current and _is_subset(value, current[key])
+                    for key, value in desired.items()))
+    if isinstance(desired, list):
+        return (isinstance(current, list) and
+                len(desired) == len(current) and
+                all(_is_subset(d, c) for d, c in zip(desired, current)))
+    return desired == current
+
+
+def _events(event_type, json_):
+    """Prints Marathon events as they happen.
+
+    :param event_type: types of events to print, or all if empty
+    :type event_type: [str]
+    :param json_: output json if True
+    :type json_: bool
+    :returns: process return code
+    :rtype: int
+    """
+
+    client = marathon.create_client()
+
+    for event in client.events(event_type or None):
+        if json_:
+            emitter.publish(event.dict())
+        else:
+            emitter.publish(_event_summary(event))
+        # See dcoscli.log._follow_files
+        sys.stdout.flush()
+
     return 0
 
 
+def _event_summary(event):
+    """
+    :param event: Marathon event
+    :type event: dcos.marathon.Event
+    :returns: a one line description of `event`
+    :rtype: str
+    """
+
+    fields = [event.get('timestamp'), event.type]
+    for key in ['appId', 'taskId', 'taskStatus', 'id']:
+        if event.get(key) is not None:
+            fields.append('{}={}'.format(key, event[key]))
+    if 'plan' in event.dict() and 'id' not in event.dict():
+        fields.append('id={}'.format(event['plan'].get('id')))
+
+    return ' '.join(field for field in fields if field)
+
+
 def _task_list(app_id, json_):
     """
     :param app_id: the id of the application
@@ -850,6 +1526,6 @@ def _cli_config_schema():
     :rtype: dict
     """
     return json.loads(
-        pkg_resources.resource_string(
+        pkgutil.get_data(
             'dcoscli',
             'data/config-schema/marathon.json').decode('utf-8'))
@@ -1,9 +1,9 @@
 import os
+import pkgutil
 import subprocess
 
 import dcoscli
 import docopt
-import pkg_resources
 from dcos import cmds, emitting, errors, mesos, util
 from dcos.errors import DCOSException, DefaultError
 from dcoscli import log, tables
@@ -36,7 +36,7 @@ def _doc():
     """
     :rtype: str
     """
-    return pkg_resources.resource_string(
+    return pkgutil.get_data(
         'dcoscli',
         'data/help/node.txt').decode('utf-8')
 
@@ -55,7 +55,8 @@ def _cmds():
 
         cmds.Command(
             hierarchy=['node', 'log'],
-            arg_keys=['--follow', '--lines', '--master', '--slave'],
+            arg_keys=['--follow', '--lines', '--master', '--slave', '--grep',
+                      '--invert-match'],
             function=_log),
 
         cmds.Command(
@@ -105,7 +106,7 @@ def _list(json_):
             emitter.publish(errors.DefaultError('No slaves found.'))
 
 
-def _log(follow, lines, master, slave):
+def _log(follow, lines, master, slave, grep, invert_match):
     """ Prints the contents of master and slave logs.
 
     :param follow: same as unix tail's -f
@@ -116,6 +117,10 @@ def _log(follow, lines, master, slave):
     :type master: bool
     :param slave: the slave ID to print
     :type slave: str | None
+    :param grep: only print lines matching this regular expression
+    :type grep: str | None
+    :param invert_match: only print lines that don't match `grep`
+    :type invert_match: bool
     :returns: process return code
     :rtype: int
     """
@@ -124,10 +129,11 @@ def _log(follow, lines, master, slave):
         raise DCOSException('You must choose one of --master or --slave.')
 
     lines = util.parse_int(lines)
+    match = log.line_filter(grep, invert_match)
 
     mesos_files = _mesos_files(master, slave)
 
-    log.log_files(mesos_files, follow, lines)
+    log.log_files(mesos_files, follow, lines, match=match)
 
     return 0
 
@@ -148,7 +154,8 @@ def _mesos_files(master, slave_id):
     if master:
         files.append(mesos.MesosFile('/master/log'))
     if slave_id:
-        slave = mesos.get_master().slave(slave_id)
+        slave = mesos.get_master(
+            sections=mesos.SLAVE_SECTIONS).slave(slave_id)
         files.append(mesos.MesosFile('/slave/log', slave=slave))
     return files
 
@@ -1,6 +1,7 @@
 import hashlib
 import json
 import os
+import pkgutil
 import sys
 import tempfile
 import zipfile
@@ -8,7 +9,6 @@ from collections import defaultdict
 
 import dcoscli
 import docopt
-import pkg_resources
 from dcos import (cmds, cosmospackage, emitting, errors, http, options,
                   package, subcommand, util)
 from dcos.errors import DCOSException
@@ -29,7 +29,7 @@ def main():
 
 
 def _doc():
-    return pkg_resources.resource_string(
+    return pkgutil.get_data(
         'dcoscli',
         'data/help/package.txt').decode('utf-8')
 
@@ -114,7 +114,7 @@ def _package(config_schema, info):
     """
     if config_schema:
         schema = json.loads(
-            pkg_resources.resource_string(
+            pkgutil.get_data(
                 'dcoscli',
                 'data/config-schema/package.json').decode('utf-8'))
         emitter.publish(schema)
@@ -603,7 +603,7 @@ def _validate_json_file(fullpath):
              'directory [{}]').format(fullpath))
 
     special_schema = util.load_jsons(
-        pkg_resources.resource_string('dcoscli', schema_path).decode('utf-8'))
+        pkgutil.get_data('dcoscli', schema_path).decode('utf-8'))
 
     with util.open_file(fullpath) as special_file:
         special_json = util.load_json(special_file)
@@ -1,8 +1,8 @@
+import pkgutil
 import subprocess
 
 import dcoscli
 import docopt
-import pkg_resources
 from dcos import cmds, emitting, marathon, mesos, util
 from dcos.errors import DCOSException, DefaultError
 from dcoscli import log, tables
@@ -35,7 +35,7 @@ def _doc():
     """
     :rtype: str
     """
-    return pkg_resources.resource_string(
+    return pkgutil.get_data(
         'dcoscli',
         'data/help/service.txt').decode('utf-8')
 
@@ -94,7 +94,8 @@ def _service(inactive, completed, is_json):
     :rtype: int
     """
 
-    services = mesos.get_master().frameworks(
+    master = mesos.get_master(sections=mesos.FRAMEWORK_SECTIONS)
+    services = master.frameworks(
         inactive=inactive,
         completed=completed)
 
@@ -197,7 +198,9 @@ def _log_task(task_id, follow, lines, file_):
     """
 
     dcos_client = mesos.DCOSClient()
-    task = mesos.get_master(dcos_client).task(task_id)
+    task = mesos.get_master(
+        dcos_client,
+        mesos.FRAMEWORK_SECTIONS + mesos.SLAVE_SECTIONS).task(task_id)
     mesos_file = mesos.MesosFile(file_, task=task, dcos_client=dcos_client)
     return log.log_files([mesos_file], follow, lines)
 
@@ -1,8 +1,8 @@
+import pkgutil
 import posixpath
 
 import dcoscli
 import docopt
-import pkg_resources
 from dcos import cmds, emitting, mesos, util
 from dcos.errors import DCOSException, DCOSHTTPException, DefaultError
 from dcoscli import log, tables
@@ -35,7 +35,7 @@ def _doc():
     """
     :rtype: str
     """
-    return pkg_resources.resource_string(
+    return pkgutil.get_data(
         'dcoscli',
         'data/help/task.txt').decode('utf-8')
 
@@ -54,10 +54,16 @@ def _cmds():
 
         cmds.Command(
             hierarchy=['task', 'log'],
-            arg_keys=['--follow', '--completed', '--lines', '<task>',
+            arg_keys=['--follow', '--completed', '--lines', '--merge',
+                      '--grep', '--invert-match', '--resume', '<task>',
                       '<file>'],
             function=_log),
 
+        cmds.Command(
+            hierarchy=['task', 'download'],
+            arg_keys=['<task>', '<file>', '--parallel'],
+            function=_download),
+
         cmds.Command(
             hierarchy=['task', 'ls'],
             arg_keys=['<task>', '<path>', '--long'],
@@ -97,7 +103,9 @@ def _task(fltr, completed, json_):
     if fltr is None:
         fltr = ""
 
-    tasks = sorted(mesos.get_master().tasks(completed=completed, fltr=fltr),
+    master = mesos.get_master(
+        sections=mesos.FRAMEWORK_SECTIONS + mesos.SLAVE_SECTIONS)
+    tasks = sorted(master.tasks(completed=completed, fltr=fltr),
                    key=lambda task: task['name'])
 
     if json_:
@@ -111,7 +119,8 @@ def _task(fltr, completed, json_):
     return 0
 
 
-def _log(follow, completed, lines, task, file_):
+def _log(follow, completed, lines, merge, grep, invert_match, resume, task,
+         file_):
     """ Tail a file in the task's sandbox.
 
     :param follow: same as unix tail's -f
@@ -120,6 +129,16 @@ def _log(follow, completed, lines, task, file_):
     :type completed: bool
     :param lines: number of lines to print
     :type lines: int
+    :param merge: whether to interleave the lines of all tasks by
+                  timestamp
+    :type merge: bool
+    :param grep: only print lines matching this regular expression
+    :type grep: str | None
+    :param invert_match: only print lines that don't match `grep`
+    :type invert_match: bool
+    :param resume: whether to continue from where the last run with
+                   `resume` stopped
+    :type resume: bool
     :param task: task pattern to match
     :type task: str
     :param file_: file path to read
@@ -137,10 +156,12 @@ def _log(follow, completed, lines, task, file_):
         file_ = 'stdout'
 
     lines = util.parse_int(lines)
+    match = log.line_filter(grep, invert_match)
 
     # get tasks
     client = mesos.DCOSClient()
-    master = mesos.Master(client.get_master_state())
+    master = mesos.Master(client.get_master_state(
+        mesos.FRAMEWORK_SECTIONS + mesos.SLAVE_SECTIONS))
     tasks = master.tasks(completed=completed, fltr=fltr)
 
     if not tasks:
@@ -162,7 +183,7 @@ def _log(follow, completed, lines, task, file_):
     if not mesos_files:
         raise DCOSException('No matching tasks. Exiting.')
 
-    log.log_files(mesos_files, follow, lines)
+    log.log_files(mesos_files, follow, lines, merge, match, resume)
 
     return 0
 
@@ -186,7 +207,9 @@ def _ls(task, path, long_):
         path = path[1:]
 
     dcos_client = mesos.DCOSClient()
-    task_obj = mesos.get_master(dcos_client).task(task)
+    task_obj = mesos.get_master(
+        dcos_client,
+        mesos.FRAMEWORK_SECTIONS + mesos.SLAVE_SECTIONS).task(task)
     dir_ = posixpath.join(task_obj.directory(), path)
 
     try:
@@ -207,6 +230,52 @@ def _ls(task, path, long_):
                           for file_ in files))
 
 
+def _download(task, file_, parallel):
+    """ Download a file from a task's sandbox into the current directory.
+
+    :param task: task pattern to match
+    :type task: str
+    :param file_: file path to download, relative to the sandbox
+    :type file_: str
+    :param parallel: number of parts of the file to download at once
+    :type parallel: str
+    :returns: process return code
+    :rtype: int
+    """
+
+    parallel = util.parse_int(parallel)
+    if parallel < 1:
+        raise DCOSException('--parallel must be at least 1')
+
+    if file_.startswith('/'):
+        file_ = file_[1:]
+
+    dcos_client = mesos.DCOSClient()
+    task_obj = mesos.get_master(
+        dcos_client,
+        mesos.FRAMEWORK_SECTIONS + mesos.SLAVE_SECTIONS).task(task)
+    mesos_file = mesos.MesosFile(file_, task=task_obj, dcos_client=dcos_client)
+
+    local_path = posixpath.basename(file_)
+    if not local_path:
+        raise DCOSException('[{}] is not a file'.format(file_))
+
+    # check that the file exists before creating the local copy
+    try:
+        mesos_file.size()
+    except DCOSHTTPException as e:
+        if e.response.status_code == 404:
+            raise DCOSException(
+                'Cannot access [{}]: No such file or directory'.format(file_))
+        else:
+            raise
+
+    with util.open_file(local_path, 'wb') as local_file:
+        mesos_file.download(local_file, parallel)
+
+    return 0
+
+
 def _mesos_files(tasks, file_, client):
     """Return MesosFile objects for the specified tasks and file name.
     Only include files that satisfy all of the following:
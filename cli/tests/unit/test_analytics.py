@@ -0,0 +1,59 @@
+import logging
+import sys
+
+from dcoscli import analytics
+
+
+def test_run_and_capture():
+    def main():
+        assert sys.argv == ['dcos-task', 'task', '--info']
+        sys.stderr.write('warning\n')
+        return 3
+
+    argv = sys.argv
+    assert analytics.run_and_capture(main, ['dcos-task', 'task', '--info']) \
+        == (3, 'warning\n')
+    assert sys.argv is argv
+
+
+def test_run_and_capture_exit():
+    def main():
+        sys.exit()
+
+    assert analytics.run_and_capture(main, ['dcos-task']) == (0, '')
+
+
+def test_run_and_capture_exit_message():
+    def main():
+        sys.exit('Usage: dcos task')
+
+    assert analytics.run_and_capture(main, ['dcos-task']) == \
+        (1, 'Usage: dcos task\n')
+
+
+def test_run_and_capture_exception():
+    def main():
+        raise ValueError('bad value')
+
+    exit_code, err = analytics.run_and_capture(main, ['dcos-task'])
+    assert exit_code == 1
+    assert err.startswith('Traceback')
+    assert 'ValueError: bad value' in err
+
+
+def test_run_and_capture_logging():
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(logging.Formatter('%(levelname)s: %(message)s'))
+    logger = logging.getLogger('test_run_and_capture_logging')
+    logger.addHandler(handler)
+
+    def main():
+        logger.warning('slow response')
+        return 0
+
+    try:
+        assert analytics.run_and_capture(main, ['dcos-task']) == \
+            (0, 'WARNING: slow response\n')
+        assert handler.stream is sys.stderr
+    finally:
+        logger.removeHandler(handler)
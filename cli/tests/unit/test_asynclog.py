@@ -0,0 +1,188 @@
+import threading
+import time
+
+from dcos.errors import DCOSConnectionException, DCOSException
+from dcoscli import asynclog, log
+
+import pytest
+
+asyncio = pytest.importorskip('asyncio')
+
+
+class _ScriptedFile(object):
+
+    def __init__(self, name, slave_id, script, delay=0):
+        self.name = name
+        self.script = list(script)
+        self.reads = []
+        self.delay = delay
+        self.cursor = 0
+        self._slave_id = slave_id
+
+    def slave_id(self):
+        return self._slave_id
+
+    def tell(self):
+        return self.cursor
+
+    def seek(self, offset):
+        self.cursor = offset
+
+    def read(self, length):
+        self.reads.append(length)
+        time.sleep(self.delay)
+        if not self.script:
+            raise DCOSException('gone')
+        step = self.script.pop(0)
+        if isinstance(step, Exception):
+            raise step
+        self.cursor += len(step)
+        return step
+
+    def __str__(self):
+        return self.name
+
+
+@pytest.fixture(autouse=True)
+def fast_polls(monkeypatch):
+    monkeypatch.setattr(log, 'FOLLOW_INTERVAL', 0.001)
+    monkeypatch.setattr(log, 'FOLLOW_MAX_INTERVAL', 0.004)
+
+
+def _follow(mesos_files, merger=None, match=None):
+    with pytest.raises(DCOSException) as exc_info:
+        asynclog.follow_files(None, mesos_files, merger, match)
+    assert str(exc_info.value) == 'No files exist. Exiting.'
+
+
+def test_follow_single_file(capsys):
+    mesos_file = _ScriptedFile('file', 'slave', ['a\n', '', '', 'b\nc'])
+
+    _follow([mesos_file])
+
+    assert capsys.readouterr()[0] == 'a\nb\nc\n'
+    assert mesos_file.reads == [asynclog.FOLLOW_READ_SIZE] * 5
+
+
+def test_follow_many_files(capsys):
+    mesos_files = [_ScriptedFile('file-{}'.format(i),
+                                 'slave-{}'.format(i % 3),
+                                 ['{}\n'.format(i), ''])
+                   for i in range(300)]
+
+    _follow(mesos_files)
+
+    out = capsys.readouterr()[0].splitlines()
+    assert sorted(line for line in out if not line.startswith('===>')) == \
+        sorted(str(i) for i in range(300))
+    assert sorted(line for line in out if line.startswith('===>')) == \
+        sorted('===> file-{} <==='.format(i) for i in range(300))
+
+
+def test_follow_holds_partial_lines(monkeypatch, capsys):
+    monkeypatch.setattr(asynclog, 'FOLLOW_READ_SIZE', 4)
+    mesos_file = _ScriptedFile('file', 'slave', ['ab\ncd', 'ef\ng', ''])
+
+    _follow([mesos_file])
+
+    assert capsys.readouterr()[0] == 'ab\ncdef\ng\n'
+
+
+def test_follow_match(capsys):
+    mesos_file = _ScriptedFile('file', 'slave',
+                               ['INFO a\nERROR b\n', 'INFO c\nERR',
+                                'OR d\nERROR e'])
+
+    _follow([mesos_file], match=log.line_filter('ERROR'))
+
+    assert capsys.readouterr()[0] == 'ERROR b\nERROR d\n'
+
+
+def test_follow_limits_reads_per_slave():
+    lock = threading.Lock()
+    active = {'count': 0, 'peak': 0}
+
+    class _CountingFile(_ScriptedFile):
+        def read(self, length):
+            with lock:
+                active['count'] += 1
+                active['peak'] = max(active['peak'], active['count'])
+            try:
+                return super(_CountingFile, self).read(length)
+            finally:
+                with lock:
+                    active['count'] -= 1
+
+    mesos_files = [_CountingFile(str(i), 'slave', ['', ''], delay=0.005)
+                   for i in range(20)]
+
+    _follow(mesos_files)
+
+    assert active['peak'] == log.SLAVE_CONCURRENCY
+    assert all(len(mesos_file.reads) == 3 for mesos_file in mesos_files)
+
+
+def test_follow_propagates_unexpected_errors():
+    class _BrokenFile(_ScriptedFile):
+        def read(self, length):
+            raise ValueError('broken')
+
+    with pytest.raises(ValueError):
+        asynclog.follow_files(None, [_BrokenFile('file', 'slave', [])])
+
+
+def test_log_engine_selection(monkeypatch):
+    calls = []
+    monkeypatch.setattr(asynclog, 'follow_files',
+                        lambda header, files, *args: calls.append(files))
+    monkeypatch.setattr(log.util, 'get_config',
+                        lambda: {'core.log_engine': 'asyncio'})
+
+    mesos_file = _ScriptedFile('file', 'slave', ['a\n'])
+    mesos_file.size = lambda: 2
+    mesos_file.seek = lambda offset: None
+    log.log_files([mesos_file], True, 10)
+
+    assert calls == [[mesos_file]]
+
+
+def test_follow_merge(capsys):
+    class _TaskFile(_ScriptedFile):
+        def task_id(self):
+            return self.name
+
+    a = _TaskFile('a', 'slave', ['2016-03-01 12:00:01 a\n'
+                                 '2016-03-01 12:00:03 a\n'])
+    b = _TaskFile('b', 'slave', ['2016-03-01 12:00:02 b\n'])
+
+    _follow([a, b], log._Merger())
+
+    out = capsys.readouterr()[0]
+    assert sorted(out.splitlines()) == [
+        '[a] 2016-03-01 12:00:01 a',
+        '[a] 2016-03-01 12:00:03 a',
+        '[b] 2016-03-01 12:00:02 b',
+    ]
+    assert '===>' not in out
+
+
+def test_follow_resume(tmpdir, monkeypatch, capsys):
+    monkeypatch.setenv('HOME', str(tmpdir))
+    monkeypatch.setattr(asynclog, 'FOLLOW_READ_SIZE', 4)
+    monkeypatch.setattr(log, 'RETRY_LIMIT', 2)
+    mesos_file = _ScriptedFile('file', 'slave', [
+        'ab\ncd',
+        DCOSConnectionException('unreachable'),
+        'ef\ng',
+        DCOSConnectionException('unreachable'),
+        '',
+        DCOSConnectionException('unreachable'),
+        DCOSConnectionException('unreachable'),
+        DCOSException('unreachable')])
+    checkpoints = log._Checkpoints()
+
+    with pytest.raises(DCOSException):
+        asynclog.follow_files(None, [mesos_file], checkpoints=checkpoints)
+
+    assert capsys.readouterr()[0] == 'ab\ncdef\ng\n'
+    assert checkpoints.load(mesos_file) == len('ab\ncdef\ng')
@@ -0,0 +1,539 @@
+import collections
+import datetime
+import threading
+import time as real_time
+
+import concurrent.futures
+from dcos.errors import (DCOSConnectionException, DCOSException,
+                         DCOSHTTPException)
+from dcoscli import log
+
+import pytest
+
+
+class _FakeFile(object):
+
+    def __init__(self, content):
+        self.content = content
+        self.cursor = 0
+        self.reads = []
+
+    def size(self):
+        return len(self.content)
+
+    def seek(self, offset):
+        self.cursor = offset
+
+    def tell(self):
+        return self.cursor
+
+    def read(self, length=None):
+        if length is None:
+            length = len(self.content) - self.cursor
+        self.reads.append(length)
+        data = self.content[self.cursor:self.cursor + length]
+        self.cursor += len(data)
+        return data
+
+
+def _tail(content, num_lines):
+    lines = log._strip_trailing_newline(content).split('\n')
+    return lines[-num_lines:] if num_lines else []
+
+
+@pytest.mark.parametrize('content', [
+    '',
+    '\n',
+    'one line',
+    'one line\n',
+    'a\nb\nc\n',
+    'a\n\n\nb',
+    ''.join('line {}\n'.format(i) for i in range(5000)),
+    ''.join('{}\n'.format('x' * (i % 700)) for i in range(3000)),
+    'x' * 50000 + '\nshort\n',
+])
+@pytest.mark.parametrize('num_lines', [0, 1, 3, 10, 1000, 100000])
+def test_read_last_lines(content, num_lines):
+    mesos_file = _FakeFile(content)
+
+    assert log._read_last_lines(num_lines, mesos_file) == \
+        _tail(content, num_lines)
+    assert mesos_file.cursor == len(content)
+
+
+@pytest.mark.parametrize('content', [
+    '',
+    'error\n',
+    'ok\nerror 1\nok\n',
+    ''.join('line {}\n'.format(i) for i in range(5000)),
+    ''.join('{} {}\n'.format('x' * (i % 700), i) for i in range(3000)),
+])
+@pytest.mark.parametrize('pattern, invert_match', [
+    ('error', False),
+    ('7$', False),
+    ('7$', True),
+    ('^$', False),
+])
+@pytest.mark.parametrize('num_lines', [1, 10, 1000])
+def test_read_last_lines_match(content, pattern, invert_match, num_lines):
+    match = log.line_filter(pattern, invert_match)
+    mesos_file = _FakeFile(content)
+
+    expected = [line for line in _tail(content, len(content) + 1)
+                if match(line)][-num_lines:]
+    assert log._read_last_lines(num_lines, mesos_file, match) == expected
+    assert mesos_file.cursor == len(content)
+
+
+def test_read_last_lines_match_reads_back_only_as_needed():
+    content = ''.join('{} line {}\n'.format(
+        'ERROR' if i % 100 == 0 else 'INFO', i) for i in range(100000))
+    mesos_file = _FakeFile(content)
+
+    lines = log._read_last_lines(10, mesos_file, log.line_filter('ERROR'))
+
+    assert lines == ['ERROR line {}'.format(i)
+                     for i in range(99000, 100000, 100)]
+    assert sum(mesos_file.reads) < len(content) // 4
+
+
+def test_read_rest_match():
+    mesos_file = _FakeFile('a 1\nb 2\na 3\n')
+
+    assert log._read_rest(mesos_file, log.line_filter('^a')) == \
+        ['a 1', 'a 3']
+
+
+def test_read_rest_match_line_split_across_reads():
+    match = log.line_filter('error')
+    mesos_file = _FakeFile(u'ok\nan err')
+
+    # the partial line is left unread until the rest of it arrives
+    assert log._read_rest(mesos_file, match, complete_lines=True) == []
+    assert mesos_file.tell() == 3
+
+    mesos_file.content += u'or \u00e9\nno err'
+    assert log._read_rest(mesos_file, match, complete_lines=True) == \
+        [u'an error \u00e9']
+
+    mesos_file.content += u'or here\n'
+    assert log._read_rest(mesos_file, match, complete_lines=True) == \
+        [u'no error here']
+
+
+def test_line_filter():
+    assert log.line_filter(None) is None
+    assert log.line_filter(None, True) is None
+
+    match = log.line_filter('err(or)?')
+    assert match('an error occurred')
+    assert not match('all good')
+
+    match = log.line_filter('err(or)?', invert_match=True)
+    assert not match('an error occurred')
+    assert match('all good')
+
+    with pytest.raises(DCOSException) as exc_info:
+        log.line_filter('(unclosed')
+    assert str(exc_info.value).startswith('Invalid pattern [(unclosed]: ')
+
+
+def test_read_last_lines_long_lines():
+    content = ''.join('{}\n'.format('x' * 2000) for i in range(1000))
+    mesos_file = _FakeFile(content)
+
+    lines = log._read_last_lines(100, mesos_file)
+    assert lines == ['x' * 2000] * 100
+    # one read at the estimated line size, then one sized from the
+    # observed line length
+    assert len(mesos_file.reads) == 2
+    assert sum(mesos_file.reads) < 2002 * 100 * 1.3
+
+
+class _FakeClock(object):
+
+    def __init__(self):
+        self.now = 0.0
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class _ScriptedFile(object):
+
+    def __init__(self, name, slave_id, script):
+        self.name = name
+        self.script = list(script)
+        self.polls = []
+        self.cursor = 0
+        self._slave_id = slave_id
+
+    def slave_id(self):
+        return self._slave_id
+
+    def tell(self):
+        return self.cursor
+
+    def seek(self, offset):
+        self.cursor = offset
+
+    def read(self, length=None):
+        self.polls.append(log.time.now)
+        if not self.script:
+            raise DCOSException('gone')
+        step = self.script.pop(0)
+        if isinstance(step, Exception):
+            raise step
+        self.cursor += len(step)
+        return step
+
+    def __str__(self):
+        return self.name
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = _FakeClock()
+    monkeypatch.setattr(log, 'time', fake)
+    return fake
+
+
+def _follow(mesos_files, checkpoints=None):
+    with concurrent.futures.ThreadPoolExecutor(2) as pool:
+        with pytest.raises(DCOSException):
+            log._follow_files(None, list(mesos_files), pool,
+                              log._SlaveLimiter(log.SLAVE_CONCURRENCY),
+                              checkpoints=checkpoints)
+
+
+def test_follow_backs_off_idle_files(clock, monkeypatch):
+    monkeypatch.setattr(log, 'FOLLOW_MAX_INTERVAL', 8)
+    idle = _ScriptedFile('idle', 'slave', [''] * 6)
+
+    _follow([idle])
+
+    assert idle.polls == [1, 3, 7, 15, 23, 31, 39]
+
+
+def test_follow_resets_interval_on_data(clock, capsys):
+    mesos_file = _ScriptedFile('busy', 'slave',
+                               ['', '', 'a\n', '', 'b\nc\n'])
+
+    _follow([mesos_file])
+
+    assert mesos_file.polls == [1, 3, 7, 8, 10, 11]
+    assert capsys.readouterr()[0] == 'a\nb\nc\n'
+
+
+def test_follow_prints_partial_lines(clock, capsys):
+    mesos_file = _ScriptedFile('file', 'slave', ['a\nprogress 50%', ''])
+
+    _follow([mesos_file])
+
+    assert capsys.readouterr()[0] == 'a\nprogress 50%\n'
+    # the partial line isn't read again
+    assert mesos_file.tell() == len('a\nprogress 50%')
+
+
+def test_follow_polls_files_independently(clock, capsys):
+    idle = _ScriptedFile('idle', 'slave-1', ['', '', ''])
+    busy = _ScriptedFile('busy', 'slave-2', ['x\n'] * 5)
+
+    _follow([idle, busy])
+
+    assert idle.polls == [1, 3, 7, 15]
+    assert busy.polls == [1, 2, 3, 4, 5, 6]
+    assert capsys.readouterr()[0] == '===> busy <===\n' + 'x\n' * 5
+
+
+def test_slave_limiter():
+    limiter = log._SlaveLimiter(2)
+    lock = threading.Lock()
+    active = {}
+    peak = {}
+
+    def read(mesos_file):
+        slave_id = mesos_file.slave_id()
+        with lock:
+            active[slave_id] = active.get(slave_id, 0) + 1
+            peak[slave_id] = max(peak.get(slave_id, 0), active[slave_id])
+        real_time.sleep(0.01)
+        with lock:
+            active[slave_id] -= 1
+
+    mesos_files = [_ScriptedFile(str(i), 'slave-{}'.format(i % 2), [])
+                   for i in range(12)]
+    with concurrent.futures.ThreadPoolExecutor(12) as pool:
+        list(pool.map(limiter.wrap(read), mesos_files))
+
+    assert peak == {'slave-0': 2, 'slave-1': 2}
+
+
+class _TaggedFile(object):
+
+    def __init__(self, task_id=None, slave_id=None):
+        self._task_id = task_id
+        self._slave_id = slave_id
+
+    def task_id(self):
+        return self._task_id
+
+    def slave_id(self):
+        return self._slave_id
+
+
+@pytest.mark.parametrize('line, timestamp', [
+    ('2016-03-01T12:00:01.25Z started', '2016-03-01 12:00:01.250000'),
+    ('2016-03-01 12:00:01,123456789 INFO', '2016-03-01 12:00:01.123456'),
+    ('[2016-03-01 12:00:01] GET /', '2016-03-01 12:00:01.000000'),
+    ('I0301 12:00:01.000002  1234 exec.cpp:132] Version: 0.27.0',
+     '{}-03-01 12:00:01.000002'.format(datetime.date.today().year)),
+    ('Registered executor on 10.0.0.1', None),
+    ('', None),
+])
+def test_parse_timestamp(line, timestamp):
+    assert log._parse_timestamp(line) == timestamp
+
+
+def test_task_tag():
+    assert log._task_tag(_TaggedFile('web.1234')) == '[web.1234]'
+    assert log._task_tag(_TaggedFile(slave_id='S0')) == '[S0]'
+    assert log._task_tag(_TaggedFile()) == '[master]'
+
+    task_id = 'web.5a1c2e34-df3b-11e5-9f5c-0242ac110002'
+    assert log._task_tag(_TaggedFile(task_id)) == '[web.5a1c2e3..242ac110002]'
+
+
+def test_merger(capsys):
+    web = _TaggedFile('web')
+    db = _TaggedFile('db')
+    merger = log._Merger()
+
+    merger.add(web, ['before any timestamp',
+                     '2016-03-01 12:00:01 web one',
+                     'continued',
+                     '2016-03-01 12:00:04 web two'])
+    merger.add(db, ['2016-03-01 12:00:02 db one',
+                    '2016-03-01 12:00:04 db two'])
+    merger.flush()
+
+    assert capsys.readouterr()[0].splitlines() == [
+        '[web] before any timestamp',
+        '[web] 2016-03-01 12:00:01 web one',
+        '[web] continued',
+        '[db] 2016-03-01 12:00:02 db one',
+        '[web] 2016-03-01 12:00:04 web two',
+        '[db] 2016-03-01 12:00:04 db two',
+    ]
+
+    # untimestamped lines inherit the last timestamp of their file
+    merger.add(db, ['2016-03-01 12:00:06 db three'])
+    merger.add(web, ['still two'])
+    merger.flush()
+    merger.flush()
+
+    assert capsys.readouterr()[0].splitlines() == [
+        '[web] still two',
+        '[db] 2016-03-01 12:00:06 db three',
+    ]
+
+
+def test_merger_untimestamped_lines_keep_arrival_order(capsys):
+    web = _TaggedFile('web')
+    db = _TaggedFile('db')
+    merger = log._Merger()
+
+    merger.add(db, ['2016-03-01 12:00:02 db one'])
+    merger.add(web, ['no timestamp yet', 'still none'])
+    merger.add(db, ['2016-03-01 12:00:03 db two'])
+    merger.flush()
+
+    assert capsys.readouterr()[0].splitlines() == [
+        '[db] 2016-03-01 12:00:02 db one',
+        '[web] no timestamp yet',
+        '[web] still none',
+        '[db] 2016-03-01 12:00:03 db two',
+    ]
+
+
+def test_merger_orders_lines_within_a_flush_only(capsys):
+    web = _TaggedFile('web')
+    db = _TaggedFile('db')
+    merger = log._Merger()
+
+    merger.add(db, ['2016-03-01 12:00:05 db late'])
+    merger.flush()
+    merger.add(web, ['2016-03-01 12:00:01 web early'])
+    merger.flush()
+
+    # the older line was read after the flush, so it comes second
+    assert capsys.readouterr()[0].splitlines() == [
+        '[db] 2016-03-01 12:00:05 db late',
+        '[web] 2016-03-01 12:00:01 web early',
+    ]
+
+
+def test_stream_files_merge(capsys):
+    class _File(_TaggedFile):
+        def __init__(self, task_id, lines):
+            super(_File, self).__init__(task_id, 'slave')
+            self.lines = lines
+
+    files = [_File('a', ['2016-03-01 12:00:0{} a'.format(i)
+                         for i in (1, 3, 5)]),
+             _File('b', ['2016-03-01 12:00:0{} b'.format(i)
+                         for i in (2, 4, 6)])]
+
+    _, reachable, updated = log._stream_files(
+        None, lambda mesos_file: mesos_file.lines, files,
+        merger=log._Merger())
+
+    assert reachable == files
+    assert updated == set(files)
+    assert [line.split()[-1] for line in
+            capsys.readouterr()[0].splitlines()] == list('ababab')
+
+
+class _HTTPError(DCOSHTTPException):
+
+    def __init__(self, status_code):
+        super(_HTTPError, self).__init__(
+            collections.namedtuple('Response', 'status_code')(status_code))
+
+    def __str__(self):
+        return 'HTTP {}'.format(self.response.status_code)
+
+
+class _NamedFile(_FakeFile):
+
+    def __init__(self, name, content):
+        super(_NamedFile, self).__init__(content)
+        self.name = name
+
+    def slave_id(self):
+        return 'slave'
+
+    def __str__(self):
+        return self.name
+
+
+@pytest.fixture
+def home(tmpdir, monkeypatch):
+    monkeypatch.setenv('HOME', str(tmpdir))
+    return tmpdir
+
+
+def test_resume(home, capsys):
+    mesos_file = _NamedFile('task:a:stdout', 'one\ntwo\nthree\n')
+    log.log_files([mesos_file], False, 2, resume=True)
+    assert capsys.readouterr()[0] == 'two\nthree\n'
+
+    mesos_file = _NamedFile('task:a:stdout', 'one\ntwo\nthree\nfour\n')
+    log.log_files([mesos_file], False, 2, resume=True)
+    assert capsys.readouterr()[0] == 'four\n'
+    # only the new data was read
+    assert mesos_file.reads == [len('four\n')]
+
+    log.log_files([mesos_file], False, 2, resume=True)
+    assert capsys.readouterr()[0] == ''
+
+    # other files and runs without --resume are unaffected
+    log.log_files([_NamedFile('task:b:stdout', 'x\ny\n')], False, 1,
+                  resume=True)
+    log.log_files([mesos_file], False, 1)
+    assert capsys.readouterr()[0] == 'y\nfour\n'
+
+
+def test_resume_truncated(home, capsys):
+    log.log_files([_NamedFile('task:a:stdout', 'one\ntwo\nthree\n')],
+                  False, 1, resume=True)
+    log.log_files([_NamedFile('task:a:stdout', 'new\n')],
+                  False, 1, resume=True)
+
+    assert capsys.readouterr()[0] == 'three\nnew\n'
+
+
+def test_follow_retries_transient_errors(clock, home, capsys):
+    mesos_file = _ScriptedFile('file', 'slave', [
+        'a\n',
+        DCOSConnectionException('URL [x] is unreachable'),
+        _HTTPError(503),
+        'b\n',
+        _HTTPError(404)])
+    checkpoints = log._Checkpoints()
+
+    _follow([mesos_file], checkpoints)
+
+    assert mesos_file.polls == [1, 2, 4, 8, 9]
+    assert capsys.readouterr()[0] == 'a\nb\n'
+    assert checkpoints.load(mesos_file) == 4
+
+
+def test_follow_gives_up_after_retry_limit(clock, home, monkeypatch):
+    monkeypatch.setattr(log, 'RETRY_LIMIT', 2)
+    mesos_file = _ScriptedFile('file', 'slave', [
+        DCOSConnectionException('unreachable')] * 3)
+
+    _follow([mesos_file], log._Checkpoints())
+
+    assert mesos_file.polls == [1, 3, 7]
+
+
+def test_follow_without_resume_drops_failed_files(clock):
+    mesos_file = _ScriptedFile('file', 'slave', [
+        DCOSException('unreachable'), 'a\n'])
+
+    _follow([mesos_file])
+
+    assert mesos_file.polls == [1]
+
+
+def test_with_retries(clock):
+    mesos_file = _ScriptedFile('file', 'slave', [
+        _HTTPError(500), DCOSConnectionException('unreachable'), 'a\n'])
+
+    read = log._with_retries(log._read_rest)
+
+    assert read(mesos_file) == ['a']
+    assert clock.now == 6
+    assert mesos_file.cursor == 2
+
+    mesos_file.script = [_HTTPError(404)]
+    with pytest.raises(DCOSHTTPException):
+        read(mesos_file)
+
+
+@pytest.mark.parametrize('error, transient', [
+    (DCOSConnectionException('unreachable'), True),
+    (DCOSException('No such file'), False),
+    (_HTTPError(500), True),
+    (_HTTPError(404), False),
+    (_HTTPError(401), False),
+    (ValueError(), False),
+])
+def test_is_transient(error, transient):
+    assert log._is_transient(error) == transient
+
+
+def test_with_retries_releases_limiter_while_waiting(clock, monkeypatch):
+    limiter = log._SlaveLimiter(1)
+    mesos_file = _ScriptedFile('file', 'slave', [
+        DCOSConnectionException('unreachable'), 'a\n'])
+    available = []
+    advance = clock.sleep
+
+    def sleep(seconds):
+        # another read from the slave could start now
+        semaphore = limiter._semaphores['slave']
+        available.append(semaphore.acquire(False))
+        semaphore.release()
+        advance(seconds)
+
+    monkeypatch.setattr(clock, 'sleep', sleep)
+    read = log._with_retries(limiter.wrap(log._read_rest))
+
+    assert read(mesos_file) == ['a']
+    assert available == [True]
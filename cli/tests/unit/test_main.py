@@ -0,0 +1,54 @@
+import time
+
+from dcoscli import main
+from dcoscli.task.main import main as task_main
+
+import mock
+
+
+@mock.patch('dcos.cache.load')
+@mock.patch('dcoscli.main._fetch_cluster_id')
+def test_cluster_id_not_cached(fetch, load):
+    load.return_value = None
+    fetch.return_value = 'cluster'
+
+    config = {'core.dcos_url': 'http://dcos.example.com'}
+    assert main._get_cluster_id(config) == 'cluster'
+    fetch.assert_called_once_with('http://dcos.example.com')
+
+
+@mock.patch('dcos.cache.load')
+@mock.patch('dcoscli.main._fetch_cluster_id')
+def test_cluster_id_cached(fetch, load):
+    load.return_value = {'fetched': time.time(), 'cluster_id': 'cached'}
+
+    config = {'core.dcos_url': 'http://dcos.example.com'}
+    assert main._get_cluster_id(config) == 'cached'
+    assert not fetch.called
+
+
+@mock.patch('dcos.cache.load')
+@mock.patch('threading.Thread')
+@mock.patch('dcoscli.main._fetch_cluster_id')
+def test_cluster_id_stale(fetch, thread, load):
+    fetched = time.time() - main.CLUSTER_ID_REFRESH_INTERVAL - 1
+    load.return_value = {'fetched': fetched, 'cluster_id': 'cached'}
+
+    config = {'core.dcos_url': 'http://dcos.example.com'}
+    assert main._get_cluster_id(config) == 'cached'
+    assert not fetch.called
+    thread.assert_called_once_with(target=main._refresh_cluster_id,
+                                   args=('http://dcos.example.com',))
+    assert thread.return_value.start.called
+
+
+@mock.patch('dcos.util.dcos_bin_path')
+def test_builtin_command(dcos_bin_path):
+    dcos_bin_path.return_value = '/opt/dcos/bin'
+
+    assert main._builtin_command('/opt/dcos/bin/dcos-task', 'task') is \
+        task_main
+    assert main._builtin_command('/home/user/.dcos/subcommands/'
+                                 'task/env/bin/dcos-task', 'task') is None
+    assert main._builtin_command('/opt/dcos/bin/dcos-cassandra',
+                                 'cassandra') is None
@@ -0,0 +1,472 @@
+import gzip
+import json
+
+from dcos import constants, marathon
+from dcos.errors import DCOSException
+from dcoscli.marathon import main
+
+import pytest
+
+
+def _event(event_type, **data):
+    return marathon.Event(event_type, data)
+
+
+class _FakeClient(object):
+
+    def __init__(self, events, deployments):
+        self._events = events
+        self._deployments = list(deployments)
+        self.fetches = 0
+
+    def events(self, event_types=None):
+        if isinstance(self._events, Exception):
+            raise self._events
+        return iter(self._events)
+
+    def get_deployment(self, deployment_id):
+        self.fetches += 1
+        return self._deployments.pop(0) if self._deployments else None
+
+
+@pytest.fixture
+def client(monkeypatch):
+    clients = []
+    monkeypatch.setattr(marathon, 'create_client', lambda: clients[0])
+    monkeypatch.setattr(main.time, 'sleep', lambda seconds: None)
+    return clients
+
+
+def test_wait_for_deployment(capsys):
+    events = iter([
+        _event('deployment_info', plan={'id': 'other'}),
+        _event('deployment_success', id='other'),
+        _event('deployment_step_success', plan={'id': 'd1'}),
+        _event('deployment_success', id='d1', plan={'id': 'd1'}),
+    ])
+
+    assert main._wait_for_deployment(None, events, 'd1') == 0
+    assert capsys.readouterr()[0] == 'Deployment d1 succeeded\n'
+
+
+def test_wait_for_failed_deployment():
+    events = iter([_event('deployment_failed', id='d1')])
+
+    with pytest.raises(DCOSException) as exc_info:
+        main._wait_for_deployment(None, events, 'd1')
+    assert str(exc_info.value) == 'Deployment d1 failed'
+
+
+def test_wait_for_deployment_after_reconnect(capsys):
+    client = _FakeClient(None, [None])
+    events = iter([_event(marathon.RECONNECTED_EVENT)])
+
+    assert main._wait_for_deployment(client, events, 'd1') == 0
+    assert capsys.readouterr()[0] == 'Deployment d1 finished\n'
+
+
+def test_wait_for_deployment_without_event_stream(client, capsys):
+    client.append(_FakeClient(
+        DCOSException('Error while fetching [/v2/events]: HTTP 404'),
+        [{'id': 'd1'}, {'id': 'd1'}]))
+
+    events = main._deployment_events(client[0])
+    assert events is None
+    assert main._wait_for_deployment(client[0], events, 'd1') == 0
+    assert client[0].fetches == 3
+    assert capsys.readouterr()[0] == 'Deployment d1 finished\n'
+
+
+def test_wait_for_deployment_after_losing_event_stream(client, capsys):
+    def events():
+        yield _event('deployment_info', plan={'id': 'd1'})
+        raise DCOSException(
+            'Lost the connection to the Marathon event stream')
+
+    client.append(_FakeClient(None, [{'id': 'd1'}]))
+
+    assert main._wait_for_deployment(client[0], events(), 'd1') == 0
+    assert client[0].fetches == 2
+    assert capsys.readouterr()[0] == 'Deployment d1 finished\n'
+
+
+def test_deployment_watch(client, capsys):
+    client.append(_FakeClient(
+        [_event('deployment_info', plan={'id': 'd1'}),
+         _event('deployment_info', plan={'id': 'd2'}),
+         _event('deployment_step_success', plan={'id': 'd1'}),
+         _event('deployment_success', id='d1')],
+        [{'id': 'd1', 'step': 1}, {'id': 'd1', 'step': 2},
+         {'id': 'd1', 'step': 3}]))
+
+    assert main._deployment_watch('d1', None, None) == 0
+
+    out = capsys.readouterr()[0]
+    # one fetch up front, then one per event about d1 before it finished
+    assert client[0].fetches == 3
+    assert '"step": 3' in out
+
+
+def test_deployment_watch_max_count(client):
+    client.append(_FakeClient(
+        [_event('deployment_info', plan={'id': 'd1'})] * 5,
+        [{'id': 'd1'}] * 5))
+
+    assert main._deployment_watch('d1', '2', None) == 0
+    assert client[0].fetches == 2
+
+
+def test_deployment_watch_max_count_with_quiet_stream(client):
+    # a stalled stream is reconnected, and each reconnection refreshes
+    # the deployment, which counts towards --max-count
+    client.append(_FakeClient(
+        [_event(marathon.RECONNECTED_EVENT)] * 5,
+        [{'id': 'd1'}] * 5))
+
+    assert main._deployment_watch('d1', '3', None) == 0
+    assert client[0].fetches == 3
+
+
+def test_deployment_watch_polls_without_events(client):
+    client.append(_FakeClient(
+        DCOSException('no event stream'),
+        [{'id': 'd1'}, {'id': 'd1'}]))
+
+    assert main._deployment_watch('d1', None, '1') == 0
+    assert client[0].fetches == 3
+
+
+def test_deployment_watch_polls_after_losing_event_stream(client):
+    def events():
+        yield _event('deployment_info', plan={'id': 'd1'})
+        raise DCOSException(
+            'Lost the connection to the Marathon event stream')
+
+    client.append(_FakeClient(events(), [{'id': 'd1'}] * 3))
+
+    assert main._deployment_watch('d1', None, '1') == 0
+    # one fetch per event, then polls until the deployment is gone
+    assert client[0].fetches == 4
+
+
+def test_event_summary():
+    assert main._event_summary(_event(
+        'status_update_event', timestamp='2016-03-01T12:00:00.000Z',
+        appId='/web', taskId='web.1', taskStatus='TASK_RUNNING')) == (
+        '2016-03-01T12:00:00.000Z status_update_event appId=/web '
+        'taskId=web.1 taskStatus=TASK_RUNNING')
+    assert main._event_summary(_event(
+        'deployment_info', plan={'id': 'd1'})) == 'deployment_info id=d1'
+
+
+class _BatchClient(object):
+
+    def __init__(self, app_ids, failing=(), instances=None):
+        self._app_ids = app_ids
+        self._failing = failing
+        self._instances = instances or {}
+        self.prefixes = []
+        self.scaled = []
+
+    def iter_apps(self, app_id=None):
+        self.prefixes.append(app_id)
+        return iter({'id': app_id} for app_id in self._app_ids)
+
+    def get_app(self, app_id):
+        if app_id in self._failing:
+            raise DCOSException('App {} does not exist'.format(app_id))
+        return {'id': app_id, 'instances': self._instances.get(app_id, 0)}
+
+    def scale_app(self, app_id, instances, force=None):
+        if app_id in self._failing:
+            raise DCOSException('App {} does not exist'.format(app_id))
+        self.scaled.append((app_id, instances))
+        return 'deploy-' + app_id.strip('/')
+
+
+def test_select_apps():
+    client = _BatchClient(['/web/a', '/web/b', '/website', '/db'])
+
+    assert main._select_apps(client, ['web*', 'db', '/web/a']) == \
+        ['/web/a', '/web/b', '/website', '/db']
+    assert client.prefixes == ['/web']
+
+
+def test_select_apps_by_group():
+    client = _BatchClient(['/web/a', '/web/b', '/website', '/db'])
+
+    assert main._select_apps(client, ['/web/', '/db/']) == \
+        ['/web/a', '/web/b']
+    assert client.prefixes == ['/']
+
+
+def test_select_apps_without_patterns():
+    client = _BatchClient(['/web/a'])
+
+    assert main._select_apps(client, ['/missing']) == ['/missing']
+    assert client.prefixes == []
+
+
+def test_batch(client, capsys):
+    client.append(_BatchClient(['/web/a', '/web/b', '/db'],
+                               failing=['/web/b']))
+
+    assert main._batch(True, False, False, False, False, ['/web/*'],
+                       False, '3', False, '2', None) == 1
+    assert sorted(client[0].scaled) == [('/web/a', 3)]
+
+    out, err = capsys.readouterr()
+    assert '/web/a: Created deployment deploy-web/a\n' in out
+    assert out.endswith('1 succeeded, 1 failed\n')
+    assert '/web/b: App /web/b does not exist' in err
+
+
+def test_batch_start_skips_running_apps(client, capsys):
+    client.append(_BatchClient(['/web/a', '/web/b'],
+                               instances={'/web/b': 10}))
+
+    assert main._batch(True, False, False, False, False, ['/web/*'],
+                       False, '1', False, '8', None) == 1
+    assert client[0].scaled == [('/web/a', 1)]
+
+    out, err = capsys.readouterr()
+    assert out.endswith('1 succeeded, 1 failed\n')
+    assert "/web/b: Application '/web/b' already started: 10 instances." \
+        in err
+
+
+def test_batch_stop_ignores_instances(client):
+    client.append(_BatchClient(['/web/a'], instances={'/web/a': 10}))
+
+    assert main._batch(False, True, False, False, False, ['/web/a'],
+                       False, '1', False, '8', None) == 0
+    assert client[0].scaled == [('/web/a', 0)]
+
+
+def test_batch_without_matches(client):
+    client.append(_BatchClient(['/db']))
+
+    with pytest.raises(DCOSException) as exc_info:
+        main._batch(False, True, False, False, False, ['/web/*'],
+                    False, '1', False, '8', None)
+    assert str(exc_info.value) == 'No matching apps. Exiting.'
+
+
+def test_rate_limiter(monkeypatch):
+    now = [100.0]
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    monkeypatch.setattr(main.time, 'time', lambda: now[0])
+    monkeypatch.setattr(main.time, 'sleep', sleep)
+
+    limiter = main._RateLimiter(4)
+    for _ in range(3):
+        limiter.wait()
+    assert sleeps == [0.25, 0.25]
+
+
+def test_rate_limiter_rejects_non_positive_rate():
+    with pytest.raises(DCOSException):
+        main._RateLimiter(0)
+
+
+class _ApplyClient(object):
+
+    def __init__(self, apps):
+        self._apps = apps
+        self.added = []
+        self.updated = []
+
+    def get_apps(self):
+        return self._apps
+
+    def add_app(self, app_resource):
+        self.added.append(app_resource)
+        return app_resource
+
+    def update_app(self, app_id, payload, force=None):
+        self.updated.append((app_id, payload))
+        return 'deploy-' + app_id.strip('/')
+
+
+def _write_json(path, value):
+    path.write(json.dumps(value))
+    return str(path)
+
+
+def test_diff_app():
+    current = {'id': '/web', 'cpus': 1.0, 'mem': 128, 'version': 'v1',
+               'container': {'type': 'DOCKER',
+                             'docker': {'image': 'nginx:1.9',
+                                        'network': 'BRIDGE'}},
+               'env': {'A': '1', 'B': '2'}}
+
+    assert main._diff_app(current, {
+        'id': 'web', 'cpus': 1, 'mem': 128,
+        'container': {'docker': {'image': 'nginx:1.9'}},
+        'env': {'A': '1', 'B': '2'}}) == {}
+    assert main._diff_app(current, {
+        'id': 'web', 'mem': 256, 'instances': 2,
+        'container': {'docker': {'image': 'nginx:1.10'}}}) == {
+        'mem': 256, 'instances': 2,
+        'container': {'docker': {'image': 'nginx:1.10'}}}
+
+
+def test_diff_app_removed_env_var():
+    current = {'id': '/web', 'cpus': 1.0,
+               'env': {'A': '1', 'B': '2'},
+               'labels': {'team': 'web'},
+               'container': {'docker': {'image': 'nginx',
+                                        'network': 'BRIDGE'}}}
+    definition = {'id': 'web', 'cpus': 1.0,
+                  'env': {'A': '1'},
+                  'labels': {'team': 'web'},
+                  'container': {'docker': {'image': 'nginx'}}}
+
+    # whether or not another field changes too
+    assert main._diff_app(current, definition) == {'env': {'A': '1'}}
+    assert main._diff_app(current, dict(definition, cpus=2)) == \
+        {'env': {'A': '1'}, 'cpus': 2}
+
+
+def test_is_subset_compares_list_lengths():
+    assert main._is_subset([{'port': 80}], [{'port': 80, 'name': 'http'}])
+    assert not main._is_subset([{'port': 80}], [{'port': 80}, {'port': 81}])
+    assert not main._is_subset({'a': 1}, None)
+
+
+def test_load_definitions(tmpdir):
+    _write_json(tmpdir.join('b.json'), [{'id': 'b'}, {'id': '/c/'}])
+    _write_json(tmpdir.join('a.json'), {'id': 'a'})
+    tmpdir.join('README').write('not json')
+
+    apps = main._load_definitions([str(tmpdir)])
+    assert list(apps) == ['/a', '/b', '/c']
+    assert apps['/c'] == {'id': '/c'}
+
+
+def test_load_definitions_rejects_duplicates(tmpdir):
+    path = _write_json(tmpdir.join('apps.json'), [{'id': 'a'}, {'id': '/a'}])
+
+    with pytest.raises(DCOSException) as exc_info:
+        main._load_definitions([path])
+    assert str(exc_info.value) == 'App /a is defined more than once'
+
+
+def test_apply(client, tmpdir, capsys):
+    client.append(_ApplyClient([
+        {'id': '/same', 'cpus': 1.0, 'version': 'v1'},
+        {'id': '/changed', 'cpus': 1.0, 'mem': 128},
+    ]))
+    path = _write_json(tmpdir.join('apps.json'), [
+        {'id': 'same', 'cpus': 1},
+        {'id': 'changed', 'cpus': 1, 'mem': 256},
+        {'id': 'new', 'cpus': 1},
+    ])
+
+    assert main._apply([path], False, False, '8') == 0
+    assert client[0].added == [{'id': '/new', 'cpus': 1}]
+    assert client[0].updated == [('/changed', {'mem': 256})]
+
+    out = capsys.readouterr()[0]
+    assert out.startswith('~ /changed (mem)\n+ /new\n'
+                          'Plan: 1 to create, 1 to update, 1 unchanged\n')
+    assert '/changed: Created deployment deploy-changed\n' in out
+    assert '/new: Created\n' in out
+
+
+def test_apply_dry_run(client, tmpdir, capsys):
+    client.append(_ApplyClient([{'id': '/same', 'cpus': 1.0}]))
+    path = _write_json(tmpdir.join('apps.json'), [
+        {'id': 'same', 'cpus': 1}, {'id': 'new'}])
+
+    assert main._apply([path], True, False, '8') == 0
+    assert client[0].added == []
+    assert capsys.readouterr()[0] == \
+        '+ /new\nPlan: 1 to create, 0 to update, 1 unchanged\n'
+
+
+class _Response(object):
+
+    def __init__(self, status_code, content=b'', etag=None):
+        self.status_code = status_code
+        self.headers = {'ETag': etag} if etag else {}
+        self._content = content
+        self.closed = False
+
+    def iter_content(self, chunk_size):
+        for start in range(0, len(self._content), chunk_size):
+            yield self._content[start:start + chunk_size]
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def resource_server(monkeypatch, tmpdir):
+    monkeypatch.setenv('HOME', str(tmpdir))
+    monkeypatch.delenv(constants.DCOS_NO_CACHE_ENV, raising=False)
+    monkeypatch.setattr(main, 'RESOURCE_CHUNK_SIZE', 4)
+
+    requests = []
+    responses = []
+
+    def get(url, is_success, headers, stream):
+        requests.append((url, headers))
+        response = responses.pop(0)
+        if not is_success(response.status_code):
+            raise DCOSException('Error while fetching ' + url)
+        return response
+
+    monkeypatch.setattr(main.http, 'get', get)
+    return requests, responses
+
+
+def test_get_resource_caches_by_etag(resource_server):
+    requests, responses = resource_server
+    url = 'https://example.com/group.json'
+    responses.append(_Response(200, b'{"id": "/group"}', etag='"v1"'))
+    responses.append(_Response(304))
+
+    assert main._get_resource(url) == {'id': '/group'}
+    assert main._get_resource(url) == {'id': '/group'}
+    assert [headers.get('If-None-Match') for _, headers in requests] == \
+        [None, '"v1"']
+
+
+def test_get_resource_without_etag(resource_server):
+    requests, responses = resource_server
+    url = 'https://example.com/group.json'
+    responses.append(_Response(200, b'{"id": "/group"}'))
+    responses.append(_Response(200, b'{"id": "/group"}'))
+
+    main._get_resource(url)
+    main._get_resource(url)
+    assert [headers.get('If-None-Match') for _, headers in requests] == \
+        [None, None]
+
+
+def test_get_gzipped_resource(resource_server, tmpdir):
+    requests, responses = resource_server
+    path = str(tmpdir.join('group.json.gz'))
+    with gzip.open(path, 'wb') as resource_file:
+        resource_file.write(json.dumps({'id': '/group'}).encode('utf-8'))
+    assert main._get_resource(path) == {'id': '/group'}
+
+    with open(path, 'rb') as resource_file:
+        responses.append(_Response(200, resource_file.read()))
+    assert main._get_resource('https://example.com/group.json.gz') == \
+        {'id': '/group'}
+
+
+def test_get_missing_resource(resource_server):
+    requests, responses = resource_server
+    responses.append(_Response(404))
+
+    with pytest.raises(DCOSException) as exc_info:
+        main._get_resource('https://example.com/missing.json')
+    assert str(exc_info.value).startswith("Can't read from resource")
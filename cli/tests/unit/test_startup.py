@@ -0,0 +1,64 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+IMPORT_BUDGET_PATH = os.path.join(os.path.dirname(__file__),
+                                  'data', 'import_budget.json')
+"""Maximum number of modules that importing each entry point may load.
+About a quarter above what they load today, so that only a new heavy
+dependency, rather than a different python version, exceeds it."""
+
+with open(IMPORT_BUDGET_PATH) as f:
+    IMPORT_BUDGET = json.load(f)
+
+LAZY_MODULES = ['asyncio', 'jsonschema', 'oauth2client', 'pager',
+                'pkg_resources', 'png', 'pydoc', 'pygments', 'pystache',
+                'rollbar', 'toml']
+"""Modules that must only be imported when a command needs them"""
+
+
+def _imported_modules(code):
+    """Runs `code` in a new interpreter with the current import path.
+
+    :param code: python statements
+    :type code: str
+    :returns: names of the modules that running `code` imported
+    :rtype: set of str
+    """
+
+    code = ('import json, sys\n'
+            'before = set(sys.modules)\n' +
+            code +
+            '\nprint(json.dumps(sorted(set(sys.modules) - before)))')
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    process = subprocess.Popen([sys.executable, '-c', code],
+                               stdout=subprocess.PIPE,
+                               stderr=subprocess.PIPE,
+                               cwd=os.path.dirname(os.path.abspath(__file__)),
+                               env=env)
+    stdout, stderr = process.communicate()
+    assert process.returncode == 0, stderr
+    return set(json.loads(stdout.decode('utf-8').splitlines()[-1]))
+
+
+@pytest.mark.parametrize('module', sorted(IMPORT_BUDGET))
+def test_lazy_imports(module):
+    imported = _imported_modules('import {}'.format(module))
+    assert [name for name in LAZY_MODULES if name in imported] == []
+    assert len(imported) <= IMPORT_BUDGET[module]
+
+
+def test_version_imports():
+    imported = _imported_modules(
+        'import sys\n'
+        'from dcoscli import main\n'
+        'sys.argv = ["dcos", "--version"]\n'
+        'try:\n'
+        '    main.main()\n'
+        'except SystemExit:\n'
+        '    pass\n')
+    unexpected = ['requests'] + LAZY_MODULES
+    assert [name for name in unexpected if name in imported] == []
@@ -1,14 +1,12 @@
 import json
+import pkgutil
 import sys
 import uuid
 
-import pkg_resources
 from dcos import config, emitting, errors, http, jsonitem, util
 from dcos.errors import DCOSException
 from six import iteritems
 
-from oauth2client import client
-
 CLIENT_ID = '6a552732-ab9b-410d-9b7d-d8c6523b09a1'
 CLIENT_SECRET = 'f56c1e2b-8599-40ca-b6a0-3aba3e702eae'
 AUTH_URL = 'https://accounts.mesosphere.com/oauth/authorize'
@@ -26,6 +24,8 @@ def _authorize():
     :return: credentials dict
     :rtype: dict
     """
+    from oauth2client import client
+
     try:
         flow = client.OAuth2WebServerFlow(
             client_id=CLIENT_ID,
@@ -126,7 +126,7 @@ def _save_auth_keys(key_dict):
 
     section = 'core'
     config_schema = json.loads(
-        pkg_resources.resource_string(
+        pkgutil.get_data(
             'dcos',
             'data/config-schema/core.json').decode('utf-8'))
     for k, v in iteritems(key_dict):
@@ -0,0 +1,157 @@
+import contextlib
+import hashlib
+import json
+import os
+import tempfile
+
+import portalocker
+from dcos import constants, util
+
+logger = util.get_logger(__name__)
+
+
+def enabled():
+    """Whether cached values may be used.  Caching is disabled by setting
+    the DCOS_NO_CACHE environment variable, e.g. with `dcos --no-cache`.
+
+    :returns: False if the cache has been disabled; True otherwise
+    :rtype: bool
+    """
+
+    return constants.DCOS_NO_CACHE_ENV not in os.environ
+
+
+def get_cache_dir():
+    """
+    :returns: path to the directory holding cached values
+    :rtype: str
+    """
+
+    return os.path.expanduser(os.path.join("~",
+                                           constants.DCOS_DIR,
+                                           constants.DCOS_CACHE_SUBDIR))
+
+
+def load(namespace, key):
+    """Returns the value stored under `key`, or None if there isn't one.
+    Errors reading the cache are logged and treated as a miss.
+
+    :param namespace: kind of value, e.g. 'state'
+    :type namespace: str
+    :param key: identifies the value within `namespace`, e.g. a URL
+    :type key: str
+    :returns: the cached value
+    :rtype: dict | list | None
+    """
+
+    path = _cache_path(namespace, key)
+    if not os.path.exists(path):
+        return None
+
+    try:
+        with _locked(path, portalocker.LOCK_SH):
+            with open(path) as cache_file:
+                return json.load(cache_file)
+    except (EnvironmentError, ValueError, portalocker.LockException):
+        logger.exception('Unable to read cache file [%s]', path)
+        return None
+
+
+def store(namespace, key, value):
+    """Stores `value` under `key`.  The file is replaced atomically, while
+    holding a lock, so that concurrent invocations never observe a
+    partially written value.  Errors are logged and otherwise ignored.
+
+    :param namespace: kind of value, e.g. 'state'
+    :type namespace: str
+    :param key: identifies the value within `namespace`, e.g. a URL
+    :type key: str
+    :param value: JSON serializable value
+    :type value: dict | list
+    :rtype: None
+    """
+
+    path = _cache_path(namespace, key)
+    try:
+        util.ensure_dir_exists(os.path.dirname(path))
+        with _locked(path, portalocker.LOCK_EX):
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+            try:
+                with os.fdopen(fd, 'w') as tmp_file:
+                    json.dump(value, tmp_file)
+                _replace(tmp_path, path)
+            except:
+                os.remove(tmp_path)
+                raise
+    except Exception:
+        logger.exception('Unable to write cache file [%s]', path)
+
+
+def remove(namespace, key):
+    """Removes the value stored under `key`, if any.
+
+    :param namespace: kind of value, e.g. 'state'
+    :type namespace: str
+    :param key: identifies the value within `namespace`, e.g. a URL
+    :type key: str
+    :rtype: None
+    """
+
+    path = _cache_path(namespace, key)
+    try:
+        with _locked(path, portalocker.LOCK_EX):
+            if os.path.exists(path):
+                os.remove(path)
+    except Exception:
+        logger.exception('Unable to remove cache file [%s]', path)
+
+
+def _cache_path(namespace, key):
+    """
+    :param namespace: kind of value, e.g. 'state'
+    :type namespace: str
+    :param key: identifies the value within `namespace`, e.g. a URL
+    :type key: str
+    :returns: path to the file holding the value
+    :rtype: str
+    """
+
+    digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+    return os.path.join(get_cache_dir(),
+                        '{}-{}.json'.format(namespace, digest))
+
+
+@contextlib.contextmanager
+def _locked(path, flags):
+    """A context manager that holds a lock on the lock file for `path`.
+
+    :param path: path to the cached file
+    :type path: str
+    :param flags: portalocker.LOCK_SH or portalocker.LOCK_EX
+    :type flags: int
+    """
+
+    with open(path + '.lock', 'a') as lock_file:
+        portalocker.lock(lock_file, flags)
+        try:
+            yield
+        finally:
+            portalocker.unlock(lock_file)
+
+
+def _replace(src, dst):
+    """Renames `src` to `dst`, overwriting `dst` if it exists.
+
+    :param src: source path
+    :type src: str
+    :param dst: destination path
+    :type dst: str
+    :rtype: None
+    """
+
+    try:
+        os.rename(src, dst)
+    except OSError:
+        # Windows doesn't allow renaming over an existing file
+        os.remove(dst)
+        os.rename(src, dst)
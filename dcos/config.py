@@ -1,9 +1,9 @@
 import collections
 import copy
 import json
+import os
+import pkgutil
 
-import pkg_resources
-import toml
 from dcos import emitting, jsonitem, subcommand, util
 from dcos.errors import DCOSException
 
@@ -11,6 +11,9 @@ emitter = emitting.FlatEmitter()
 
 logger = util.get_logger(__name__)
 
+# only accessed from _load_toml and save
+PARSED_CONFIGS = {}  # path -> ((mtime, size), dict)
+
 
 def set_val(name, value):
     """
@@ -69,13 +72,42 @@ def load_from_path(path, mutable=False):
     """
 
     util.ensure_file_exists(path)
+    toml_obj = _load_toml(path)
+    if mutable:
+        return MutableToml(copy.deepcopy(toml_obj))
+    else:
+        return Toml(toml_obj)
+
+
+def _load_toml(path):
+    """Parses the TOML file at `path`.  The result is shared by every call
+    until the file's modification time or size changes, so it must not be
+    modified.
+
+    :param path: Path to the TOML file
+    :type path: str
+    :returns: the parsed file
+    :rtype: dict
+    """
+
+    import toml
+
+    stat = os.stat(path)
+    version = (stat.st_mtime, stat.st_size)
+
+    parsed = PARSED_CONFIGS.get(path)
+    if parsed is not None and parsed[0] == version:
+        return parsed[1]
+
     with util.open_file(path, 'r') as config_file:
         try:
             toml_obj = toml.loads(config_file.read())
         except Exception as e:
             raise DCOSException(
                 'Error parsing config file at [{}]: {}'.format(path, e))
-        return (MutableToml if mutable else Toml)(toml_obj)
+
+    PARSED_CONFIGS[path] = (version, toml_obj)
+    return toml_obj
 
 
 def save(toml_config):
@@ -84,8 +116,11 @@ def save(toml_config):
     :type toml_config: MutableToml or Toml
     """
 
+    import toml
+
     serial = toml.dumps(toml_config._dictionary)
     path = util.get_config_path()
+    PARSED_CONFIGS.pop(path, None)
     with util.open_file(path, 'w') as config_file:
         config_file.write(serial)
 
@@ -200,7 +235,7 @@ def get_config_schema(command):
     # separately.
     if command == "core":
         return json.loads(
-            pkg_resources.resource_string(
+            pkgutil.get_data(
                 'dcos',
                 'data/config-schema/core.json').decode('utf-8'))
 
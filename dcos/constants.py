@@ -4,6 +4,10 @@ DCOS_DIR = ".dcos"
 DCOS_SUBCOMMAND_VIRTUALENV_SUBDIR = 'env'
 """In a package's directory, this is the virtualenv subdirectory."""
 
+DCOS_CACHE_SUBDIR = 'cache'
+"""Name of the subdirectory of the DCOS data directory that holds cached
+responses."""
+
 DCOS_SUBCOMMAND_SUBDIR = 'subcommands'
 """Name of the subdirectory that contains all of the subcommands. This is
 relative to the location of the executable."""
@@ -23,6 +27,9 @@ DCOS_PAGER_COMMAND_ENV = 'PAGER'
 DCOS_SSL_VERIFY_ENV = 'DCOS_SSL_VERIFY'
 """Whether or not ot verify SSL certs for HTTPS or path to certificate(s)"""
 
+DCOS_NO_CACHE_ENV = 'DCOS_NO_CACHE'
+"""Name of the environment variable to disable the local response cache"""
+
 PATH_ENV = 'PATH'
 """Name of the environment variable pointing to the executable directories."""
 
@@ -1,7 +1,6 @@
 import functools
 import json
 
-import pystache
 from dcos import emitting, http, util
 from dcos.errors import (DCOSAuthenticationException, DCOSException,
                          DCOSHTTPException, DefaultError)
@@ -418,6 +417,8 @@ class CosmosPackageVersion():
         :rtype: dict
         """
 
+        import pystache
+
         rendered = pystache.render(json.dumps(self._command_json), options)
         return util.load_jsons(rendered)
 
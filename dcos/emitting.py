@@ -4,22 +4,24 @@ import abc
 import collections
 import json
 import os
-import pydoc
 import re
 import sys
 
-import pager
-import pygments
 import six
 from dcos import constants, errors, util
-from pygments.formatters import Terminal256Formatter
-from pygments.lexers import JsonLexer
 
 logger = util.get_logger(__name__)
 
 
 class Emitter(object):
-    """Abstract class for emitting events."""
+    """Abstract class for emitting events.
+
+    Tables are published whole, as a single event.  Log lines are
+    published with :py:meth:`publish_batch`, which by default calls
+    :py:meth:`publish` once per line, so a :py:class:`FlatEmitter` with a
+    custom `handler` and no `batch_handler` receives each log line as a
+    separate event.
+    """
 
     @abc.abstractmethod
     def publish(self, event):
@@ -31,6 +33,18 @@ class Emitter(object):
 
         raise NotImplementedError
 
+    def publish_batch(self, lines, page=True):
+        """Publishes a sequence of lines.
+
+        :param lines: lines to publish
+        :type lines: iterable of str
+        :param page: whether the lines may be piped through a pager
+        :type page: bool
+        """
+
+        for line in lines:
+            self.publish(line)
+
 
 class FlatEmitter(Emitter):
     """Simple emitter that sends all publish events to the provided handler.
@@ -39,13 +53,21 @@ class FlatEmitter(Emitter):
     :param handler: event handler to call when publish is called
     :type handler: func(event) where event is defined in
                    :py:func:`FlatEmitter.publish`
+    :param batch_handler: handler to call when publish_batch is called.
+                          Defaults to :py:const:`DEFAULT_BATCH_HANDLER`
+                          if `handler` is None, and to calling `handler`
+                          once per line otherwise.
+    :type batch_handler: func(lines, page) where the arguments are
+                         defined in :py:func:`FlatEmitter.publish_batch`
     """
 
-    def __init__(self, handler=None):
+    def __init__(self, handler=None, batch_handler=None):
         if handler is None:
             self._handler = DEFAULT_HANDLER
+            self._batch_handler = batch_handler or DEFAULT_BATCH_HANDLER
         else:
             self._handler = handler
+            self._batch_handler = batch_handler
 
     def publish(self, event):
         """Publishes an event.
@@ -56,6 +78,20 @@ class FlatEmitter(Emitter):
 
         self._handler(event)
 
+    def publish_batch(self, lines, page=True):
+        """Publishes a sequence of lines.
+
+        :param lines: lines to publish
+        :type lines: iterable of str
+        :param page: whether the lines may be piped through a pager
+        :type page: bool
+        """
+
+        if self._batch_handler is None:
+            super(FlatEmitter, self).publish_batch(lines, page)
+        else:
+            self._batch_handler(lines, page)
+
 
 def print_handler(event):
     """Default handler for printing event to stdout.
@@ -92,6 +128,28 @@ def print_handler(event):
         _page(event, pager_command)
 
 
+def print_batch_handler(lines, page=True):
+    """Default handler for printing a batch of lines to stdout.  The lines
+    are written with a single call, and whether to use a pager is
+    decided once for the whole batch.
+
+    :param lines: lines to emit to stdout
+    :type lines: iterable of str
+    :param page: whether the lines may be piped through a pager
+    :type page: bool
+    """
+
+    lines = list(lines)
+    if not lines:
+        return
+
+    output = '\n'.join(lines)
+    if page:
+        _page(output, os.environ.get(constants.DCOS_PAGER_COMMAND_ENV))
+    else:
+        print(output)
+
+
 def publish_table(emitter, objs, table_fn, json_):
     """Publishes a json representation of `objs` if `json_` is True,
     otherwise, publishes a table representation.
@@ -169,6 +227,10 @@ def _page(output, pager_command=None):
         print(output)
         return
 
+    # only needed for interactive output, so not imported at startup
+    import pager
+    import pydoc
+
     num_lines = output.count('\n')
     exceeds_tty_height = pager.getheight() - 1 < num_lines
 
@@ -187,9 +249,17 @@ def _highlight_json(json_value):
     :rtype: str
     """
 
+    # only needed for interactive output, so not imported at startup
+    import pygments
+    from pygments.formatters import Terminal256Formatter
+    from pygments.lexers import JsonLexer
+
     return pygments.highlight(
         json_value, JsonLexer(), Terminal256Formatter()).strip()
 
 
 DEFAULT_HANDLER = print_handler
 """The default handler for an emitter: :py:func:`print_handler`."""
+
+DEFAULT_BATCH_HANDLER = print_batch_handler
+"""The default batch handler: :py:func:`print_batch_handler`."""
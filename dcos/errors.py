@@ -5,6 +5,12 @@ class DCOSException(Exception):
     pass
 
 
+class DCOSConnectionException(DCOSException):
+    """Raised when a request fails without a response, because the server
+    is unreachable or the request timed out."""
+    pass
+
+
 class DCOSHTTPException(DCOSException):
     """ A wrapper around Response objects for HTTP error codes.
 
@@ -6,11 +6,12 @@ import threading
 import requests
 from dcos import config, constants, util
 from dcos.errors import (DCOSAuthenticationException,
-                         DCOSAuthorizationException, DCOSException,
-                         DCOSHTTPException)
+                         DCOSAuthorizationException, DCOSConnectionException,
+                         DCOSException, DCOSHTTPException)
+from requests.adapters import HTTPAdapter
 from requests.auth import AuthBase, HTTPBasicAuth
 
-from six.moves import urllib
+from six.moves import http_cookiejar, urllib
 from six.moves.urllib.parse import urlparse
 
 logger = util.get_logger(__name__)
@@ -18,9 +19,17 @@ lock = threading.Lock()
 
 DEFAULT_TIMEOUT = 5
 
+DEFAULT_POOL_SIZE = util.STREAM_CONCURRENCY
+"""Default number of pooled connections per host.  Matches the number of
+worker threads used by :py:func:`dcos.util.stream`."""
+
 # only accessed from _request_with_auth
 AUTH_CREDS = {}  # (hostname, auth_scheme, realm) -> AuthBase()
 
+# only accessed from _get_session
+SESSIONS = {}  # (scheme, hostname, port, verify, cert) -> requests.Session()
+sessions_lock = threading.Lock()
+
 
 def _default_is_success(status_code):
     """Returns true if the success status is between [200, 300).
@@ -68,8 +77,10 @@ def _request(method,
         url,
         kwargs.get('headers'))
 
+    session = _get_session(url, verify, kwargs.get('cert'))
+
     try:
-        response = requests.request(
+        response = session.request(
             method=method,
             url=url,
             timeout=timeout,
@@ -78,10 +89,12 @@ def _request(method,
             **kwargs)
     except requests.exceptions.ConnectionError as e:
         logger.exception("HTTP Connection Error")
-        raise DCOSException('URL [{0}] is unreachable: {1}'.format(url, e))
+        raise DCOSConnectionException(
+            'URL [{0}] is unreachable: {1}'.format(url, e))
     except requests.exceptions.Timeout as e:
         logger.exception("HTTP Timeout")
-        raise DCOSException('Request to URL [{0}] timed out.'.format(url))
+        raise DCOSConnectionException(
+            'Request to URL [{0}] timed out.'.format(url))
     except requests.exceptions.RequestException as e:
         logger.exception("HTTP Exception")
         raise DCOSException('HTTP Exception: {}'.format(e))
@@ -93,6 +106,76 @@ def _request(method,
     return response
 
 
+def _get_session(url, verify=None, cert=None):
+    """Returns the pooled session used to talk to the host in `url`.  All
+    requests to the same (scheme, host, port) with the same TLS settings
+    share one keep-alive connection pool.  Sessions are created lazily and
+    live for the duration of the process.
+
+    :param url: URL the session will be used for
+    :type url: str
+    :param verify: whether to verify SSL certs or path to cert(s)
+    :type verify: bool | str
+    :param cert: client side certificate
+    :type cert: str | (str, str)
+    :returns: the session for the given URL
+    :rtype: requests.Session
+    """
+
+    parsed_url = urlparse(url)
+    if isinstance(cert, list):
+        cert = tuple(cert)
+    key = (parsed_url.scheme,
+           parsed_url.hostname,
+           parsed_url.port,
+           verify,
+           cert)
+
+    with sessions_lock:
+        if key not in SESSIONS:
+            SESSIONS[key] = _create_session(_pool_size())
+        return SESSIONS[key]
+
+
+def _create_session(pool_size):
+    """Creates a session with a bounded connection pool.  The pool blocks
+    instead of opening more than `pool_size` connections to one host, and
+    cookies are never persisted across requests, matching the behavior
+    of the module-level :py:func:`requests.request`.
+
+    :param pool_size: maximum number of connections per host
+    :type pool_size: int
+    :returns: a new session
+    :rtype: requests.Session
+    """
+
+    session = requests.Session()
+    session.cookies.set_policy(
+        http_cookiejar.DefaultCookiePolicy(allowed_domains=[]))
+
+    adapter = HTTPAdapter(pool_connections=pool_size,
+                          pool_maxsize=pool_size,
+                          pool_block=True)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+
+    return session
+
+
+def _pool_size():
+    """Returns the configured number of pooled connections per host.
+
+    :returns: the value of 'core.http_pool_size' or the default pool size
+    :rtype: int
+    """
+
+    try:
+        return util.get_config().get('core.http_pool_size', DEFAULT_POOL_SIZE)
+    except DCOSException:
+        logger.exception('Unable to read the HTTP pool size')
+        return DEFAULT_POOL_SIZE
+
+
 def _request_with_auth(response,
                        method,
                        url,
@@ -159,6 +242,7 @@ def request(method,
             is_success=_default_is_success,
             timeout=None,
             verify=None,
+            interactive=True,
             **kwargs):
     """Sends an HTTP request. If the server responds with a 401, ask the
     user for their credentials, and try request again (up to 3 times).
@@ -173,6 +257,10 @@ def request(method,
     :type timeout: int
     :param verify: whether to verify SSL certs or path to cert(s)
     :type verify: bool | str
+    :param interactive: whether to authenticate if the server responds with
+                        a 401.  If False, a 401 raises
+                        DCOSAuthenticationException without prompting.
+    :type interactive: bool
     :param kwargs: Additional arguments to requests.request
         (see http://docs.python-requests.org/en/latest/api/#requests.request)
     :type kwargs: dict
@@ -197,6 +285,8 @@ def request(method,
                         verify=verify, **kwargs)
 
     if response.status_code == 401:
+        if not interactive:
+            raise DCOSAuthenticationException(response)
         response = _request_with_auth(response, method, url, is_success,
                                       timeout, verify, **kwargs)
 
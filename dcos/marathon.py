@@ -1,6 +1,9 @@
 import json
+import re
+import time
 from distutils.version import LooseVersion
 
+import requests
 from dcos import http, util
 from dcos.errors import DCOSException, DCOSHTTPException
 
@@ -8,6 +11,32 @@ from six.moves import urllib
 
 logger = util.get_logger(__name__)
 
+DEPLOYMENT_EVENTS = ['deployment_info',
+                     'deployment_success',
+                     'deployment_failed',
+                     'deployment_step_success',
+                     'deployment_step_failure']
+"""Types of the events Marathon sends as a deployment progresses"""
+
+RECONNECTED_EVENT = 'event_stream_reconnected'
+"""Type of the event yielded after the event stream reconnects.  Events
+sent while it was disconnected are lost."""
+
+EVENT_RECONNECT_LIMIT = 10
+"""Consecutive failed attempts to reconnect to the event stream after
+which reading it raises an exception"""
+
+APPS_CHUNK_SIZE = 64 * 1024
+"""Size of the pieces in which the app list is read"""
+
+EVENT_RECONNECT_MAX_DELAY = 30
+"""Upper bound on the seconds between attempts to reconnect to the event
+stream"""
+
+EVENT_READ_TIMEOUT = 60
+"""Seconds without data after which the event stream is assumed to have
+stalled, and is reconnected"""
+
 
 def create_client(config=None):
     """Creates a Marathon client with the supplied configuration.
@@ -121,6 +150,37 @@ def _http_req(fn, *args, **kwargs):
         raise _to_exception(e.response)
 
 
+class Event(object):
+    """An event from Marathon's event stream
+
+    :param event_type: type of the event, e.g. 'deployment_success'
+    :type event_type: str
+    :param data: body of the event
+    :type data: dict
+    """
+
+    def __init__(self, event_type, data):
+        self.type = event_type
+        self.data = data
+
+    def dict(self):
+        """
+        :returns: the body of the event
+        :rtype: dict
+        """
+
+        return self.data
+
+    def __getitem__(self, name):
+        return self.data[name]
+
+    def get(self, name, default=None):
+        return self.data.get(name, default)
+
+    def __repr__(self):
+        return 'Event({!r}, {!r})'.format(self.type, self.data)
+
+
 class Client(object):
     """Class for talking to the Marathon server.
 
@@ -262,17 +322,94 @@ class Client(object):
         else:
             return response.json()['versions'][:max_count]
 
-    def get_apps(self):
-        """Get a list of known applications.
-
+    def get_apps(self, labels=None, app_id=None, embed=None):
+        """Get a list of known applications.  Without filters, the
+        response is parsed in one piece, which is much faster than
+        streaming it.  With filters, the apps are read with `iter_apps`,
+        so that only the matching ones are held in memory even if
+        Marathon ignores the filters.
+
+        :param labels: only return apps with these label values
+        :type labels: dict | None
+        :param app_id: only return apps whose ID starts with this prefix
+        :type app_id: str | None
+        :param embed: fields to embed in each app, e.g. ['apps.counts'],
+                      or None for Marathon's default
+        :type embed: [str] | None
         :returns: list of known applications
         :rtype: [dict]
         """
 
-        url = self._create_url('v2/apps')
-        response = _http_req(http.get, url, timeout=self._timeout)
+        if labels or app_id is not None:
+            return list(self.iter_apps(labels, app_id, embed))
+
+        url, params, _ = self._apps_query(labels, app_id, embed)
+        response = _http_req(http.get, url,
+                             params=params,
+                             timeout=self._timeout)
         return response.json()['apps']
 
+    def iter_apps(self, labels=None, app_id=None, embed=None):
+        """Iterates over the known applications.  The filters are sent to
+        Marathon, so that it only returns the matching apps, and are also
+        applied as the response streams in, for Marathon versions that
+        ignore them.  Only one app is held in memory at a time, at the
+        cost of parsing the response more slowly than `get_apps`.
+
+        :param labels: only return apps with these label values
+        :type labels: dict | None
+        :param app_id: only return apps whose ID starts with this prefix
+        :type app_id: str | None
+        :param embed: fields to embed in each app, e.g. ['apps.counts'],
+                      or None for Marathon's default
+        :type embed: [str] | None
+        :returns: the known applications
+        :rtype: generator of dict
+        """
+
+        url, params, app_id = self._apps_query(labels, app_id, embed)
+        response = _http_req(http.get, url,
+                             params=params,
+                             stream=True,
+                             timeout=self._timeout)
+        try:
+            for app in util.iter_json_array(
+                    response.iter_content(APPS_CHUNK_SIZE), 'apps'):
+                if _app_matches(app, labels, app_id):
+                    yield app
+        finally:
+            response.close()
+
+    def _apps_query(self, labels, app_id, embed):
+        """
+        :param labels: only return apps with these label values
+        :type labels: dict | None
+        :param app_id: only return apps whose ID starts with this prefix
+        :type app_id: str | None
+        :param embed: fields to embed in each app, or None for Marathon's
+                      default
+        :type embed: [str] | None
+        :returns: the URL and query parameters listing the matching apps,
+                  and `app_id` as Marathon matches it
+        :rtype: (str, dict | None, str | None)
+        """
+
+        params = {}
+        if labels:
+            params['label'] = ','.join(
+                '{}=={}'.format(_escape_label(key), _escape_label(value))
+                for key, value in sorted(labels.items()))
+        if app_id is not None:
+            # unlike normalize_app_id, keep a trailing slash, so that
+            # 'group/' matches the apps in the group only
+            app_id = '/' + app_id.lstrip('/')
+            # Marathon matches IDs containing the parameter
+            params['id'] = app_id
+        if embed is not None:
+            params['embed'] = embed
+
+        return self._create_url('v2/apps'), params or None, app_id
+
     def get_apps_for_framework(self, framework_name):
         """ Return all apps running the given framework.
 
@@ -281,9 +418,8 @@ class Client(object):
         :rtype: [dict]
         """
 
-        return [app for app in self.get_apps()
-                if app.get('labels', {}).get(
-                    'DCOS_PACKAGE_FRAMEWORK_NAME') == framework_name]
+        return list(self.iter_apps(
+            labels={'DCOS_PACKAGE_FRAMEWORK_NAME': framework_name}))
 
     def add_app(self, app_resource):
         """Add a new application.
@@ -718,6 +854,89 @@ class Client(object):
                              timeout=self._timeout)
         return response.json()
 
+    def events(self, event_types=None):
+        """Subscribes to Marathon's event stream.  The stream is connected
+        before this method returns, so no event that happens after it
+        returns is missed.  If the stream drops, or sends nothing for
+        EVENT_READ_TIMEOUT seconds, it is reconnected with exponential
+        backoff, and an event of type RECONNECTED_EVENT marks the gap.
+
+        :param event_types: types of events to return, or None for all
+        :type event_types: [str] | None
+        :returns: the events, as they happen
+        :rtype: generator of Event
+        """
+
+        response = self._connect_events(event_types)
+        return self._iter_events(response, event_types)
+
+    def _connect_events(self, event_types):
+        """
+        :param event_types: types of events to subscribe to, or None
+        :type event_types: [str] | None
+        :returns: the streaming response from v2/events
+        :rtype: requests.Response
+        """
+
+        url = self._create_url('v2/events')
+        params = None if event_types is None else {'event_type': event_types}
+
+        # The stream stays quiet while nothing happens, so reads get a
+        # longer timeout.  It still catches a proxy that stops forwarding
+        # data without closing the connection.
+        return _http_req(http.get, url,
+                         params=params,
+                         headers={'Accept': 'text/event-stream'},
+                         stream=True,
+                         timeout=(self._timeout, EVENT_READ_TIMEOUT))
+
+    def _iter_events(self, response, event_types):
+        """
+        :param response: connected event stream
+        :type response: requests.Response
+        :param event_types: types of events to return, or None for all
+        :type event_types: [str] | None
+        :returns: the events in `response`, reconnecting as needed
+        :rtype: generator of Event
+        """
+
+        failures = 0
+        while True:
+            connected = time.time()
+            try:
+                for event_type, data in _parse_events(
+                        response.iter_content(chunk_size=None)):
+                    failures = 0
+                    if event_types is None or event_type in event_types:
+                        yield Event(event_type, data)
+                logger.info('Marathon closed the event stream')
+            except (requests.exceptions.RequestException,
+                    EnvironmentError):
+                logger.exception('Error reading the event stream')
+            finally:
+                response.close()
+
+            if time.time() - connected >= EVENT_READ_TIMEOUT:
+                # a stream that stayed up, but quiet, until it timed out
+                failures = 0
+
+            while True:
+                failures += 1
+                if failures > EVENT_RECONNECT_LIMIT:
+                    raise DCOSException(
+                        'Lost the connection to the Marathon event stream')
+
+                time.sleep(min(2 ** (failures - 1),
+                               EVENT_RECONNECT_MAX_DELAY))
+                try:
+                    response = self._connect_events(event_types)
+                    break
+                except DCOSException:
+                    logger.exception('Unable to reconnect the event stream')
+
+            yield Event(RECONNECTED_EVENT,
+                        {'eventType': RECONNECTED_EVENT})
+
     def get_leader(self):
         """ Get the leading marathon instance.
 
@@ -730,6 +949,87 @@ class Client(object):
         return response.json()['leader']
 
 
+def _app_matches(app, labels, app_id):
+    """
+    :param app: Marathon app
+    :type app: dict
+    :param labels: label values the app must have, if any
+    :type labels: dict | None
+    :param app_id: prefix of the app's ID, if any
+    :type app_id: str | None
+    :returns: whether `app` has `labels` and its ID starts with `app_id`
+    :rtype: bool
+    """
+
+    if app_id is not None and not app['id'].startswith(app_id):
+        return False
+
+    app_labels = app.get('labels') or {}
+    return all(app_labels.get(key) == value
+               for key, value in (labels or {}).items())
+
+
+def _escape_label(value):
+    """
+    :param value: label key or value
+    :type value: str
+    :returns: `value`, escaped for use in a Marathon label selector
+    :rtype: str
+    """
+
+    return re.sub(r'([\\\s,()!=\'"])', r'\\\1', value)
+
+
+def _parse_events(chunks):
+    """Parses a server-sent events stream.
+
+    :param chunks: raw stream, in arbitrary pieces
+    :type chunks: iterable of bytes
+    :returns: the type and JSON decoded data of each event
+    :rtype: generator of (str, dict)
+    """
+
+    event_type = None
+    data = []
+    for line in _iter_lines(chunks):
+        if not line:
+            if data:
+                try:
+                    yield event_type or 'message', json.loads('\n'.join(data))
+                except ValueError:
+                    logger.exception('Ignoring malformed event: %r', data)
+            event_type = None
+            data = []
+            continue
+        if line.startswith(':'):
+            # comment, used to keep the connection alive
+            continue
+
+        field, _, value = line.partition(':')
+        if value.startswith(' '):
+            value = value[1:]
+        if field == 'event':
+            event_type = value
+        elif field == 'data':
+            data.append(value)
+
+
+def _iter_lines(chunks):
+    """
+    :param chunks: raw stream, in arbitrary pieces
+    :type chunks: iterable of bytes
+    :returns: the decoded lines of the stream, without line endings
+    :rtype: generator of str
+    """
+
+    pending = b''
+    for chunk in chunks:
+        lines = (pending + chunk).split(b'\n')
+        pending = lines.pop()
+        for line in lines:
+            yield line.rstrip(b'\r').decode('utf-8')
+
+
 def _default_marathon_error(message=""):
     """
     :param message: additional message
@@ -1,28 +1,58 @@
+import bisect
+import collections
 import fnmatch
 import itertools
 import os
+import re
+import time
 
-from dcos import http, util
+import concurrent.futures
+from dcos import cache, http, util
 from dcos.errors import DCOSException, DCOSHTTPException
 
 from six.moves import urllib
 
 logger = util.get_logger(__name__)
 
+FRAMEWORK_SECTIONS = ['frameworks', 'completed_frameworks']
+"""state.json sections needed to list frameworks and their tasks"""
 
-def get_master(dcos_client=None):
+SLAVE_SECTIONS = ['slaves']
+"""state.json sections needed to locate slaves"""
+
+STATE_CHUNK_SIZE = 64 * 1024
+"""Number of bytes to read at a time when streaming state.json"""
+
+FILE_CHUNK_SIZE = 1024 * 1024
+"""Default number of bytes to request per files/read.json call.  Mesos may
+return less than requested."""
+
+DOWNLOAD_PARALLELISM = 4
+"""Default number of ranges fetched concurrently by `MesosFile.download`"""
+
+DOWNLOAD_RANGE_SIZE = (256 * 1024, 16 * 1024 * 1024)
+"""Smallest and largest range sizes used by `MesosFile.download`"""
+
+DOWNLOAD_RANGE_SECONDS = 1.0
+"""`MesosFile.download` sizes ranges to take about this long to fetch"""
+
+
+def get_master(dcos_client=None, sections=None):
     """Create a Master object using the url stored in the
     'core.mesos_master_url' property if it exists.  Otherwise, we use
     the `core.dcos_url` property
 
     :param dcos_client: DCOSClient
     :type dcos_client: DCOSClient | None
+    :param sections: top-level state.json sections to load, or None to
+                     load the whole state.  See `DCOSClient.get_master_state`
+    :type sections: [str] | None
     :returns: master state object
     :rtype: Master
     """
 
     dcos_client = dcos_client or DCOSClient()
-    return Master(dcos_client.get_master_state())
+    return Master(dcos_client.get_master_state(sections))
 
 
 class DCOSClient(object):
@@ -40,6 +70,7 @@ class DCOSClient(object):
             self._mesos_master_url = mesos_master_url
 
         self._timeout = config.get('core.timeout')
+        self._state_cache_ttl = config.get('core.state_cache_ttl', 0)
 
     def get_dcos_url(self, path):
         """ Create a DCOS URL
@@ -89,15 +120,103 @@ class DCOSClient(object):
         else:
             return urllib.parse.urljoin(private_url, path)
 
-    def get_master_state(self):
-        """Get the Mesos master state json object
+    def get_master_state(self, sections=None):
+        """Get the Mesos master state json object.  If `sections` is
+        provided, the response is parsed as it streams in, only those
+        top-level sections are kept, and the rest of the response is not
+        read once they have all been parsed.
 
+        If 'core.state_cache_ttl' is set, the state is cached on disk and
+        reused for that many seconds.  Once stale, it is revalidated with
+        the master using its ETag or Last-Modified date, if it sent one.
+
+        :param sections: top-level sections to load, e.g. ['slaves'], or
+                         None to load the whole state
+        :type sections: [str] | None
         :returns: Mesos' master state json object
         :rtype: dict
         """
 
         url = self.master_url('master/state.json')
-        return http.get(url, timeout=self._timeout).json()
+        if not self._state_cache_ttl or not cache.enabled():
+            return self._fetch_master_state(url, sections)[0]
+
+        entry = cache.load('state', url)
+        if entry is not None and not _covers(entry['sections'], sections):
+            # fetch everything we already had as well, so that the cache
+            # keeps serving the commands that populated it
+            if sections is not None:
+                sections = sorted(set(sections) | set(entry['sections']))
+            entry = None
+
+        if entry is not None:
+            if time.time() - entry['fetched'] < self._state_cache_ttl:
+                logger.info('Using cached master state for [%s]', url)
+                return entry['state']
+            sections = entry['sections']
+
+        state, response = self._fetch_master_state(url, sections, entry)
+        if state is None:
+            logger.info('Cached master state for [%s] is still valid', url)
+            state = entry['state']
+
+        cache.store('state', url, {
+            'fetched': time.time(),
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'sections': sections,
+            'state': state,
+        })
+        return state
+
+    def _fetch_master_state(self, url, sections, entry=None):
+        """Fetches the Mesos master state json object.
+
+        :param url: state.json URL
+        :type url: str
+        :param sections: top-level sections to load, or None to load the
+                         whole state
+        :type sections: [str] | None
+        :param entry: cache entry to revalidate
+        :type entry: dict | None
+        :returns: the state, or None if `entry` is still valid, and the
+                  response
+        :rtype: (dict | None, requests.Response)
+        """
+
+        headers = {'Accept': 'application/json'}
+        if entry is not None:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+
+        def is_success(status_code):
+            return 200 <= status_code < 300 or \
+                (entry is not None and status_code == 304)
+
+        if sections is None:
+            response = http.get(url,
+                                is_success=is_success,
+                                timeout=self._timeout,
+                                headers=headers)
+            if response.status_code == 304:
+                return None, response
+            return response.json(), response
+
+        response = http.get(url,
+                            is_success=is_success,
+                            timeout=self._timeout,
+                            headers=headers,
+                            stream=True)
+        try:
+            if response.status_code == 304:
+                return None, response
+            return (util.load_json_sections(
+                response.iter_content(STATE_CHUNK_SIZE), sections),
+                response)
+        finally:
+            response.close()
 
     def get_slave_state(self, slave_id, private_url):
         """Get the Mesos slave state json object
@@ -226,14 +345,19 @@ class DCOSClient(object):
             else:
                 raise
 
-    def metadata(self):
+    def metadata(self, interactive=True):
         """ GET /metadata
 
+        :param interactive: whether to prompt for credentials if the
+                            request must be authenticated
+        :type interactive: bool
         :returns: /metadata content
         :rtype: dict
         """
         url = self.get_dcos_url('metadata')
-        return http.get(url, timeout=self._timeout).json()
+        return http.get(url,
+                        timeout=self._timeout,
+                        interactive=interactive).json()
 
     def browse(self, slave, path):
         """ GET /files/browse.json
@@ -298,10 +422,29 @@ class MesosDNSClient(object):
         return http.get(url, headers={}).json()
 
 
+def _covers(cached_sections, sections):
+    """Whether a state holding `cached_sections` can answer a request for
+    `sections`.
+
+    :param cached_sections: sections held, or None for the whole state
+    :type cached_sections: [str] | None
+    :param sections: sections requested, or None for the whole state
+    :type sections: [str] | None
+    :rtype: bool
+    """
+
+    if cached_sections is None:
+        return True
+    if sections is None:
+        return False
+    return set(sections).issubset(cached_sections)
+
+
 class Master(object):
     """Mesos Master Model
 
-    :param state: Mesos master's state.json
+    :param state: Mesos master's state.json.  May be partial, in which case
+                  missing sections are treated as empty.
     :type state: dict
     """
 
@@ -310,6 +453,11 @@ class Master(object):
         self._frameworks = {}
         self._slaves = {}
 
+        # Indexes over `state`, built lazily on first use
+        self._framework_index = None  # id -> framework dict
+        self._slave_index = None  # id -> slave dict
+        self._task_indexes = {}  # completed -> _TaskIndex
+
     def state(self):
         """Returns master's master/state.json.
 
@@ -392,10 +540,35 @@ class Master(object):
         :rtype: Framework
         """
 
-        for f in self._framework_dicts(True, True):
-            if f['id'] == framework_id:
-                return self._framework_obj(f)
-        return None
+        if self._framework_index is None:
+            self._framework_index = {}
+            for framework in self._framework_dicts(True, True):
+                self._framework_index.setdefault(framework['id'], framework)
+
+        framework = self._framework_index.get(framework_id)
+        if framework is None:
+            return None
+        return self._framework_obj(framework)
+
+    def slave_by_id(self, slave_id):
+        """Returns the slave with the exact ID `slave_id`.  Raises a
+        DCOSException if there is no such slave.
+
+        :param slave_id: the slave's ID
+        :type slave_id: str
+        :returns: the slave
+        :rtype: Slave
+        """
+
+        if self._slave_index is None:
+            self._slave_index = dict(
+                (slave['id'], slave) for slave in self._section('slaves'))
+
+        slave = self._slave_index.get(slave_id)
+        if slave is None:
+            raise DCOSException(
+                'No slave found with ID "{}".'.format(slave_id))
+        return self._slave_obj(slave)
 
     def slaves(self, fltr=""):
         """Returns those slaves that have `fltr` in their 'id'
@@ -407,7 +580,7 @@ class Master(object):
         """
 
         return [self._slave_obj(slave)
-                for slave in self.state()['slaves']
+                for slave in self._section('slaves')
                 if fltr in slave['id']]
 
     def tasks(self, fltr="", completed=False):
@@ -422,18 +595,9 @@ class Master(object):
         :rtype: [Task]
         """
 
-        keys = ['tasks']
-        if completed:
-            keys = ['completed_tasks']
-
-        tasks = []
-        for framework in self._framework_dicts(completed, completed):
-            for task in _merge(framework, keys):
-                if fltr in task['id'] or fnmatch.fnmatchcase(task['id'], fltr):
-                    task = self._framework_obj(framework).task(task['id'])
-                    tasks.append(task)
-
-        return tasks
+        index = self._task_index(completed)
+        return [self._framework_obj(framework)._task_obj(task)
+                for framework, task in index.match(fltr)]
 
     def frameworks(self, inactive=False, completed=False):
         """Returns a list of all frameworks
@@ -492,6 +656,24 @@ class Master(object):
             self._frameworks[framework['id']] = Framework(framework, self)
         return self._frameworks[framework['id']]
 
+    def _task_index(self, completed):
+        """Returns the index over the tasks returned by `tasks()`
+
+        :param completed: index completed tasks instead of running tasks
+        :type completed: bool
+        :returns: task index
+        :rtype: _TaskIndex
+        """
+
+        if completed not in self._task_indexes:
+            keys = ['completed_tasks'] if completed else ['tasks']
+            self._task_indexes[completed] = _TaskIndex(
+                (framework, task)
+                for framework in self._framework_dicts(completed, completed)
+                for task in _merge(framework, keys))
+
+        return self._task_indexes[completed]
+
     def _framework_dicts(self, inactive=False, completed=False):
         """Returns a list of all frameworks as their raw dictionaries
 
@@ -503,13 +685,25 @@ class Master(object):
         """
 
         if completed:
-            for framework in self.state()['completed_frameworks']:
+            for framework in self._section('completed_frameworks'):
                 yield framework
 
-        for framework in self.state()['frameworks']:
+        for framework in self._section('frameworks'):
             if inactive or framework['active']:
                 yield framework
 
+    def _section(self, name):
+        """Returns a top-level list from the state, or an empty list if
+        the section wasn't loaded.
+
+        :param name: section name, e.g. 'slaves'
+        :type name: str
+        :returns: the section
+        :rtype: [dict]
+        """
+
+        return self.state().get(name, [])
+
 
 class Slave(object):
     """Mesos Slave Model
@@ -526,6 +720,7 @@ class Slave(object):
         self._short_state = short_state
         self._state = state
         self._master = master
+        self._executor_index = None  # task id -> executor dict
 
     def state(self):
         """Get the slave's state.json object.  Fetch it if it's not already
@@ -540,6 +735,21 @@ class Slave(object):
                                                        self.http_url())
         return self._state
 
+    def refresh(self, dcos_client=None):
+        """Fetches the slave's state.json again, and drops the executor
+        index built from the previous one.
+
+        :param dcos_client: client to fetch the state with
+        :type dcos_client: DCOSClient | None
+        :rtype: None
+        """
+
+        client = dcos_client or DCOSClient()
+        # the index is dropped after the new state is published, so that
+        # it is never rebuilt from the old one
+        self._state = client.get_slave_state(self['id'], self.http_url())
+        self._executor_index = None
+
     def http_url(self):
         """
         :returns: The private HTTP URL of the slave.  Derived from the
@@ -570,6 +780,31 @@ class Slave(object):
                  for framework in self._framework_dicts()]
         return itertools.chain(*iters)
 
+    def executor(self, task_id):
+        """Returns the executor dictionary that ran the task `task_id`
+
+        :param task_id: the task's ID
+        :type task_id: str
+        :returns: the task's executor, or None if there is no such executor
+        :rtype: dict | None
+        """
+
+        index = self._executor_index
+        if index is None:
+            # built before it is published, so that other threads never
+            # see a partial index
+            index = {}
+            for executor in self.executor_dicts():
+                tasks = _merge(executor,
+                               ['completed_tasks',
+                                'tasks',
+                                'queued_tasks'])
+                for task in tasks:
+                    index.setdefault(task['id'], executor)
+            self._executor_index = index
+
+        return index.get(task_id)
+
     def __getitem__(self, name):
         """Support the slave[attr] syntax
 
@@ -596,6 +831,7 @@ class Framework(object):
         self._framework = framework
         self._master = master
         self._tasks = {}  # id->Task map
+        self._task_index = None  # id->task dict map
 
     def task(self, task_id):
         """Returns a task by id
@@ -606,10 +842,15 @@ class Framework(object):
         :rtype: Task
         """
 
-        for task in _merge(self._framework, ['tasks', 'completed_tasks']):
-            if task['id'] == task_id:
-                return self._task_obj(task)
-        return None
+        if self._task_index is None:
+            self._task_index = {}
+            for task in _merge(self._framework, ['tasks', 'completed_tasks']):
+                self._task_index.setdefault(task['id'], task)
+
+        task = self._task_index.get(task_id)
+        if task is None:
+            return None
+        return self._task_obj(task)
 
     def _task_obj(self, task):
         """Returns the Task object corresponding to the provided `task`
@@ -678,7 +919,7 @@ class Task(object):
         :rtype: Slave
         """
 
-        return self._master.slave(self["slave_id"])
+        return self._master.slave_by_id(self["slave_id"])
 
     def user(self):
         """Task owner
@@ -695,14 +936,7 @@ class Task(object):
         :returns: task's executor
         :rtype: dict
         """
-        for executor in self.slave().executor_dicts():
-            tasks = _merge(executor,
-                           ['completed_tasks',
-                            'tasks',
-                            'queued_tasks'])
-            if any(task['id'] == self['id'] for task in tasks):
-                return executor
-        return None
+        return self.slave().executor(self['id'])
 
     def directory(self):
         """ Sandbox directory for this task
@@ -710,7 +944,12 @@ class Task(object):
         :returns: path to task's sandbox
         :rtype: str
         """
-        return self.executor()['directory']
+
+        executor = self.executor()
+        if executor is None:
+            raise DCOSException(
+                'Unable to find the executor of task [{}]'.format(self['id']))
+        return executor['directory']
 
     def __getitem__(self, name):
         """Support the task[attr] syntax
@@ -742,10 +981,13 @@ class MesosFile(object):
     :type slave: Slave | None
     :param dcos_client: client to use for network requests
     :type dcos_client: DCOSClient | None
+    :param chunk_size: number of bytes to request per files/read.json call
+    :type chunk_size: int | None
 
     """
 
-    def __init__(self, path, task=None, slave=None, dcos_client=None):
+    def __init__(self, path, task=None, slave=None, dcos_client=None,
+                 chunk_size=None):
         if task and slave:
             raise ValueError(
                 "You cannot provide both `task` and `slave` " +
@@ -761,7 +1003,28 @@ class MesosFile(object):
         self._task = task
         self._path = path
         self._dcos_client = dcos_client or DCOSClient()
+        self._chunk_size = chunk_size or FILE_CHUNK_SIZE
         self._cursor = 0
+        self._cached_host_path = None
+        self._stale_host_path = False
+
+    def slave_id(self):
+        """ID of the slave that hosts the file
+
+        :returns: the slave's ID, or None if the file is on the master
+        :rtype: str | None
+        """
+
+        return self._slave['id'] if self._slave else None
+
+    def task_id(self):
+        """ID of the task whose sandbox holds the file
+
+        :returns: the task's ID, or None if the file isn't in a sandbox
+        :rtype: str | None
+        """
+
+        return self._task['id'] if self._task else None
 
     def size(self):
         """Size of the file
@@ -815,19 +1078,150 @@ class MesosFile(object):
         :rtype: str
         """
 
-        data = ''
-        while length is None or length - len(data) > 0:
-            chunk_length = -1 if length is None else length - len(data)
+        return ''.join(self.iter_chunks(length))
+
+    def readinto(self, b):
+        """Reads up to len(b) bytes into `b`.
+
+        :param b: buffer to fill
+        :type b: bytearray
+        :returns: number of bytes read
+        :rtype: int
+        """
+
+        view = memoryview(b)
+        count = 0
+        for chunk in self.iter_chunks(len(b)):
+            data = chunk.encode('utf-8')
+            view[count:count + len(data)] = data
+            count += len(data)
+
+        return count
+
+    def iter_chunks(self, length=None):
+        """Reads up to `length` bytes, or the entire file if `length` is
+        None, one files/read.json response at a time.
+
+        :param length: number of bytes to read
+        :type length: int | None
+        :returns: generator of the data read
+        :rtype: generator of str
+        """
+
+        remaining = length
+        while remaining is None or remaining > 0:
+            if remaining is None:
+                chunk_length = self._chunk_size
+            else:
+                chunk_length = min(remaining, self._chunk_size)
+
+            start = self._cursor
             chunk = self._fetch_chunk(chunk_length)
             if chunk == '':
                 break
-            data += chunk
 
-        return data
+            if remaining is not None:
+                remaining -= self._cursor - start
+            yield chunk
+
+    def download(self, fileobj, parallel=DOWNLOAD_PARALLELISM):
+        """Copies the file into `fileobj`, starting at the current cursor.
+        Up to `parallel` byte ranges are fetched concurrently and written
+        in order.  Range sizes adapt to the observed throughput, so that
+        each range takes about DOWNLOAD_RANGE_SECONDS to fetch.  Data
+        appended to the file after the download starts is not copied, and
+        a range other than the last that comes back short, e.g. because
+        the file was truncated, raises a DCOSException.
+
+        :param fileobj: binary file to write to
+        :type fileobj: file
+        :param parallel: maximum number of concurrent ranges
+        :type parallel: int
+        :returns: number of bytes written
+        :rtype: int
+        """
+
+        min_size, max_size = DOWNLOAD_RANGE_SIZE
+        range_size = min_size
+        end = self.size()
+        start = offset = self._cursor
+        written = 0
+
+        pending = collections.deque()
+        with concurrent.futures.ThreadPoolExecutor(parallel) as pool:
+            while pending or offset < end:
+                while len(pending) < parallel and offset < end:
+                    length = min(range_size, end - offset)
+                    pending.append(
+                        (length,
+                         pool.submit(self._read_range, offset, length)))
+                    offset += length
+
+                length, job = pending.popleft()
+                data, seconds = job.result()
+                if len(data) != length and (pending or offset < end):
+                    # the next range would be written at the wrong offset
+                    raise DCOSException(
+                        'Error downloading [{}]: expected {} bytes at '
+                        'offset {}, but got {}.  The file may have been '
+                        'truncated.'.format(
+                            self, length, start + written, len(data)))
+                fileobj.write(data)
+                written += len(data)
+
+                throughput = len(data) / max(seconds, 0.001)
+                range_size = int(throughput * DOWNLOAD_RANGE_SECONDS)
+                range_size = max(min_size, min(range_size, max_size))
+
+        self.seek(start + written)
+        return written
+
+    def _read_range(self, offset, length):
+        """Reads `length` bytes starting at `offset`, or less if EOF is
+        reached first.  Doesn't use or move the cursor, so it's safe to call
+        concurrently.
+
+        :param offset: start location
+        :type offset: int
+        :param length: number of bytes to read
+        :type length: int
+        :returns: data read, and the number of seconds it took
+        :rtype: (bytes, float)
+        """
+
+        start_time = time.time()
+        chunks = []
+        end = offset + length
+        while offset < end:
+            chunk_length = min(end - offset, self._chunk_size)
+            params = self._params(chunk_length, offset=offset)
+            data = self._fetch(params)["data"].encode('utf-8')
+            if not data:
+                break
+            chunks.append(data)
+            offset += len(data)
+
+        return b''.join(chunks), time.time() - start_time
 
     def _host_path(self):
-        """ The absolute path to the file on slave.
+        """ The absolute path to the file on slave.  Resolving it walks the
+        slave's executors, so it is computed once and reused until a read
+        fails with a 404.  It is then resolved again from a fresh copy of
+        the slave's state.
+
+        :returns: the absolute path to the file on slave
+        :rtype: str
+        """
 
+        if self._cached_host_path is None:
+            if self._stale_host_path:
+                self._slave.refresh(self._dcos_client)
+                self._stale_host_path = False
+            self._cached_host_path = self._resolve_host_path()
+        return self._cached_host_path
+
+    def _resolve_host_path(self):
+        """
         :returns: the absolute path to the file on slave
         :rtype: str
         """
@@ -880,7 +1274,8 @@ class MesosFile(object):
 
         params = self._params(length)
         data = self._fetch(params)["data"]
-        self.seek(len(data), os.SEEK_CUR)
+        # offsets are in bytes, and the data is the file's utf-8 text
+        self.seek(len(data.encode('utf-8')), os.SEEK_CUR)
         return data
 
     def _fetch(self, params):
@@ -892,12 +1287,21 @@ class MesosFile(object):
         :rtype: dict
         """
 
-        if self._slave:
-            return self._dcos_client.slave_file_read(self._slave['id'],
-                                                     self._slave.http_url(),
-                                                     **params)
-        else:
-            return self._dcos_client.master_file_read(**params)
+        try:
+            if self._slave:
+                return self._dcos_client.slave_file_read(
+                    self._slave['id'],
+                    self._slave.http_url(),
+                    **params)
+            else:
+                return self._dcos_client.master_file_read(**params)
+        except DCOSHTTPException as e:
+            if e.response.status_code == 404 and self._task:
+                # the executor may be gone, or its sandbox moved.  resolve
+                # the path from fresh slave state next time.
+                self._cached_host_path = None
+                self._stale_host_path = True
+            raise
 
     def __str__(self):
         """String representation of the file: <task_id:file_path>
@@ -914,6 +1318,62 @@ class MesosFile(object):
             return "master:{0}".format(self._path)
 
 
+_GLOB_CHARS_RE = re.compile(r'[*?[]')
+"""Characters that make a task filter a unix glob pattern"""
+
+
+class _TaskIndex(object):
+    """Index over (framework, task) dictionary pairs, used to answer the
+    task ID filters of `Master.tasks()` without creating Task objects for
+    tasks that don't match.
+
+    :param entries: (framework, task) pairs, in the order they should be
+                    returned
+    :type entries: iterable of (dict, dict)
+    """
+
+    def __init__(self, entries):
+        self._entries = list(entries)
+        self._ids = [task['id'] for _, task in self._entries]
+        self._sorted_ids = sorted(
+            (task_id, position) for position, task_id in enumerate(self._ids))
+
+    def match(self, fltr):
+        """Returns the (framework, task) pairs whose task ID contains
+        `fltr`, or matches `fltr` as a unix glob pattern.
+
+        :param fltr: substring or glob pattern
+        :type fltr: str
+        :returns: matching (framework, task) pairs
+        :rtype: [(dict, dict)]
+        """
+
+        if not fltr:
+            return list(self._entries)
+
+        positions = set(position
+                        for position, task_id in enumerate(self._ids)
+                        if fltr in task_id)
+
+        # Without wildcards a glob only matches the identical string,
+        # which the substring check above already found
+        glob_start = _GLOB_CHARS_RE.search(fltr)
+        if glob_start:
+            prefix = fltr[:glob_start.start()]
+            pattern = re.compile(fnmatch.translate(fltr))
+
+            start = bisect.bisect_left(self._sorted_ids, (prefix,))
+            for task_id, position in itertools.islice(self._sorted_ids,
+                                                      start,
+                                                      None):
+                if not task_id.startswith(prefix):
+                    break
+                if pattern.match(task_id):
+                    positions.add(position)
+
+        return [self._entries[position] for position in sorted(positions)]
+
+
 def parse_pid(pid):
     """ Parse the mesos pid string,
 
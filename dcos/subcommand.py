@@ -5,7 +5,7 @@ import os
 import shutil
 import subprocess
 
-from dcos import constants, util
+from dcos import cache, constants, util
 from dcos.errors import DCOSException
 
 logger = util.get_logger(__name__)
@@ -45,9 +45,7 @@ def get_package_commands(package_name):
     :returns: list of all the dcos program paths in package
     :rtype: [str]
     """
-    bin_dir = os.path.join(_package_dir(package_name),
-                           constants.DCOS_SUBCOMMAND_VIRTUALENV_SUBDIR,
-                           BIN_DIRECTORY)
+    bin_dir = _package_bin_dir(package_name)
 
     executables = []
     for filename in os.listdir(bin_dir):
@@ -62,14 +60,41 @@ def get_package_commands(package_name):
 
 
 def list_paths():
-    """List the real path to executable dcos subcommand programs.
+    """List the real path to executable dcos subcommand programs.  The list
+    is cached, and is only recomputed when one of the scanned directories
+    has been modified since.
+
+    :returns: list of all the dcos program paths
+    :rtype: [str]
+    """
+
+    if cache.enabled():
+        index = cache.load('subcommands', util.dcos_bin_path())
+        if index is not None and \
+                index['mtimes'] == _mtimes(list(index['mtimes'])):
+            return index['paths']
+
+    return _update_index()
+
+
+def _update_index():
+    """Scans the dcos bin directory and the installed packages for dcos
+    programs, and caches the result for :py:func:`list_paths`.
 
     :returns: list of all the dcos program paths
     :rtype: [str]
     """
 
-    # Let's get all the default subcommands
     binpath = util.dcos_bin_path()
+    packages = distributions()
+
+    # record the modification times before scanning, so that a concurrent
+    # change invalidates the index rather than being lost
+    directories = [binpath, _subcommand_dir()] + \
+        [_package_bin_dir(package) for package in packages]
+    mtimes = _mtimes(directories)
+
+    # Let's get all the default subcommands
     commands = [
         os.path.join(binpath, filename)
         for filename in os.listdir(binpath)
@@ -78,10 +103,30 @@ def list_paths():
     ]
 
     subcommands = []
-    for package in distributions():
+    for package in packages:
         subcommands += get_package_commands(package)
 
-    return commands + subcommands
+    paths = commands + subcommands
+    cache.store('subcommands', binpath, {'mtimes': mtimes, 'paths': paths})
+    return paths
+
+
+def _mtimes(directories):
+    """
+    :param directories: paths to directories
+    :type directories: [str]
+    :returns: the modification time of each directory, or None if it
+              doesn't exist
+    :rtype: {str: float | None}
+    """
+
+    mtimes = {}
+    for directory in directories:
+        try:
+            mtimes[directory] = os.stat(directory).st_mtime
+        except OSError:
+            mtimes[directory] = None
+    return mtimes
 
 
 def _is_executable(path):
@@ -142,10 +187,12 @@ def info(executable_path, path_noun):
     :rtype: str
     """
 
-    out = subprocess.check_output(
-        [executable_path, path_noun, '--info'])
+    def run():
+        out = subprocess.check_output(
+            [executable_path, path_noun, '--info'])
+        return out.decode('utf-8').strip()
 
-    return out.decode('utf-8').strip()
+    return _metadata(executable_path, 'info', run)
 
 
 def config_schema(executable_path):
@@ -157,10 +204,47 @@ def config_schema(executable_path):
     :rtype: dict
     """
 
-    out = subprocess.check_output(
-        [executable_path, noun(executable_path), '--config-schema'])
+    def run():
+        out = subprocess.check_output(
+            [executable_path, noun(executable_path), '--config-schema'])
+        return json.loads(out.decode('utf-8'))
 
-    return json.loads(out.decode('utf-8'))
+    return _metadata(executable_path, 'config_schema', run)
+
+
+def _metadata(executable_path, name, run):
+    """Returns the metadata `name` for the dcos program at
+    `executable_path`.  Running a program costs an interpreter start, so
+    the result is cached until the program's modification time or size
+    changes.
+
+    :param executable_path: real path to the dcos subcommand
+    :type executable_path: str
+    :param name: metadata name, e.g. 'info'
+    :type name: str
+    :param run: function that runs the program to collect the metadata
+    :type run: () -> object
+    :returns: the metadata
+    :rtype: object
+    """
+
+    try:
+        stat = os.stat(executable_path)
+    except OSError:
+        return run()
+
+    version = [stat.st_mtime, stat.st_size]
+    entry = None
+    if cache.enabled():
+        entry = cache.load('subcommand', executable_path)
+    if entry is None or entry['version'] != version:
+        entry = {'version': version}
+
+    if name not in entry:
+        entry[name] = run()
+        cache.store('subcommand', executable_path, entry)
+
+    return entry[name]
 
 
 def noun(executable_path):
@@ -240,6 +324,18 @@ def install(pkg, options):
 
     _install_env(pkg, options)
 
+    _update_index()
+
+    # collect the metadata now so that `dcos help` and `dcos config` don't
+    # have to run the new programs later
+    for executable in get_package_commands(pkg.name()):
+        try:
+            info(executable, noun(executable))
+            config_schema(executable)
+        except Exception:
+            logger.exception('Unable to collect metadata for [%s]',
+                             executable)
+
 
 def _subcommand_dir():
     """ Returns ~/.dcos/subcommands """
@@ -259,8 +355,21 @@ def _package_dir(name):
                         name)
 
 
+def _package_bin_dir(name):
+    """ Returns ~/.dcos/subcommands/<name>/env/bin
+
+    :param name: package name
+    :type name: str
+    :rtype: str
+    """
+    return os.path.join(_package_dir(name),
+                        constants.DCOS_SUBCOMMAND_VIRTUALENV_SUBDIR,
+                        BIN_DIRECTORY)
+
+
 def uninstall(package_name):
-    """Uninstall the dcos cli subcommand
+    """Uninstall the dcos cli subcommand, and drop the metadata cached
+    for its programs
 
     :param package_name: the name of the package
     :type package_name: str
@@ -271,7 +380,11 @@ def uninstall(package_name):
     pkg_dir = _package_dir(package_name)
 
     if os.path.isdir(pkg_dir):
+        if os.path.isdir(_package_bin_dir(package_name)):
+            for executable in get_package_commands(package_name):
+                cache.remove('subcommand', executable)
         shutil.rmtree(pkg_dir)
+        _update_index()
         return True
 
     return False
@@ -1,3 +1,4 @@
+import codecs
 import collections
 import contextlib
 import functools
@@ -12,9 +13,6 @@ import tempfile
 import time
 
 import concurrent.futures
-import jsonschema
-import png
-import pystache
 import six
 from dcos import constants
 from dcos.errors import DCOSException
@@ -344,6 +342,272 @@ def load_jsons(value):
         raise DCOSException('Error loading JSON.')
 
 
+def load_json_sections(chunks, keys):
+    """Incrementally deserialize the members named in `keys` from a JSON
+    object split across `chunks`.  Reading stops as soon as every member
+    in `keys` has been deserialized, so the rest of the document is never
+    downloaded.  Members that weren't requested are skipped without being
+    deserialized, so only the requested members are held in memory.
+
+    :param chunks: the JSON object, e.g. from `Response.iter_content()`
+    :type chunks: iterable of bytes
+    :param keys: names of the top-level members to deserialize
+    :type keys: [str]
+    :returns: the requested members that were present in the object
+    :rtype: dict
+    """
+
+    reader = _JSONReader(chunks)
+    remaining = set(keys)
+    sections = {}
+
+    try:
+        for key in reader.members():
+            if key not in remaining:
+                reader.skip()
+                continue
+
+            sections[key] = reader.value()
+            remaining.discard(key)
+            if not remaining:
+                break
+    except ValueError as error:
+        logger.error(
+            'Unhandled exception while loading JSON: %r',
+            error)
+
+        raise DCOSException('Error loading JSON: {}'.format(error))
+
+    return sections
+
+
+def iter_json_array(chunks, key):
+    """Incrementally deserialize the elements of the array stored in the
+    top-level member `key` of a JSON object split across `chunks`.  Each
+    element is yielded as soon as it is complete, and reading stops at the
+    end of the array.  The members preceding `key` are skipped without
+    being deserialized, and only one element is held in memory at a time.
+
+    :param chunks: the JSON object, e.g. from `Response.iter_content()`
+    :type chunks: iterable of bytes
+    :param key: name of the top-level member holding the array
+    :type key: str
+    :returns: the elements of the array, in order
+    :rtype: generator of dict | list | str | int | float | bool
+    """
+
+    reader = _JSONReader(chunks)
+
+    try:
+        for member in reader.members():
+            if member != key:
+                reader.skip()
+                continue
+
+            for item in reader.elements():
+                yield item
+            break
+    except ValueError as error:
+        logger.error(
+            'Unhandled exception while loading JSON: %r',
+            error)
+
+        raise DCOSException('Error loading JSON: {}'.format(error))
+
+
+class _JSONReader(object):
+    """Reads the values of a JSON document split across chunks, one at a
+    time.  Values are deserialized by the json module, and only the
+    structure of the enclosing object or array is parsed here.
+
+    :param chunks: the JSON document
+    :type chunks: iterable of bytes
+    """
+
+    _WHITESPACE_RE = re.compile(r'[ \t\n\r]*')
+    # the next bracket outside a string, the opening quote of a string
+    # that isn't fully read yet, or the end of the text
+    _SKIP_RE = re.compile(
+        r'[^][{}"]*(?:"[^"\\]*(?:\\.[^"\\]*)*"[^][{}"]*)*([][{}"]|\Z)')
+    _NUMBER_START = '-0123456789'
+    _NUMBER_CHARS = '+-.0123456789Ee'
+    _DECODER = json.JSONDecoder()
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder('utf-8')()
+        self._text = ''
+        self._pos = 0
+        self._eof = False
+
+    def members(self):
+        """Iterates over the member names of the object starting at the
+        current position.  The caller must read each member's value with
+        `value()` before asking for the next name.
+
+        :returns: the member names
+        :rtype: generator of str
+        """
+
+        self._expect('{')
+        if self._peek() == '}':
+            self._pos += 1
+            return
+
+        while True:
+            key = self.value()
+            if not isinstance(key, six.string_types):
+                raise ValueError('Expected a member name')
+            self._expect(':')
+            yield key
+            if self._expect(',}') == '}':
+                return
+
+    def elements(self):
+        """Iterates over the elements of the array starting at the current
+        position.
+
+        :returns: the elements
+        :rtype: generator of dict | list | str | int | float | bool
+        """
+
+        self._expect('[')
+        if self._peek() == ']':
+            self._pos += 1
+            return
+
+        while True:
+            yield self.value()
+            if self._expect(',]') == ']':
+                return
+
+    def value(self):
+        """Deserializes the value starting at the current position.
+
+        :returns: the value
+        :rtype: dict | list | str | int | float | bool | None
+        """
+
+        self._peek()
+        while True:
+            try:
+                value, end = self._DECODER.raw_decode(self._text, self._pos)
+            except ValueError as error:
+                # Either invalid or not fully read.  Growing the buffered
+                # text geometrically keeps the retries linear overall.
+                if self._read(3 * (len(self._text) - self._pos)):
+                    continue
+                if getattr(error, 'pos', 0) >= len(self._text):
+                    raise ValueError('unexpected end of data')
+                raise
+
+            # a number may continue in the next chunk, even if the json
+            # module stopped before the end of the text: "1." is read as 1
+            number = self._text[self._pos] in self._NUMBER_START
+            if not (number and (end == len(self._text) or
+                                self._text[end] in self._NUMBER_CHARS)) or \
+                    not self._read(len(self._text) - self._pos):
+                self._pos = end
+                return value
+
+    def skip(self):
+        """Reads past the value starting at the current position without
+        deserializing it.  Objects and arrays are scanned for their end by
+        tracking the nesting depth and skipping over the strings in them,
+        so they are neither decoded nor held in memory whole.  Their
+        contents are not validated.  Other values are deserialized.
+
+        :rtype: None
+        """
+
+        char = self._peek()
+        if not char or char not in '{[':
+            self.value()
+            return
+
+        depth = 0
+        while True:
+            for match in self._SKIP_RE.finditer(self._text, self._pos):
+                token = match.group(1)
+                if not token or token == '"':
+                    pos = match.start(1)
+                    break
+                elif token in '{[':
+                    depth += 1
+                else:
+                    depth -= 1
+                    if depth == 0:
+                        self._pos = match.end()
+                        return
+
+            # the text before `pos` has been scanned, and is discarded.
+            # An incomplete string is read again once more of it arrives,
+            # so the buffer grows geometrically, as in `value`.
+            self._pos = pos
+            if not self._read(3 * (len(self._text) - pos)):
+                raise ValueError('unexpected end of data')
+
+    def _peek(self):
+        """
+        :returns: the next character that isn't whitespace, which is left
+                  unread, or '' at the end of the document
+        :rtype: str
+        """
+
+        while True:
+            self._pos = self._WHITESPACE_RE.match(self._text, self._pos).end()
+            if self._pos < len(self._text):
+                return self._text[self._pos]
+            if not self._read(1):
+                return ''
+
+    def _expect(self, chars):
+        """Reads the next character that isn't whitespace.
+
+        :param chars: characters allowed at this position
+        :type chars: str
+        :returns: the character read
+        :rtype: str
+        """
+
+        char = self._peek()
+        if not char:
+            raise ValueError('unexpected end of data')
+        if char not in chars:
+            raise ValueError('Expected {} but found {!r}'.format(
+                ' or '.join(repr(c) for c in chars), char))
+        self._pos += 1
+        return char
+
+    def _read(self, size):
+        """Buffers at least `size` more characters, or the rest of the
+        document, discarding the text that has already been read.
+
+        :param size: number of characters to read
+        :type size: int
+        :returns: False if the document had already been fully read
+        :rtype: bool
+        """
+
+        if self._eof:
+            return False
+
+        parts = [self._text[self._pos:]]
+        read = 0
+        while read < max(size, 1):
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                parts.append(self._utf8.decode(b'', final=True))
+                self._eof = True
+                break
+            parts.append(self._utf8.decode(chunk))
+            read += len(parts[-1])
+
+        self._text = ''.join(parts)
+        self._pos = 0
+        return True
+
+
 def validate_json(instance, schema):
     """Validate an instance under the given schema.
 
@@ -358,6 +622,8 @@ def validate_json(instance, schema):
     def sort_key(ve):
         return six.u(_hack_error_message_fix(ve.message))
 
+    import jsonschema
+
     validator = jsonschema.Draft4Validator(schema)
     validation_errors = list(validator.iter_errors(instance))
     validation_errors = sorted(validation_errors, key=sort_key)
@@ -515,7 +781,7 @@ def render_mustache_json(template, data):
     """
 
     try:
-        r = CustomJsonRenderer()
+        r = _json_renderer()
         rendered = r.render(template, data)
     except Exception as e:
         logger.exception(
@@ -540,21 +806,31 @@ def is_windows_platform():
     return platform.system() == "Windows"
 
 
-class CustomJsonRenderer(pystache.Renderer):
-    def str_coerce(self, val):
-        """
-        Coerce a non-string value to a string.
-        This method is called whenever a non-string is encountered during the
-        rendering process when a string is needed (e.g. if a context value
-        for string interpolation is not a string).
-
-        :param val: the mustache template to render
-        :type val: any
-        :returns: a string containing a JSON representation of the value
-        :rtype: str
-        """
+def _json_renderer():
+    """
+    :returns: a mustache renderer that renders non-string values as JSON
+    :rtype: pystache.Renderer
+    """
+
+    import pystache
+
+    class CustomJsonRenderer(pystache.Renderer):
+        def str_coerce(self, val):
+            """
+            Coerce a non-string value to a string.
+            This method is called whenever a non-string is encountered during
+            the rendering process when a string is needed (e.g. if a context
+            value for string interpolation is not a string).
 
-        return json.dumps(val)
+            :param val: the mustache template to render
+            :type val: any
+            :returns: a string containing a JSON representation of the value
+            :rtype: str
+            """
+
+            return json.dumps(val)
+
+    return CustomJsonRenderer()
 
 
 def duration(fn):
@@ -645,7 +921,7 @@ def io_exception(path, errno):
 STREAM_CONCURRENCY = 20
 
 
-def stream(fn, objs):
+def stream(fn, objs, pool=None):
     """Apply `fn` to `objs` in parallel, yielding the (Future, obj) for
     each as it completes.
 
@@ -653,15 +929,24 @@ def stream(fn, objs):
     :type fn: function
     :param objs: objs
     :type objs: objs
+    :param pool: executor to run `fn` on.  If None, a new one is created
+                 and shut down once all of `objs` are processed.
+    :type pool: concurrent.futures.Executor | None
     :returns: iterator over (Future, typeof(obj))
     :rtype: iterator over (Future, typeof(obj))
 
     """
 
-    with concurrent.futures.ThreadPoolExecutor(STREAM_CONCURRENCY) as pool:
-        jobs = {pool.submit(fn, obj): obj for obj in objs}
-        for job in concurrent.futures.as_completed(jobs):
-            yield job, jobs[job]
+    if pool is None:
+        with concurrent.futures.ThreadPoolExecutor(
+                STREAM_CONCURRENCY) as pool:
+            for result in stream(fn, objs, pool):
+                yield result
+        return
+
+    jobs = {pool.submit(fn, obj): obj for obj in objs}
+    for job in concurrent.futures.as_completed(jobs):
+        yield job, jobs[job]
 
 
 def get_ssh_options(config_file, options):
@@ -694,6 +979,8 @@ def validate_png(filename):
     :rtype: None
     """
 
+    import png
+
     try:
         png.Reader(filename=filename).validate_signature()
     except Exception as e:
@@ -0,0 +1,53 @@
+from dcos import cache, constants
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def home(tmpdir, monkeypatch):
+    monkeypatch.setenv('HOME', str(tmpdir))
+    monkeypatch.delenv(constants.DCOS_NO_CACHE_ENV, raising=False)
+    return tmpdir
+
+
+def test_load_missing():
+    assert cache.load('state', 'http://dcos.example.com') is None
+
+
+def test_store_and_load():
+    cache.store('state', 'http://dcos.example.com', {'slaves': []})
+
+    assert cache.load('state', 'http://dcos.example.com') == {'slaves': []}
+    assert cache.load('state', 'http://other.example.com') is None
+    assert cache.load('other', 'http://dcos.example.com') is None
+
+
+def test_store_replaces_value():
+    cache.store('state', 'key', {'version': 1})
+    cache.store('state', 'key', {'version': 2})
+
+    assert cache.load('state', 'key') == {'version': 2}
+
+
+def test_load_corrupt():
+    cache.store('state', 'key', {})
+    path = cache._cache_path('state', 'key')
+    with open(path, 'w') as cache_file:
+        cache_file.write('{"truncated": ')
+
+    assert cache.load('state', 'key') is None
+
+
+def test_remove():
+    cache.store('state', 'key', {})
+    cache.remove('state', 'key')
+    cache.remove('state', 'key')
+
+    assert cache.load('state', 'key') is None
+
+
+def test_enabled(monkeypatch):
+    assert cache.enabled()
+
+    monkeypatch.setenv(constants.DCOS_NO_CACHE_ENV, 'true')
+    assert not cache.enabled()
@@ -100,6 +100,39 @@ def test_mutable_iterator(mutable_conf):
     ])
 
 
+def test_load_from_path_reuses_parsed_config(tmpdir):
+    path = tmpdir.join('dcos.toml')
+    path.write('[core]\ntimeout = 5\n')
+
+    first = config.load_from_path(str(path))
+    second = config.load_from_path(str(path))
+    assert first._dictionary is second._dictionary
+
+    mutable = config.load_from_path(str(path), mutable=True)
+    mutable['core.timeout'] = 10
+    assert config.load_from_path(str(path))['core.timeout'] == 5
+
+
+def test_load_from_path_reparses_modified_config(tmpdir):
+    path = tmpdir.join('dcos.toml')
+    path.write('[core]\ntimeout = 5\n')
+    assert config.load_from_path(str(path))['core.timeout'] == 5
+
+    path.write('[core]\ntimeout = 15\n')
+    assert config.load_from_path(str(path))['core.timeout'] == 15
+
+
+def test_save_invalidates_parsed_config(tmpdir, monkeypatch):
+    path = tmpdir.join('dcos.toml')
+    path.write('[core]\ntimeout = 5\n')
+    monkeypatch.setenv('DCOS_CONFIG', str(path))
+
+    toml_config = config.load_from_path(str(path), mutable=True)
+    toml_config['core.timeout'] = 6
+    config.save(toml_config)
+    assert config.load_from_path(str(path))['core.timeout'] == 6
+
+
 def _conf():
     return {
         'dcos': {
@@ -0,0 +1,57 @@
+from dcos import emitting
+
+
+def test_publish_batch(capsys):
+    emitter = emitting.FlatEmitter()
+
+    emitter.publish_batch(['a', '', 'b'])
+    emitter.publish_batch(line for line in ['c', 'd'])
+    emitter.publish_batch([], page=False)
+
+    assert capsys.readouterr()[0] == 'a\n\nb\nc\nd\n'
+
+
+def test_publish_batch_single_write(monkeypatch):
+    writes = []
+    monkeypatch.setattr(emitting, 'print', writes.append, raising=False)
+
+    emitting.FlatEmitter().publish_batch(
+        ('line {}'.format(i) for i in range(1000)), page=False)
+
+    assert writes == ['\n'.join('line {}'.format(i) for i in range(1000))]
+
+
+def test_publish_batch_with_handler():
+    events = []
+    emitter = emitting.FlatEmitter(events.append)
+
+    emitter.publish_batch(['a', 'b'])
+
+    assert events == ['a', 'b']
+
+
+def test_publish_batch_with_batch_handler():
+    batches = []
+    emitter = emitting.FlatEmitter(
+        batch_handler=lambda lines, page: batches.append((list(lines), page)))
+
+    emitter.publish_batch(['a', 'b'], page=False)
+
+    assert batches == [(['a', 'b'], False)]
+
+
+def test_publish_table(capsys):
+    emitting.publish_table(emitting.FlatEmitter(), [1, 2],
+                           lambda objs: 'table of {}'.format(len(objs)),
+                           False)
+
+    assert capsys.readouterr()[0] == 'table of 2\n'
+
+
+def test_publish_table_with_handler():
+    events = []
+    emitter = emitting.FlatEmitter(events.append)
+    emitting.publish_table(emitter, ['a', 'b'],
+                           lambda objs: '\n'.join(objs), False)
+
+    assert events == ['a\nb']
@@ -0,0 +1,32 @@
+from dcos import http
+
+
+def test_get_session_reuses_session():
+    first = http._get_session('https://dcos.example.com/mesos/master/state')
+    second = http._get_session('https://dcos.example.com/marathon/v2/apps')
+
+    assert first is second
+
+
+def test_get_session_keyed_by_tls_settings():
+    url = 'https://dcos.example.com/'
+
+    assert (http._get_session(url, verify=True) is not
+            http._get_session(url, verify=False))
+    assert (http._get_session(url, cert=['cert.pem', 'key.pem']) is
+            http._get_session(url, cert=('cert.pem', 'key.pem')))
+
+
+def test_get_session_keyed_by_host():
+    assert (http._get_session('http://10.0.0.1:5051/state.json') is not
+            http._get_session('http://10.0.0.2:5051/state.json'))
+    assert (http._get_session('http://10.0.0.1:5051/state.json') is not
+            http._get_session('http://10.0.0.1:5052/state.json'))
+
+
+def test_create_session_pool_size():
+    session = http._create_session(3)
+    adapter = session.get_adapter('https://dcos.example.com/')
+
+    assert adapter._pool_maxsize == 3
+    assert adapter._pool_block
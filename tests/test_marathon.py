@@ -0,0 +1,254 @@
+import json
+
+import requests
+from dcos import marathon
+from dcos.errors import DCOSException
+
+import pytest
+
+
+class _FakeStream(object):
+
+    def __init__(self, chunks, error=None):
+        self.chunks = chunks
+        self.error = error
+        self.closed = False
+
+    def iter_content(self, chunk_size):
+        for chunk in self.chunks:
+            yield chunk
+        if self.error is not None:
+            raise self.error
+
+    def close(self):
+        self.closed = True
+
+
+class _FakeResponse(object):
+
+    def __init__(self, body):
+        self._body = body
+
+    def json(self):
+        return self._body
+
+
+class _Streams(list):
+    """GET v2/events returns the queued streams, or raises the queued
+    exceptions, in order."""
+
+    def __init__(self):
+        super(_Streams, self).__init__()
+        self.requests = []
+        self.sleeps = []
+
+    def get(self, url, **kwargs):
+        if url.endswith('v2/info'):
+            return _FakeResponse({'version': '0.15.0'})
+        self.requests.append(kwargs)
+        item = self.pop(0)
+        if isinstance(item, Exception):
+            raise item
+        return item
+
+
+@pytest.fixture
+def streams(monkeypatch):
+    queue = _Streams()
+    monkeypatch.setattr(marathon.http, 'get', queue.get)
+    monkeypatch.setattr(marathon.time, 'sleep', queue.sleeps.append)
+    return queue
+
+
+def _client():
+    return marathon.Client('http://marathon.example.com/')
+
+
+def test_parse_events():
+    chunks = [b': keep-alive\r\n\r\nevent: deployment_info\r',
+              b'\ndata: {"plan": \n',
+              b'data: {"id": "d1"}}\r\n\r\n',
+              b'data: {"bare": true}\n\nevent: bad\ndata: {\n\n',
+              b'event: status_update_event\ndata:{"taskId": "t\xc3\xa9"}\n\n',
+              b'event: incomplete\ndata: {}\n']
+
+    assert list(marathon._parse_events(chunks)) == [
+        ('deployment_info', {'plan': {'id': 'd1'}}),
+        ('message', {'bare': True}),
+        ('status_update_event', {'taskId': u't\xe9'}),
+    ]
+
+
+def test_events(streams):
+    streams.append(_FakeStream([
+        b'event: deployment_info\ndata: {"plan": {"id": "d1"}}\n\n',
+        b'event: status_update_event\ndata: {"taskId": "t1"}\n\n',
+        b'event: deployment_success\ndata: {"id": "d1"}\n\n']))
+
+    events = _client().events(marathon.DEPLOYMENT_EVENTS)
+
+    # connected before the first event is requested
+    assert streams.requests[0]['params'] == {
+        'event_type': marathon.DEPLOYMENT_EVENTS}
+    assert streams.requests[0]['stream'] is True
+
+    event = next(events)
+    assert event.type == 'deployment_info'
+    assert event['plan'] == {'id': 'd1'}
+
+    event = next(events)
+    assert event.type == 'deployment_success'
+    assert event.dict() == {'id': 'd1'}
+
+
+def test_events_reconnect(streams):
+    first = _FakeStream(
+        [b'event: a\ndata: {"n": 1}\n\n'],
+        requests.exceptions.ChunkedEncodingError())
+    streams.extend([
+        first,
+        DCOSException('unreachable'),
+        _FakeStream([b'event: a\ndata: {"n": 2}\n\n'])])
+
+    events = _client().events()
+
+    assert next(events).dict() == {'n': 1}
+    assert next(events).type == marathon.RECONNECTED_EVENT
+    assert next(events).dict() == {'n': 2}
+    assert first.closed
+    assert streams.sleeps == [1, 2]
+
+
+def test_events_read_timeout(streams):
+    streams.append(_FakeStream([]))
+
+    _client().events()
+
+    assert streams.requests[0]['timeout'][1] == marathon.EVENT_READ_TIMEOUT
+
+
+def test_events_reconnect_after_stall(streams, monkeypatch):
+    monkeypatch.setattr(marathon, 'EVENT_RECONNECT_LIMIT', 2)
+    clock = [0]
+    monkeypatch.setattr(marathon.time, 'time', lambda: clock[0])
+
+    class _QuietStream(_FakeStream):
+
+        def iter_content(self, chunk_size):
+            clock[0] += marathon.EVENT_READ_TIMEOUT
+            raise requests.exceptions.ConnectionError('Read timed out.')
+
+    streams.append(_QuietStream([]))
+    streams.append(DCOSException('unreachable'))
+    streams.append(_QuietStream([]))
+    streams.append(DCOSException('unreachable'))
+    streams.append(_FakeStream([b'event: a\ndata: {"n": 1}\n\n']))
+
+    events = _client().events()
+
+    # a stalled stream does not count towards the reconnection limit
+    assert next(events).type == marathon.RECONNECTED_EVENT
+    assert next(events).type == marathon.RECONNECTED_EVENT
+    assert next(events).dict() == {'n': 1}
+    assert streams.sleeps == [1, 2, 1, 2]
+
+
+def test_events_reconnect_limit(streams, monkeypatch):
+    monkeypatch.setattr(marathon, 'EVENT_RECONNECT_LIMIT', 3)
+    streams.append(_FakeStream([]))
+    streams.extend([DCOSException('unreachable')] * 3)
+
+    events = _client().events()
+
+    with pytest.raises(DCOSException) as exc_info:
+        next(events)
+    assert str(exc_info.value) == \
+        'Lost the connection to the Marathon event stream'
+    assert streams.sleeps == [1, 2, 4]
+
+
+class _FakeAppsResponse(object):
+
+    def __init__(self, apps, stream):
+        self._body = json.dumps({'apps': apps}).encode('utf-8')
+        self._stream = stream
+        self.closed = False
+
+    def json(self):
+        assert not self._stream
+        return json.loads(self._body.decode('utf-8'))
+
+    def iter_content(self, chunk_size):
+        assert self._stream
+        # small pieces, to exercise the streaming parser
+        for start in range(0, len(self._body), 7):
+            yield self._body[start:start + 7]
+
+    def close(self):
+        self.closed = True
+
+
+_APPS = [
+    {'id': '/kafka', 'labels': {'DCOS_PACKAGE_FRAMEWORK_NAME': 'kafka'}},
+    {'id': '/web/frontend', 'labels': {}},
+    {'id': '/web/backend', 'labels': {'team': 'a b,c'}},
+    {'id': '/website'},
+]
+
+
+@pytest.fixture
+def apps(monkeypatch):
+    calls = []
+
+    def get(url, **kwargs):
+        if url.endswith('v2/info'):
+            return _FakeResponse({'version': '0.15.0'})
+        calls.append(kwargs['params'])
+        # an old Marathon that ignores the filters
+        return _FakeAppsResponse(_APPS, kwargs.get('stream', False))
+
+    monkeypatch.setattr(marathon.http, 'get', get)
+    return calls
+
+
+def test_get_apps(apps):
+    assert _client().get_apps() == _APPS
+    assert apps == [None]
+
+
+def test_get_apps_filters(apps, monkeypatch):
+    # filtered lists are streamed, not loaded in one piece
+    monkeypatch.delattr(_FakeAppsResponse, 'json')
+    client = _client()
+
+    assert client.get_apps(app_id='web/') == _APPS[1:3]
+    assert client.get_apps(app_id='/web') == _APPS[1:]
+    assert client.get_apps(labels={'team': 'a b,c'}) == [_APPS[2]]
+    assert client.get_apps(labels={'team': 'a b,c'}, app_id='/kafka') == []
+
+    assert apps == [
+        {'id': '/web/'},
+        {'id': '/web'},
+        {'label': r'team==a\ b\,c'},
+        {'label': r'team==a\ b\,c', 'id': '/kafka'},
+    ]
+
+
+def test_iter_apps(apps):
+    client = _client()
+
+    assert list(client.iter_apps()) == _APPS
+    assert list(client.iter_apps(app_id='web/')) == _APPS[1:3]
+    assert apps == [None, {'id': '/web/'}]
+
+
+def test_get_apps_embed(apps):
+    _client().get_apps(embed=['apps.counts', 'apps.deployments'])
+
+    assert apps == [{'embed': ['apps.counts', 'apps.deployments']}]
+
+
+def test_get_apps_for_framework(apps, monkeypatch):
+    monkeypatch.delattr(_FakeAppsResponse, 'json')
+    assert _client().get_apps_for_framework('kafka') == [_APPS[0]]
+    assert apps == [{'label': 'DCOS_PACKAGE_FRAMEWORK_NAME==kafka'}]
@@ -0,0 +1,394 @@
+import io
+import json
+
+from dcos import constants, http, mesos
+from dcos.errors import DCOSException, DCOSHTTPException
+
+import pytest
+
+
+@pytest.fixture
+def master():
+    return mesos.Master(_state())
+
+
+def test_tasks(master):
+    ids = [task['id'] for task in master.tasks()]
+    assert ids == ['app-a.1', 'app-b.1', 'app-b.2', 'cassandra.node-0']
+
+
+def test_tasks_completed(master):
+    ids = [task['id'] for task in master.tasks(completed=True)]
+    assert ids == ['old.1', 'app-a.0']
+
+
+def test_tasks_substring_filter(master):
+    ids = [task['id'] for task in master.tasks(fltr='b.')]
+    assert ids == ['app-b.1', 'app-b.2']
+
+
+def test_tasks_glob_filter(master):
+    ids = [task['id'] for task in master.tasks(fltr='app-*.1')]
+    assert ids == ['app-a.1', 'app-b.1']
+
+    ids = [task['id'] for task in master.tasks(fltr='*node*')]
+    assert ids == ['cassandra.node-0']
+
+
+def test_tasks_no_match(master):
+    assert master.tasks(fltr='bogus') == []
+    assert master.tasks(fltr='bogus*') == []
+
+
+def test_tasks_are_cached(master):
+    assert master.tasks(fltr='app-a')[0] is master.task('app-a')
+
+
+def test_task_framework_and_slave(master):
+    task = master.task('app-b.2')
+
+    assert task.framework()['name'] == 'marathon'
+    assert task.slave()['id'] == 'S1'
+
+
+def test_task_slave_exact_id(master):
+    # 'S1' is also a substring of 'S10'
+    assert master.task('cassandra').slave()['id'] == 'S10'
+    assert master.task('app-a.1').slave()['id'] == 'S1'
+
+
+def test_slave_by_id_missing(master):
+    with pytest.raises(DCOSException):
+        master.slave_by_id('S2')
+
+
+def test_framework(master):
+    assert master.framework('marathon-id')['name'] == 'marathon'
+    assert master.framework('completed-id')['name'] == 'completed'
+    assert master.framework('bogus') is None
+
+
+def test_framework_task(master):
+    framework = master.framework('marathon-id')
+
+    assert framework.task('app-a.0')['state'] == 'TASK_FINISHED'
+    assert framework.task('bogus') is None
+
+
+def test_partial_state():
+    state = _state()
+    del state['slaves']
+    del state['completed_frameworks']
+    master = mesos.Master(state)
+
+    assert master.slaves() == []
+    assert [task['id'] for task in master.tasks(completed=True)] == \
+        ['app-a.0']
+
+
+class _FakeResponse(object):
+
+    def __init__(self, status_code, body=None, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self._body = body
+
+    def json(self):
+        return self._body
+
+    def iter_content(self, chunk_size):
+        yield json.dumps(self._body).encode('utf-8')
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def cached_client(tmpdir, monkeypatch):
+    config = tmpdir.join('dcos.toml')
+    config.write('[core]\n'
+                 'mesos_master_url = "http://master.example.com:5050"\n'
+                 'state_cache_ttl = 60\n')
+    monkeypatch.setenv('HOME', str(tmpdir))
+    monkeypatch.setenv(constants.DCOS_CONFIG_ENV, str(config))
+    monkeypatch.delenv(constants.DCOS_NO_CACHE_ENV, raising=False)
+
+    requests = []
+
+    def get(url, **kwargs):
+        requests.append(kwargs.get('headers', {}))
+        if 'If-None-Match' in requests[-1]:
+            return _FakeResponse(304)
+        return _FakeResponse(200, _state(), {'ETag': '"v1"'})
+
+    monkeypatch.setattr(http, 'get', get)
+    return mesos.DCOSClient(), requests
+
+
+def test_state_cache(cached_client):
+    client, requests = cached_client
+
+    state = client.get_master_state(mesos.SLAVE_SECTIONS)
+    assert client.get_master_state(mesos.SLAVE_SECTIONS) == state
+    assert list(state) == ['slaves']
+    assert len(requests) == 1
+
+
+def test_state_cache_missing_sections(cached_client):
+    client, requests = cached_client
+
+    client.get_master_state(mesos.SLAVE_SECTIONS)
+    state = client.get_master_state(mesos.FRAMEWORK_SECTIONS)
+    assert sorted(state) == ['completed_frameworks', 'frameworks', 'slaves']
+    assert len(requests) == 2
+
+    client.get_master_state(mesos.SLAVE_SECTIONS)
+    assert len(requests) == 2
+
+
+def test_state_cache_revalidate(cached_client):
+    client, requests = cached_client
+
+    state = client.get_master_state()
+    client._state_cache_ttl = -1
+    assert client.get_master_state() == state
+    assert requests[-1]['If-None-Match'] == '"v1"'
+
+
+def test_state_cache_disabled(cached_client, monkeypatch):
+    client, requests = cached_client
+    monkeypatch.setenv(constants.DCOS_NO_CACHE_ENV, 'true')
+
+    client.get_master_state()
+    client.get_master_state()
+    assert len(requests) == 2
+
+
+class _FakeFileClient(object):
+    """Serves files/read.json requests for `content`, returning at most
+    `page` bytes per request."""
+
+    def __init__(self, content, page=16):
+        self.content = content.encode('utf-8')
+        self.page = page
+        self.requests = []
+
+    def master_file_read(self, path, length, offset):
+        self.requests.append((offset, length))
+        if offset == -1:
+            return {'data': '', 'offset': len(self.content)}
+        if length == -1:
+            length = self.page
+        end = offset + min(length, self.page)
+        return {'data': self.content[offset:end].decode('utf-8'),
+                'offset': offset}
+
+
+def test_file_read():
+    content = ''.join('line {}\n'.format(i) for i in range(100))
+    client = _FakeFileClient(content)
+    mesos_file = mesos.MesosFile('/master/log', dcos_client=client)
+
+    assert mesos_file.read() == content
+    assert mesos_file.tell() == len(content)
+    assert mesos_file.size() == len(content)
+
+    mesos_file.seek(5)
+    assert mesos_file.read(20) == content[5:25]
+    assert mesos_file.tell() == 25
+
+
+def test_file_iter_chunks():
+    content = 'x' * 100
+    client = _FakeFileClient(content, page=64)
+    mesos_file = mesos.MesosFile('/master/log',
+                                 dcos_client=client,
+                                 chunk_size=30)
+
+    assert [len(chunk) for chunk in mesos_file.iter_chunks(70)] == \
+        [30, 30, 10]
+    assert client.requests == [(0, 30), (30, 30), (60, 10)]
+
+
+def test_file_readinto():
+    content = u'caf\u00e9 au lait'
+    mesos_file = mesos.MesosFile('/master/log',
+                                 dcos_client=_FakeFileClient(content, 5))
+
+    buf = bytearray(32)
+    count = mesos_file.readinto(buf)
+    assert bytes(buf[:count]) == content.encode('utf-8')
+    assert mesos_file.tell() == len(content.encode('utf-8'))
+
+
+def test_file_download(monkeypatch):
+    monkeypatch.setattr(mesos, 'DOWNLOAD_RANGE_SIZE', (10, 40))
+    content = ''.join('line {}\n'.format(i) for i in range(1000))
+    client = _FakeFileClient(content, page=16)
+    mesos_file = mesos.MesosFile('/master/log', dcos_client=client)
+
+    output = io.BytesIO()
+    assert mesos_file.download(output, parallel=3) == len(content)
+    assert output.getvalue() == content.encode('utf-8')
+    assert mesos_file.tell() == len(content)
+
+
+def test_file_download_short_range(monkeypatch):
+    monkeypatch.setattr(mesos, 'DOWNLOAD_RANGE_SIZE', (10, 40))
+    content = ''.join('line {}\n'.format(i) for i in range(100))
+
+    class _TruncatedFileClient(_FakeFileClient):
+        def master_file_read(self, path, length, offset):
+            response = super(_TruncatedFileClient, self).master_file_read(
+                path, length, offset)
+            # truncated once its size is known
+            self.content = self.content[:25]
+            return response
+
+    mesos_file = mesos.MesosFile('/master/log',
+                                 dcos_client=_TruncatedFileClient(content))
+
+    with pytest.raises(DCOSException) as exc_info:
+        mesos_file.download(io.BytesIO(), parallel=3)
+    assert str(exc_info.value) == (
+        'Error downloading [master:/master/log]: expected 10 bytes at '
+        'offset 20, but got 5.  The file may have been truncated.')
+
+
+def test_task_executor():
+    master = mesos.Master(_state())
+    master.slave_by_id('S1')._state = _slave_state()
+
+    assert master.task('app-a.1').directory() == '/sandbox/app-a'
+    assert master.task('app-b.1').executor() is None
+    with pytest.raises(DCOSException):
+        master.task('app-b.1').directory()
+
+
+class _FakeSlaveFileClient(object):
+
+    def __init__(self, slave_state=None):
+        self.paths = []
+        self.status_code = 200
+        self.slave_state = slave_state
+        self.state_fetches = 0
+
+    def slave_file_read(self, slave_id, private_url, path, length, offset):
+        self.paths.append(path)
+        if self.status_code != 200:
+            raise DCOSHTTPException(_FakeResponse(self.status_code))
+        return {'data': '', 'offset': 0}
+
+    def get_slave_state(self, slave_id, private_url):
+        self.state_fetches += 1
+        return self.slave_state
+
+
+def test_file_host_path_cached():
+    master = mesos.Master(_state())
+    slave = master.slave_by_id('S1')
+    slave._state = _slave_state()
+    client = _FakeSlaveFileClient()
+    mesos_file = mesos.MesosFile('stdout',
+                                 task=master.task('app-a.1'),
+                                 dcos_client=client)
+
+    mesos_file.read()
+    slave._state = {'frameworks': [], 'completed_frameworks': []}
+    mesos_file.read()
+    assert client.paths == ['/sandbox/app-a/stdout'] * 2
+
+    client.status_code = 404
+    with pytest.raises(DCOSHTTPException):
+        mesos_file.read()
+    assert client.state_fetches == 0
+
+
+def test_file_host_path_moved_sandbox():
+    master = mesos.Master(_state())
+    slave = master.slave_by_id('S1')
+    slave._state = _slave_state()
+    moved = _slave_state()
+    moved['frameworks'][0]['executors'][0]['directory'] = '/sandbox/moved'
+    client = _FakeSlaveFileClient(moved)
+    mesos_file = mesos.MesosFile('stdout',
+                                 task=master.task('app-a.1'),
+                                 dcos_client=client)
+
+    mesos_file.read()
+    client.status_code = 404
+    with pytest.raises(DCOSHTTPException):
+        mesos_file.read()
+    client.status_code = 200
+    mesos_file.read()
+    mesos_file.read()
+
+    assert client.paths == ['/sandbox/app-a/stdout'] * 2 + \
+        ['/sandbox/moved/stdout'] * 2
+    assert client.state_fetches == 1
+
+
+def _slave_state():
+    return {
+        'frameworks': [{
+            'executors': [{
+                'directory': '/sandbox/app-a',
+                'tasks': [{'id': 'app-a.1'}],
+                'completed_tasks': [],
+                'queued_tasks': [],
+            }],
+            'completed_executors': [],
+        }],
+        'completed_frameworks': [],
+    }
+
+
+def _state():
+    return {
+        'slaves': [
+            {'id': 'S1', 'pid': 'slave(1)@10.0.0.1:5051'},
+            {'id': 'S10', 'pid': 'slave(1)@10.0.0.10:5051'},
+        ],
+        'frameworks': [
+            {
+                'id': 'marathon-id',
+                'name': 'marathon',
+                'active': True,
+                'tasks': [
+                    {'id': 'app-a.1', 'slave_id': 'S1',
+                     'framework_id': 'marathon-id'},
+                    {'id': 'app-b.1', 'slave_id': 'S1',
+                     'framework_id': 'marathon-id'},
+                    {'id': 'app-b.2', 'slave_id': 'S1',
+                     'framework_id': 'marathon-id'},
+                ],
+                'completed_tasks': [
+                    {'id': 'app-a.0', 'slave_id': 'S1',
+                     'framework_id': 'marathon-id',
+                     'state': 'TASK_FINISHED'},
+                ],
+            },
+            {
+                'id': 'cassandra-id',
+                'name': 'cassandra',
+                'active': True,
+                'tasks': [
+                    {'id': 'cassandra.node-0', 'slave_id': 'S10',
+                     'framework_id': 'cassandra-id'},
+                ],
+                'completed_tasks': [],
+            },
+        ],
+        'completed_frameworks': [
+            {
+                'id': 'completed-id',
+                'name': 'completed',
+                'active': False,
+                'tasks': [],
+                'completed_tasks': [
+                    {'id': 'old.1', 'slave_id': 'S1',
+                     'framework_id': 'completed-id'},
+                ],
+            },
+        ],
+    }
@@ -1,4 +1,9 @@
-from dcos import subcommand
+import os
+
+from dcos import cache, constants, subcommand, util
+from dcos.errors import DCOSException
+
+import pytest
 
 
 def test_noun():
@@ -7,3 +12,82 @@ def test_noun():
 
 def test_hyphen_noun():
     assert subcommand.noun("some/path/to/dcos-sub-command") == "sub-command"
+
+
+@pytest.fixture
+def bin_dir(tmpdir, monkeypatch):
+    monkeypatch.setenv('HOME', str(tmpdir))
+    monkeypatch.delenv(constants.DCOS_NO_CACHE_ENV, raising=False)
+
+    bin_dir = tmpdir.mkdir('bin')
+    monkeypatch.setattr(util, 'dcos_bin_path', lambda: str(bin_dir))
+    _executable(bin_dir, 'dcos-marathon')
+    bin_dir.join('README').write('')
+    return bin_dir
+
+
+def _executable(directory, name):
+    path = directory.join(name)
+    path.write('')
+    path.chmod(0o755)
+    return str(path)
+
+
+def test_list_paths(bin_dir):
+    assert subcommand.list_paths() == [str(bin_dir.join('dcos-marathon'))]
+
+
+def test_list_paths_cached(bin_dir, monkeypatch):
+    paths = subcommand.list_paths()
+
+    def listdir(path):
+        assert False, 'unexpected scan of {}'.format(path)
+    monkeypatch.setattr(os, 'listdir', listdir)
+
+    assert subcommand.list_paths() == paths
+
+
+def test_list_paths_invalidated(bin_dir):
+    subcommand.list_paths()
+
+    pkg_bin_dir = bin_dir.dirpath().join(
+        constants.DCOS_DIR, constants.DCOS_SUBCOMMAND_SUBDIR, 'cassandra',
+        constants.DCOS_SUBCOMMAND_VIRTUALENV_SUBDIR,
+        subcommand.BIN_DIRECTORY)
+    pkg_bin_dir.ensure(dir=True)
+    cassandra = _executable(pkg_bin_dir, 'dcos-cassandra')
+
+    assert subcommand.command_executables('cassandra') == cassandra
+
+    assert subcommand.uninstall('cassandra')
+    with pytest.raises(DCOSException):
+        subcommand.command_executables('cassandra')
+
+
+def test_uninstall_drops_cached_metadata(bin_dir):
+    pkg_bin_dir = bin_dir.dirpath().join(
+        constants.DCOS_DIR, constants.DCOS_SUBCOMMAND_SUBDIR, 'cassandra',
+        constants.DCOS_SUBCOMMAND_VIRTUALENV_SUBDIR,
+        subcommand.BIN_DIRECTORY)
+    pkg_bin_dir.ensure(dir=True)
+    cassandra = _executable(pkg_bin_dir, 'dcos-cassandra')
+    subcommand._metadata(cassandra, 'info', lambda: 'Cassandra')
+
+    assert subcommand.uninstall('cassandra')
+    assert cache.load('subcommand', cassandra) is None
+
+
+def test_metadata_cached(bin_dir):
+    path = str(bin_dir.join('dcos-marathon'))
+    calls = []
+
+    def run():
+        calls.append(None)
+        return len(calls)
+
+    assert subcommand._metadata(path, 'info', run) == 1
+    assert subcommand._metadata(path, 'info', run) == 1
+    assert subcommand._metadata(path, 'config_schema', run) == 2
+
+    bin_dir.join('dcos-marathon').write('#!/bin/sh\n')
+    assert subcommand._metadata(path, 'info', run) == 3
@@ -1,3 +1,6 @@
+import json
+
+import concurrent.futures
 from dcos import util
 from dcos.errors import DCOSException
 
@@ -28,3 +31,132 @@ def test_open_file():
             pass
     assert 'Error opening file [{}]: No such file or directory'.format(path) \
         in str(excinfo.value)
+
+
+def _chunked(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def test_load_json_sections():
+    data = (u'{"skip": {"a": [1, "}]\\""]}, "slaves": [{"id": "S\\u00e9"}],'
+            u' "frameworks": [], "x": 1}').encode('utf-8')
+    expected = {'slaves': [{'id': u'Sé'}], 'frameworks': []}
+
+    for size in range(1, len(data) + 1):
+        chunks = _chunked(data, size)
+        result = util.load_json_sections(chunks, ['slaves', 'frameworks'])
+        assert result == expected
+
+
+def test_load_json_sections_missing_key():
+    assert util.load_json_sections([b'{"a": 1}'], ['b']) == {}
+
+
+def test_load_json_sections_truncated():
+    with pytest.raises(DCOSException) as excinfo:
+        util.load_json_sections([b'{"slaves": [1, 2'], ['slaves'])
+    assert 'unexpected end of data' in str(excinfo.value)
+
+
+def test_load_json_sections_stops_early():
+    read = []
+
+    def chunks():
+        for chunk in [b'{"slaves": [1], "frameworks": {"a"', b': 1}, "x": [']:
+            read.append(chunk)
+            yield chunk
+        while True:
+            read.append(b'1, ')
+            yield b'1, '
+
+    assert util.load_json_sections(chunks(), ['frameworks', 'slaves']) == \
+        {'slaves': [1], 'frameworks': {'a': 1}}
+    # only the few chunks buffered while reading "frameworks"
+    assert len(read) < 20
+
+
+def test_load_json_sections_number_split_across_chunks():
+    assert util.load_json_sections([b'{"a": 12', b'34}'], ['a']) == \
+        {'a': 1234}
+    assert util.load_json_sections([b'{"a": 1.', b'5e', b'1}'], ['a']) == \
+        {'a': 15.0}
+
+
+def test_load_json_sections_invalid():
+    with pytest.raises(DCOSException) as excinfo:
+        util.load_json_sections([b'{"a": 1 "b": 2}'], ['b'])
+    assert "Expected ',' or '}'" in str(excinfo.value)
+
+
+def test_load_json_sections_skips_other_sections(monkeypatch):
+    decoded = []
+
+    class _Decoder(object):
+        def raw_decode(self, text, pos):
+            value, end = json.JSONDecoder().raw_decode(text, pos)
+            decoded.append(value)
+            return value, end
+
+    monkeypatch.setattr(util._JSONReader, '_DECODER', _Decoder())
+    big = [{'id': 'S{}'.format(i), 'text': '"}]\\[{', 'n': [i, {}]}
+           for i in range(2000)]
+    data = json.dumps({'big': big, 'b': 'x', 'frameworks': [1]})
+
+    for size in [1, 7, 4096]:
+        del decoded[:]
+        chunks = _chunked(data.encode('utf-8'), size)
+        assert util.load_json_sections(chunks, ['frameworks']) == \
+            {'frameworks': [1]}
+        # values ending a chunk may be decoded again with the next one
+        assert set(json.dumps(value) for value in decoded) == \
+            set(['[1]', '"b"', '"big"', '"frameworks"', '"x"'])
+
+
+def test_load_json_sections_truncated_skipped_section():
+    with pytest.raises(DCOSException) as excinfo:
+        util.load_json_sections([b'{"x": ["a\\', b'"]'], ['slaves'])
+    assert 'unexpected end of data' in str(excinfo.value)
+
+
+def test_stream_uses_given_pool():
+    with concurrent.futures.ThreadPoolExecutor(2) as pool:
+        results = dict((obj, job.result())
+                       for job, obj in util.stream(lambda x: x * 2,
+                                                   [1, 2, 3], pool))
+        assert results == {1: 2, 2: 4, 3: 6}
+
+        # the pool is still usable after the stream is exhausted
+        assert pool.submit(lambda: 1).result() == 1
+
+
+def test_iter_json_array():
+    doc = {'before': [1, {'x': ']'}],
+           'apps': [{'id': '/a', 's': 'q"],{\\', 'n': [1, [2]]},
+                    3, 'x,y', [], {}, None],
+           'after': {'apps': 1}}
+    text = json.dumps(doc).encode('utf-8')
+
+    for size in [1, 2, 3, 7, len(text)]:
+        chunks = [text[i:i + size] for i in range(0, len(text), size)]
+        assert list(util.iter_json_array(chunks, 'apps')) == doc['apps']
+
+
+def test_iter_json_array_stops_at_end_of_array():
+    def chunks():
+        yield b'{"apps": [{"id": "/a"}, 2]'
+        raise AssertionError('read past the array')
+
+    assert list(util.iter_json_array(chunks(), 'apps')) == [{'id': '/a'}, 2]
+
+
+def test_iter_json_array_missing_or_empty():
+    assert list(util.iter_json_array([b'{"apps": []}'], 'apps')) == []
+    assert list(util.iter_json_array([b'{"x": [1]}'], 'apps')) == []
+
+
+def test_iter_json_array_truncated():
+    items = util.iter_json_array([b'{"apps": [1, {"id"'], 'apps')
+
+    assert next(items) == 1
+    with pytest.raises(DCOSException):
+        next(items)